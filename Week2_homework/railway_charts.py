@@ -0,0 +1,200 @@
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from downsample import DEFAULT_MAX_POINTS, downsample_frame, downsample_indices
+from plot_settings import apply_chinese_font
+from transport_modes import mode_matrix, mode_shares
+
+
+# 设置中文字体函数
+def setup_chinese_font():
+    """设置中文字体，解决中文显示问题；返回使用的字体名，找不到中文字体时返回None"""
+    font_name = apply_chinese_font()
+    plt.rcParams['xtick.labelsize'] = 8
+    return font_name
+
+
+# 运货量对比柱状图
+def plot_volume_comparison(analysis_df, railway_col, road_col, data_type, max_points=DEFAULT_MAX_POINTS):
+    """绘制铁路公路运货量对比柱状图，数据点超过 max_points 时先降采样"""
+    analysis_df = downsample_frame(analysis_df, [railway_col, road_col], '时间', max_points)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    width = 0.35
+    x = np.arange(len(analysis_df['时间']))
+
+    # 绘制运货量
+    ax.bar(x - width/2, analysis_df[railway_col], width, label='铁路运货量', alpha=0.7, color='blue')
+    ax.bar(x + width/2, analysis_df[road_col], width, label='公路运货量', alpha=0.7, color='orange')
+
+    # 设置图表属性
+    ax.set_xlabel('时间')
+    ax.set_ylabel('运货量(万吨)')
+    ax.set_title(f'铁路公路{data_type}对比')
+    ax.legend(loc='upper left')
+
+    # 动态调整x轴刻度
+    step = max(1, len(analysis_df) // 15)
+    ax.set_xticks(x[::step])
+    ax.set_xticklabels([t.strftime('%Y-%m') for t in analysis_df['时间'][::step]], rotation=30, ha='right')
+
+    fig.tight_layout()
+    return fig
+
+
+# 增长率趋势图
+def plot_growth_trend(analysis_df, railway_growth_col, road_growth_col, data_type, max_points=DEFAULT_MAX_POINTS):
+    """绘制铁路公路增长率变化趋势图，两个增长率列都不存在时返回None"""
+    growth_cols = [col for col in [railway_growth_col, road_growth_col] if col]
+    if not growth_cols:
+        return None
+
+    analysis_df = downsample_frame(analysis_df, growth_cols, '时间', max_points)
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    if railway_growth_col:
+        ax.plot(analysis_df['时间'], analysis_df[railway_growth_col], marker='o', label='铁路增长率(%)', color='blue')
+
+    if road_growth_col:
+        ax.plot(analysis_df['时间'], analysis_df[road_growth_col], marker='s', label='公路增长率(%)', color='orange')
+
+    ax.axhline(y=0, color='r', linestyle='-', alpha=0.3)
+    ax.set_xlabel('时间')
+    ax.set_ylabel('增长率(%)')
+    ax.set_title(f'铁路公路运货量{data_type}增长率变化趋势')
+    ax.legend()
+
+    fig.autofmt_xdate(rotation=30)
+    fig.tight_layout()
+    return fig
+
+
+# 运货量占比堆叠图
+def plot_volume_share(analysis_df, volume_rail_col, volume_road_col, max_points=DEFAULT_MAX_POINTS):
+    """绘制铁路公路运货量占比堆叠图，没有有效运货量数据时返回None"""
+    # 使用运货量数据而不是增长率数据
+    _, volume = mode_matrix(analysis_df, {'铁路': volume_rail_col, '公路': volume_road_col})
+    shares, valid = mode_shares(volume)
+    return plot_mode_shares(analysis_df['时间'].to_numpy(), shares, valid, ['铁路', '公路'], max_points,
+                            colors=['blue', 'orange'], title='铁路公路运货量占比变化趋势')
+
+
+def plot_mode_shares(times, shares, valid, modes, max_points=DEFAULT_MAX_POINTS, colors=None, title=None):
+    """
+    绘制多种运输方式的运货量占比堆叠图，没有有效数据时返回None
+
+    shares、valid 为 transport_modes.mode_shares 的结果（T × N 占比数组和有效行掩码）
+    """
+    # 处理除零问题：只使用有效数据
+    if valid.sum() == 0:
+        return None
+    valid_times = times[valid]
+    valid_shares = shares[valid]
+
+    # 点数过多时降采样（所有占比曲线共用同一组时间点）
+    keep = downsample_indices(valid_times, list(valid_shares.T), max_points)
+    valid_times = valid_times[keep]
+    valid_shares = valid_shares[keep]
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.stackplot(valid_times, *valid_shares.T, labels=[f'{mode}占比' for mode in modes], colors=colors, alpha=0.8)
+    ax.set_xlabel('时间')
+    ax.set_ylabel('占比(%)')
+    ax.set_title(title or f"{'、'.join(modes)}运货量占比变化趋势")
+    ax.legend(loc='upper left')
+
+    fig.autofmt_xdate(rotation=30)
+    fig.tight_layout()
+    return fig
+
+
+# 运输方式相关系数热力图
+def plot_correlation_matrix(corr):
+    """绘制运输方式之间的相关系数矩阵，corr 为以运输方式为行列的数据框"""
+    size = max(4, 1.2 * len(corr) + 2)
+    fig, ax = plt.subplots(figsize=(size + 1, size))
+    image = ax.imshow(corr.to_numpy(), cmap='RdBu_r', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(corr)))
+    ax.set_xticklabels(corr.columns)
+    ax.set_yticks(range(len(corr)))
+    ax.set_yticklabels(corr.index)
+    for i in range(len(corr)):
+        for j in range(len(corr)):
+            value = corr.iat[i, j]
+            ax.text(j, i, 'N/A' if np.isnan(value) else f'{value:.2f}', ha='center', va='center',
+                    color='white' if abs(value) > 0.6 else 'black')
+    ax.set_title('各运输方式运货量相关系数')
+    fig.colorbar(image, ax=ax)
+    fig.tight_layout()
+    return fig
+
+
+# 相关性散点图
+def plot_correlation_scatter(corr_data, volume_rail_col, volume_road_col, correlation):
+    """绘制铁路与公路运货量散点图，相关性较强时添加趋势线"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(corr_data[volume_rail_col], corr_data[volume_road_col], alpha=0.7, color='purple')
+    ax.set_xlabel('铁路运货量(万吨)')
+    ax.set_ylabel('公路运货量(万吨)')
+    ax.set_title('铁路与公路运货量散点图')
+
+    # 添加趋势线（仅当有足够数据点且相关性较强时）
+    if len(corr_data) > 2 and abs(correlation) > 0.3:
+        z = np.polyfit(corr_data[volume_rail_col], corr_data[volume_road_col], 1)
+        p = np.poly1d(z)
+        ax.plot(corr_data[volume_rail_col], p(corr_data[volume_rail_col]), "--", color='red',
+                label=f'趋势线 (r={correlation:.3f})')
+        ax.legend()
+
+    fig.tight_layout()
+    return fig
+
+
+# 滚动相关系数图
+def plot_rolling_correlation(lead_lag, pair=0, max_points=DEFAULT_MAX_POINTS):
+    """各窗口的滚动相关系数和扩展窗口相关系数随时间的变化，lead_lag 为 lead_lag_analysis 的结果"""
+    times = lead_lag['times']
+    series = [(f"{window}期滚动", lead_lag['rolling'][i][:, pair], '-') for i, window in enumerate(lead_lag['windows'])]
+    series.append(('扩展窗口', lead_lag['expanding'][:, pair], '--'))
+    keep = downsample_indices(times, [np.nan_to_num(values) for _, values, _ in series], max_points)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for label, values, style in series:
+        ax.plot(times[keep], values[keep], style, label=label)
+    ax.axhline(y=0, color='red', linestyle='--', alpha=0.3)
+    ax.set_ylim(-1.05, 1.05)
+    ax.set_xlabel('时间')
+    ax.set_ylabel('相关系数')
+    ax.set_title(f"铁路与公路{lead_lag['names'][pair]}滚动相关系数")
+    ax.legend(loc='lower left')
+    ax.grid(True, linestyle='--', alpha=0.5)
+    fig.tight_layout()
+    return fig
+
+
+# 领先滞后（互相关）图
+def plot_cross_correlation(lead_lag, pair=0):
+    """滞后 -max_lag..max_lag 的互相关柱状图，标出绝对值最大的滞后"""
+    lags, ccf = lead_lag['lags'], lead_lag['ccf'][:, pair]
+    best_lag, best = lead_lag['strongest'][pair]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    colors = ['red' if lag == best_lag else 'steelblue' for lag in lags]
+    ax.bar(lags, np.nan_to_num(ccf), color=colors, alpha=0.8)
+    ax.axhline(y=0, color='black', linewidth=0.8)
+    ax.set_xlabel('滞后期数（正数表示公路领先铁路）')
+    ax.set_ylabel('相关系数')
+    ax.set_title(f"铁路与公路{lead_lag['names'][pair]}领先滞后相关系数")
+    if best_lag is not None:
+        ax.annotate(f'{best_lag:+d}: {best:.3f}', (best_lag, best), ha='center',
+                    va='bottom' if best >= 0 else 'top')
+    fig.tight_layout()
+    return fig
+
+
+def figure_to_bytes(fig, fmt='png', dpi=150):
+    """把图表渲染为PNG/SVG字节并关闭图表，释放内存"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
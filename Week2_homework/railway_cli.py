@@ -0,0 +1,235 @@
+"""
+铁路公路运货量分析的命令行批处理（不加载 Streamlit）
+
+对每个 Excel 文件输出与网页版相同的分析数据 CSV、统计摘要 CSV 和图表 PNG，
+多个文件在进程池中并行处理。
+
+用法：
+    python railway_cli.py 铁路运输.xls ../data/national_data --output-dir 分析结果 --workers 4
+    python railway_cli.py 铁路运输.xls --data-type 当期值 --no-figures
+    python railway_cli.py ../data/national_data --export-format parquet
+"""
+import argparse
+import glob
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# 仓库根目录下的公共模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from columnar_cache import load_excel_cached
+from plot_settings import DEFAULT_MAX_POINTS
+from streaming_export import EXPORT_FORMATS, available_formats, export_file_name, write_export
+from railway_pipeline import (prepare_dataset, available_data_types, volume_column, growth_column,
+                              compute_correlation, describe_correlation, build_export_frame, build_stats_table)
+from transport_modes import mode_summary
+
+EXCEL_PATTERNS = ('*.xls', '*.xlsx')
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def collect_files(sources):
+    """展开命令行给出的文件和目录（目录下的 .xls/.xlsx 文件），同一个文件只保留一次"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for pattern in EXCEL_PATTERNS:
+                paths += sorted(glob.glob(os.path.join(source, pattern)))
+        else:
+            paths.append(source)
+    # 按绝对路径去重，a.xls 与 ./a.xls 是同一个文件
+    seen, unique = set(), []
+    for path in paths:
+        if _normalize(path) not in seen:
+            seen.add(_normalize(path))
+            unique.append(path)
+    return unique
+
+
+def output_subdirs(paths):
+    """
+    每个输入文件的输出子目录名，在同一批内互不相同
+
+    子目录名是带扩展名的文件名（a.xls 与 a.xlsx 不会冲突）；不同目录下的同名文件再加上
+    绝对路径哈希的前 8 位，否则并行处理时会互相覆盖结果。
+    """
+    names = [os.path.basename(path) for path in paths]
+    counts = {}
+    for name in names:
+        counts[os.path.normcase(name)] = counts.get(os.path.normcase(name), 0) + 1
+    subdirs = []
+    for path, name in zip(paths, names):
+        if counts[os.path.normcase(name)] > 1:
+            name += '_' + hashlib.sha1(_normalize(path).encode('utf-8')).hexdigest()[:8]
+        subdirs.append(name)
+    return subdirs
+
+
+def _save_figure(fig, path):
+    from railway_charts import figure_to_bytes
+
+    if fig is None:
+        return None
+    with open(path, 'wb') as f:
+        f.write(figure_to_bytes(fig))
+    return path
+
+
+def analyze_file(path, output_dir, data_types=None, figures=True, max_points=DEFAULT_MAX_POINTS,
+                 export_format='csv', subdir=None):
+    """
+    分析单个文件并写出结果
+
+    参数:
+    path: str - Excel 文件路径
+    output_dir: str - 输出目录，每个文件的结果放在 output_dir/subdir 中
+    data_types: list - 要输出的数据类型（如 ['当期值']），默认输出全部可对比的类型
+    figures: bool - 是否绘制图表
+    max_points: int - 图表最大点数，0 表示不降采样
+    export_format: str - 分析数据的导出格式（streaming_export.EXPORT_FORMATS），按块直接写入文件
+    subdir: str - 输出子目录名，默认是带扩展名的文件名；批处理时由 output_subdirs 给出
+
+    返回:
+    结果摘要字典，包含 file、outputs（写出的文件列表）、correlation 和 messages
+    """
+    target = os.path.join(output_dir, subdir or os.path.basename(path))
+    os.makedirs(target, exist_ok=True)
+
+    dataset = prepare_dataset(load_excel_cached(path))
+    valid_rail, valid_road = dataset['rail'], dataset['road']
+    analysis_df = dataset['analysis']
+    result = {'file': path, 'outputs': [], 'correlation': None,
+              'messages': [message for _, message in dataset['messages']]}
+
+    if analysis_df is None or len(analysis_df) == 0:
+        result['messages'].append("未找到有效的铁路或公路运货量数据")
+        return result
+
+    types = [t for t in available_data_types(valid_rail, valid_road) if not data_types or t in data_types]
+    volume_rail_col, volume_road_col = volume_column(valid_rail), volume_column(valid_road)
+    railway_growth_col, road_growth_col = growth_column(valid_rail), growth_column(valid_road)
+    corr_data, correlation = compute_correlation(analysis_df, volume_rail_col, volume_road_col)
+    result['correlation'] = correlation
+
+    if figures:
+        import matplotlib
+        matplotlib.use('Agg')
+        from railway_charts import (setup_chinese_font, plot_volume_comparison, plot_growth_trend,
+                                    plot_volume_share, plot_correlation_scatter)
+        setup_chinese_font()
+
+    for data_type in types:
+        railway_col, road_col = valid_rail[data_type], valid_road[data_type]
+
+        export_path = os.path.join(target, export_file_name(f'分析数据_{data_type}', export_format))
+        export_df = build_export_frame(analysis_df, railway_col, road_col, railway_growth_col, road_growth_col)
+        write_export(export_df, export_path, export_format, encoding='utf-8-sig')
+        stats_path = os.path.join(target, f'统计摘要_{data_type}.csv')
+        build_stats_table(analysis_df, railway_col, road_col, railway_growth_col, road_growth_col).to_csv(
+            stats_path, index=False, encoding='utf-8-sig')
+        result['outputs'] += [export_path, stats_path]
+
+        if figures:
+            result['outputs'].append(_save_figure(
+                plot_volume_comparison(analysis_df, railway_col, road_col, data_type, max_points),
+                os.path.join(target, f'运货量对比_{data_type}.png')))
+            result['outputs'].append(_save_figure(
+                plot_growth_trend(analysis_df, railway_growth_col, road_growth_col, data_type, max_points),
+                os.path.join(target, f'增长率趋势_{data_type}.png')))
+
+    # 占比图和散点图只使用运货量数据，与数据类型无关
+    if figures and types:
+        result['outputs'].append(_save_figure(
+            plot_volume_share(analysis_df, volume_rail_col, volume_road_col, max_points),
+            os.path.join(target, '运货量占比.png')))
+        if correlation is not None:
+            result['outputs'].append(_save_figure(
+                plot_correlation_scatter(corr_data, volume_rail_col, volume_road_col, correlation),
+                os.path.join(target, '相关性散点图.png')))
+
+    # 所有运输方式的对比
+    mode_analysis = dataset['mode_analysis']
+    if len(mode_analysis['modes']) > 2:
+        summary_path = os.path.join(target, '运输方式对比.csv')
+        mode_summary(mode_analysis).to_csv(summary_path, index=False, encoding='utf-8-sig')
+        corr_path = os.path.join(target, '运输方式相关系数.csv')
+        mode_analysis['corr'].round(4).to_csv(corr_path, encoding='utf-8-sig')
+        result['outputs'] += [summary_path, corr_path]
+        if figures:
+            from railway_charts import plot_mode_shares, plot_correlation_matrix
+
+            result['outputs'].append(_save_figure(
+                plot_mode_shares(mode_analysis['times'], mode_analysis['shares'], mode_analysis['valid'],
+                                 mode_analysis['modes'], max_points),
+                os.path.join(target, '运输方式占比.png')))
+            result['outputs'].append(_save_figure(plot_correlation_matrix(mode_analysis['corr']),
+                                                  os.path.join(target, '运输方式相关系数.png')))
+
+    result['outputs'] = [output for output in result['outputs'] if output]
+    return result
+
+
+def _analyze_safely(path, subdir, *args):
+    """子进程入口：单个文件出错时返回错误信息，不影响其他文件"""
+    try:
+        return analyze_file(path, *args, subdir=subdir)
+    except Exception as e:
+        return {'file': path, 'outputs': [], 'correlation': None, 'messages': [], 'error': str(e)}
+
+
+def run_batch(paths, output_dir, data_types=None, figures=True, max_points=DEFAULT_MAX_POINTS, max_workers=None,
+              export_format='csv'):
+    """
+    并行分析多个文件，返回每个文件的结果摘要（顺序与 paths 一致）
+
+    每个文件的结果写入 output_dir 下互不相同的子目录（见 output_subdirs）
+    """
+    args = (output_dir, data_types, figures, max_points, export_format)
+    jobs = list(zip(paths, output_subdirs(paths)))
+    if max_workers == 1 or len(paths) <= 1:
+        return [_analyze_safely(path, subdir, *args) for path, subdir in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_analyze_safely, path, subdir, *args) for path, subdir in jobs]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='铁路公路运货量分析（命令行批处理）')
+    parser.add_argument('sources', nargs='+', help='Excel 文件或包含 Excel 文件的目录')
+    parser.add_argument('--output-dir', default='分析结果', help='输出目录')
+    parser.add_argument('--data-type', nargs='+', default=None, help='数据类型，如 当期值 累计值，默认全部')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认等于 CPU 核数')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS, help='图表最大点数，0 表示不降采样')
+    parser.add_argument('--no-figures', action='store_true', help='只输出 CSV，不绘制图表')
+    parser.add_argument('--export-format', default='csv', choices=available_formats(),
+                        help='分析数据的导出格式：' + '、'.join(f'{fmt}（{EXPORT_FORMATS[fmt][0]}）'
+                                                        for fmt in available_formats()))
+    args = parser.parse_args()
+
+    paths = collect_files(args.sources)
+    if not paths:
+        parser.error('没有找到 Excel 文件')
+
+    results = run_batch(paths, args.output_dir, args.data_type, not args.no_figures, args.max_points, args.workers,
+                        args.export_format)
+    failed = 0
+    for result in results:
+        if 'error' in result:
+            failed += 1
+            print(f"[失败] {result['file']}: {result['error']}")
+            continue
+        line = f"[完成] {result['file']}: 输出 {len(result['outputs'])} 个文件"
+        if result['correlation'] is not None:
+            line += f"，相关系数 {result['correlation']:.4f}（{describe_correlation(result['correlation'])}）"
+        print(line)
+        for message in result['messages']:
+            print(f"    {message}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+浏览器端渲染的交互式图表（Vega-Lite / Altair）
+
+与 railway_charts.py 中的 matplotlib 图表一一对应，但只把（降采样后的）数据和
+图表描述发送给浏览器：缩放、平移（鼠标滚轮和拖动）、点击图例显示/隐藏系列都在
+浏览器中完成，不会触发 Streamlit 重跑，服务器也不需要渲染图片。
+Altair 随 Streamlit 一起安装；图中的中文由浏览器显示，不需要设置字体。
+"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from downsample import DEFAULT_MAX_POINTS, downsample_frame, downsample_indices
+from transport_modes import mode_matrix, mode_shares
+
+# 与 matplotlib 图表一致的系列颜色
+SERIES_COLORS = {'铁路': 'blue', '公路': 'orange'}
+CHART_HEIGHT = 400
+
+
+def _long_frame(df, series, max_points):
+    """
+    把若干数据列降采样后转为长表（时间、系列、数值），便于按系列着色和切换
+
+    series: {系列名: 列名}，列名为 None 的系列跳过
+    """
+    series = {name: col for name, col in series.items() if col}
+    df = downsample_frame(df, list(series.values()), '时间', max_points)
+    return pd.DataFrame({
+        '时间': np.tile(df['时间'].to_numpy(), len(series)),
+        '系列': np.repeat(list(series), len(df)),
+        '数值': np.concatenate([df[col].to_numpy(dtype=np.float64) for col in series.values()]),
+    })
+
+
+def _series_chart(long_df, mark, y_title, title, colors=None, stack=None):
+    """按系列着色的时间序列图：点击图例切换系列，横轴可缩放、平移"""
+    legend_pick = alt.selection_point(fields=['系列'], bind='legend')
+    names = list(dict.fromkeys(long_df['系列']))
+    scale = alt.Scale(domain=names, range=colors) if colors else alt.Undefined
+    return mark(alt.Chart(long_df, title=title, height=CHART_HEIGHT)).encode(
+        x=alt.X('时间:T', title='时间'),
+        y=alt.Y('数值:Q', title=y_title, stack=stack),
+        color=alt.Color('系列:N', scale=scale, sort=names, title=None),
+        opacity=alt.condition(legend_pick, alt.value(0.9), alt.value(0.1)),
+        tooltip=[alt.Tooltip('时间:T', format='%Y-%m'), '系列:N', alt.Tooltip('数值:Q', format=',.2f')],
+    ).add_params(legend_pick).interactive(bind_y=False)
+
+
+def _colors(labels):
+    """铁路、公路使用与静态图相同的颜色，其他系列交给 Vega-Lite 的默认配色"""
+    if all(label[:2] in SERIES_COLORS for label in labels):
+        return [SERIES_COLORS[label[:2]] for label in labels]
+    return None
+
+
+# 运货量对比图
+def volume_chart(analysis_df, railway_col, road_col, data_type, max_points=DEFAULT_MAX_POINTS):
+    """铁路公路运货量对比（折线 + 数据点；时间点很多时比柱状图更便于缩放查看）"""
+    long_df = _long_frame(analysis_df, {'铁路运货量': railway_col, '公路运货量': road_col}, max_points)
+    return _series_chart(long_df, lambda chart: chart.mark_line(point=True), '运货量(万吨)',
+                         f'铁路公路{data_type}对比', _colors(['铁路运货量', '公路运货量']))
+
+
+# 增长率趋势图
+def growth_chart(analysis_df, railway_growth_col, road_growth_col, data_type, max_points=DEFAULT_MAX_POINTS):
+    """铁路公路增长率变化趋势，两个增长率列都不存在时返回None"""
+    series = {'铁路增长率(%)': railway_growth_col, '公路增长率(%)': road_growth_col}
+    if not any(series.values()):
+        return None
+    long_df = _long_frame(analysis_df, series, max_points)
+    lines = _series_chart(long_df, lambda chart: chart.mark_line(point=True), '增长率(%)',
+                          f'铁路公路运货量{data_type}增长率变化趋势',
+                          _colors([name for name, col in series.items() if col]))
+    zero = alt.Chart(pd.DataFrame({'数值': [0.0]})).mark_rule(color='red', opacity=0.3).encode(y='数值:Q')
+    return lines + zero
+
+
+# 运货量占比堆叠图
+def volume_share_chart(analysis_df, volume_rail_col, volume_road_col, max_points=DEFAULT_MAX_POINTS):
+    """铁路公路运货量占比堆叠面积图，没有有效运货量数据时返回None"""
+    _, volume = mode_matrix(analysis_df, {'铁路': volume_rail_col, '公路': volume_road_col})
+    shares, valid = mode_shares(volume)
+    return mode_share_chart(analysis_df['时间'].to_numpy(), shares, valid, ['铁路', '公路'], max_points,
+                            title='铁路公路运货量占比变化趋势')
+
+
+def mode_share_chart(times, shares, valid, modes, max_points=DEFAULT_MAX_POINTS, title=None):
+    """
+    多种运输方式的运货量占比堆叠面积图，没有有效数据时返回None
+
+    shares、valid 为 transport_modes.mode_shares 的结果（T × N 占比数组和有效行掩码）
+    """
+    if valid.sum() == 0:
+        return None
+    valid_times = times[valid]
+    valid_shares = shares[valid]
+    keep = downsample_indices(valid_times, list(valid_shares.T), max_points)
+    valid_times, valid_shares = valid_times[keep], valid_shares[keep]
+
+    labels = [f'{mode}占比' for mode in modes]
+    long_df = pd.DataFrame({
+        '时间': np.tile(valid_times, len(modes)),
+        '系列': np.repeat(labels, len(valid_times)),
+        '数值': valid_shares.T.ravel(),
+    })
+    return _series_chart(long_df, lambda chart: chart.mark_area(), '占比(%)',
+                         title or f"{'、'.join(modes)}运货量占比变化趋势", _colors(labels), stack='zero')
+
+
+# 相关性散点图
+def correlation_scatter_chart(corr_data, volume_rail_col, volume_road_col, correlation):
+    """铁路与公路运货量散点图，相关性较强时添加趋势线；可缩放、平移"""
+    data = pd.DataFrame({'铁路运货量(万吨)': corr_data[volume_rail_col].to_numpy(),
+                         '公路运货量(万吨)': corr_data[volume_road_col].to_numpy()})
+    points = alt.Chart(data, title='铁路与公路运货量散点图', height=CHART_HEIGHT).mark_circle(
+        color='purple', opacity=0.7, size=50).encode(
+        x=alt.X('铁路运货量(万吨):Q', scale=alt.Scale(zero=False)),
+        y=alt.Y('公路运货量(万吨):Q', scale=alt.Scale(zero=False)),
+        tooltip=['铁路运货量(万吨):Q', '公路运货量(万吨):Q'],
+    ).interactive()
+
+    # 添加趋势线（仅当有足够数据点且相关性较强时）
+    if correlation is None or len(data) <= 2 or abs(correlation) <= 0.3:
+        return points
+    trend = points.transform_regression('铁路运货量(万吨)', '公路运货量(万吨)').mark_line(
+        color='red', strokeDash=[6, 4]).encode(tooltip=alt.value(f'趋势线 (r={correlation:.3f})'))
+    return points + trend
+
+
+# 运输方式相关系数热力图
+def correlation_matrix_chart(corr):
+    """运输方式之间的相关系数矩阵，corr 为以运输方式为行列的数据框"""
+    modes = list(corr.columns)
+    values = corr.to_numpy()
+    data = pd.DataFrame({
+        '行': np.repeat(modes, len(modes)),
+        '列': np.tile(modes, len(modes)),
+        '相关系数': values.ravel(),
+    })
+    data['标签'] = [('N/A' if np.isnan(v) else f'{v:.2f}') for v in data['相关系数']]
+    base = alt.Chart(data, title='各运输方式运货量相关系数').encode(
+        x=alt.X('列:N', sort=modes, title=None),
+        y=alt.Y('行:N', sort=modes, title=None),
+    )
+    cells = base.mark_rect().encode(
+        color=alt.Color('相关系数:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1], reverse=True)),
+        tooltip=['行:N', '列:N', alt.Tooltip('相关系数:Q', format='.4f')],
+    )
+    text = base.mark_text().encode(
+        text='标签:N',
+        color=alt.condition(alt.expr.abs(alt.datum['相关系数']) > 0.6, alt.value('white'), alt.value('black')),
+    )
+    size = max(240, 70 * len(modes))
+    return (cells + text).properties(width=size, height=size)
+
+
+# 滚动相关系数图
+def rolling_correlation_chart(lead_lag, pair=0, max_points=DEFAULT_MAX_POINTS):
+    """各窗口的滚动相关系数和扩展窗口相关系数，lead_lag 为 lead_lag_analysis 的结果"""
+    times = lead_lag['times']
+    series = {f"{window}期滚动": lead_lag['rolling'][i][:, pair] for i, window in enumerate(lead_lag['windows'])}
+    series['扩展窗口'] = lead_lag['expanding'][:, pair]
+    keep = downsample_indices(times, [np.nan_to_num(values) for values in series.values()], max_points)
+    long_df = pd.DataFrame({
+        '时间': np.tile(times[keep], len(series)),
+        '系列': np.repeat(list(series), len(keep)),
+        '数值': np.concatenate([values[keep] for values in series.values()]),
+    })
+    lines = _series_chart(long_df, lambda chart: chart.mark_line(), '相关系数',
+                          f"铁路与公路{lead_lag['names'][pair]}滚动相关系数")
+    zero = alt.Chart(pd.DataFrame({'数值': [0.0]})).mark_rule(color='red', opacity=0.3).encode(y='数值:Q')
+    return lines + zero
+
+
+# 领先滞后（互相关）图
+def cross_correlation_chart(lead_lag, pair=0):
+    """滞后 -max_lag..max_lag 的互相关柱状图，绝对值最大的滞后标为红色"""
+    best_lag, _ = lead_lag['strongest'][pair]
+    data = pd.DataFrame({'滞后期数': lead_lag['lags'], '相关系数': lead_lag['ccf'][:, pair]})
+    data['最强'] = data['滞后期数'] == best_lag
+    return alt.Chart(data, title=f"铁路与公路{lead_lag['names'][pair]}领先滞后相关系数",
+                     height=CHART_HEIGHT).mark_bar().encode(
+        x=alt.X('滞后期数:O', title='滞后期数（正数表示公路领先铁路）'),
+        y=alt.Y('相关系数:Q'),
+        color=alt.condition(alt.datum['最强'], alt.value('red'), alt.value('steelblue')),
+        tooltip=['滞后期数:O', alt.Tooltip('相关系数:Q', format='.4f')],
+    )
@@ -0,0 +1,442 @@
+"""
+铁路公路运货量分析的数据处理流程（不依赖 Streamlit）
+
+railway_road_analysis.py（Streamlit 界面）和 railway_cli.py（命令行批处理）
+共用这里的时间解析、列识别、清洗、相关性和统计摘要逻辑。
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from column_index import ColumnIndex, resolve_column_roles
+from diagnostics import stage
+from incremental import FrameBuffer, IncrementalTable
+from rolling_correlation import correlation_grid, cross_correlation, strongest_lag
+from stats_summary import as_matrix, column_summary, format_values, rolling_summary
+from time_parsing import parse_time_column
+from transport_modes import IncrementalModes, analyze_modes
+
+# 识别时间列的关键词
+TIME_KEYWORDS = ['时间', '日期', '年月', '月份', '时期']
+
+# 统计摘要的指标
+STATS_LABELS = ['平均值', '最大值', '最小值', '标准差', '数据量']
+# 统计摘要的分位点及名称、滚动窗口期数
+STATS_QUANTILES = (0.25, 0.5, 0.75)
+QUANTILE_LABELS = {0.25: '25%分位数', 0.5: '中位数', 0.75: '75%分位数'}
+STATS_ROLLING_WINDOW = 12
+# 滚动相关系数的窗口（期数）和领先滞后分析的最大滞后期数
+CORRELATION_WINDOWS = (12, 24, 36)
+MAX_CORRELATION_LAG = 24
+
+# 数据至少有这么多行时 refresh_dataset 才做增量刷新，更少时完整重算更快
+INCREMENTAL_MIN_ROWS = 2000
+# 增量刷新的数据源：{数据源键（如文件绝对路径）: _IncrementalSource}，由 _incremental_lock 保护
+_incremental_sources = {}
+_incremental_lock = threading.Lock()
+
+
+# 数据预处理函数
+def preprocess_data(df):
+    """
+    预处理数据，主要处理时间列
+
+    返回 (处理后的数据框, 提示信息列表)，提示信息为 (级别, 文本)，级别是 'info' 或 'warning'
+    """
+    messages = []
+    # 自动识别时间列
+    position = ColumnIndex(df.columns).first_containing(TIME_KEYWORDS)
+
+    if position is None:
+        messages.append(('warning', "未发现时间相关列，使用索引作为时间参考"))
+        df['时间'] = pd.date_range(start='2000-01-01', periods=len(df), freq='M')
+        return df, messages
+
+    time_col = df.columns[position]
+    messages.append(('info', f"使用 '{time_col}' 作为时间列"))
+
+    # 应用时间转换
+    original_len = len(df)
+    with stage('parse_time_column', rows=original_len):
+        df['时间'] = parse_time_column(df[time_col])
+
+    # 清理数据
+    with stage('清理并排序', rows=original_len):
+        cleaned_df = df.dropna(subset=['时间']).copy()
+        cleaned_df = cleaned_df.sort_values(by='时间').reset_index(drop=True)
+
+    # 检查数据损失
+    if len(cleaned_df) < original_len:
+        messages.append(('warning', f"时间格式转换后数据损失: {original_len - len(cleaned_df)} 行"))
+
+    return cleaned_df, messages
+
+
+# 改进的列名匹配函数
+def find_matching_columns(df, keywords, exclude_keywords=None):
+    """根据关键词列表查找匹配的列名（需要多次查找时直接使用 ColumnIndex 或 resolve_column_roles）"""
+    return ColumnIndex(df.columns).best_match(keywords, exclude_keywords)
+
+
+def detect_mode_columns(df, mode):
+    """识别某种运输方式（如 '铁路'）的当期值/累计值/同比增长/累计增长列，只返回找到的列"""
+    return resolve_column_roles(df.columns, (mode,))[mode]
+
+
+def volume_column(columns):
+    """运货量列：优先当期值，其次累计值"""
+    return columns.get('当期值') or columns.get('累计值')
+
+
+def growth_column(columns):
+    """增长率列：优先同比增长，其次累计增长"""
+    return columns.get('同比增长') or columns.get('累计增长')
+
+
+def _column_info(df):
+    return pd.DataFrame({
+        '列索引': range(len(df.columns)),
+        '列名': df.columns,
+        '数据类型': df.dtypes.astype(str)
+    })
+
+
+def _role_columns(roles):
+    """所有运输方式识别到的数据列（去重，保持顺序）"""
+    return list(dict.fromkeys(col for mode_columns in roles.values() for col in mode_columns.values()))
+
+
+def _analysis_rows(df_processed, roles):
+    """去除铁路、公路运货量缺失行后的数据，找不到运货量列时为 None"""
+    volume_rail_col = volume_column(roles['铁路'])
+    volume_road_col = volume_column(roles['公路'])
+    if not (volume_rail_col and volume_road_col):
+        return None
+    return df_processed.dropna(subset=[volume_rail_col, volume_road_col, '时间']).copy()
+
+
+def _dataset(df_processed, analysis_df, mode_analysis, raw_shape, col_info, messages, roles):
+    return {
+        'raw_shape': raw_shape,
+        'col_info': col_info,
+        'processed': df_processed,
+        'rail': roles['铁路'],
+        'road': roles['公路'],
+        'modes': roles,
+        'mode_analysis': mode_analysis,
+        'analysis': analysis_df,
+        'messages': messages,
+    }
+
+
+def _build_dataset(df_processed, raw_shape, col_info, messages, roles):
+    """由预处理后的数据和识别到的列组装 prepare_dataset 的结果"""
+    # 确保识别到的数据列都是数值类型（一次性转换，切换数据类型时无需重复）
+    with stage('数值转换', rows=len(df_processed)):
+        for col in _role_columns(roles):
+            df_processed[col] = pd.to_numeric(df_processed[col], errors='coerce')
+
+    # 移除运货量为NaN的行
+    analysis_df = _analysis_rows(df_processed, roles)
+
+    with stage('运输方式对比', rows=len(df_processed)):
+        mode_analysis = analyze_modes(df_processed, roles)
+
+    return _dataset(df_processed, analysis_df, mode_analysis, raw_shape, col_info, messages, roles)
+
+
+def prepare_dataset(df):
+    """
+    从原始数据框得到可分析的数据
+
+    返回字典：
+    raw_shape / col_info - 原始数据的形状和列信息
+    processed - 时间解析、排序后的数据
+    rail / road - 识别到的铁路、公路数据列
+    modes - 所有运输方式的数据列 {运输方式: {数据类型: 列名}}
+    mode_analysis - 各运输方式运货量的占比、同比增长和相关系数矩阵（见 transport_modes.analyze_modes）
+    analysis - 去除运货量缺失行后的数据（找不到运货量列时为 None）
+    messages - 预处理过程中的提示信息
+    """
+    col_info = _column_info(df)
+    raw_shape = df.shape
+
+    # 预处理数据
+    df_processed, messages = preprocess_data(df)
+
+    # 智能识别相关列（铁路、公路以及文件中的其他运输方式一次解析，列结构相同的文件直接复用结果）
+    with stage('列识别'):
+        roles = resolve_column_roles(df_processed.columns, ('铁路', '公路'), discover=True)
+    return _build_dataset(df_processed, raw_shape, col_info, messages, roles)
+
+
+def _railway_converter(time_col, numeric_cols):
+    """IncrementalTable 的行转换函数：解析时间列，数据列转为数值"""
+    def convert(rows):
+        rows['时间'] = parse_time_column(rows[time_col])
+        for col in numeric_cols:
+            rows[col] = pd.to_numeric(rows[col], errors='coerce')
+        return rows
+    return convert
+
+
+class _IncrementalSource:
+    """
+    一个数据源的增量状态：IncrementalTable 和由它派生的分析数据
+
+    refresh 和读取结果都在 lock 内进行，多个会话同时刷新同一个数据源时不会重复追加，
+    也不会读到只更新了一半的状态。
+    """
+
+    def __init__(self, table, roles):
+        self.table = table
+        self.roles = roles
+        self.lock = threading.Lock()
+        self.analysis = None              # 去除运货量缺失行后的数据（FrameBuffer），没有运货量列时为 None
+        self.modes = None                 # IncrementalModes
+
+    def refresh(self, df):
+        """刷新表格，并只对新增的行更新派生数据；返回 IncrementalTable.refresh 的结果"""
+        status = self.table.refresh(df)
+        frame = self.table.frame
+        if status[0] == 'full' or self.modes is None:
+            with stage('运输方式对比', rows=len(frame)):
+                analysis = _analysis_rows(frame, self.roles)
+                self.analysis = FrameBuffer(analysis) if analysis is not None else None
+                self.modes = IncrementalModes(frame, self.roles)
+        elif status[0] == 'append':
+            new_rows = frame.iloc[len(frame) - status[1]:]
+            with stage('运输方式对比', rows=len(new_rows)):
+                if self.analysis is not None:
+                    self.analysis.append(_analysis_rows(new_rows, self.roles))
+                self.modes.extend(new_rows)
+        return status
+
+    def snapshot(self):
+        """(processed, analysis, mode_analysis, moments)：之后的刷新不会改变它们"""
+        analysis = self.analysis.frame() if self.analysis is not None else None
+        return self.table.frame, analysis, self.modes.result(), self.table.moments.copy()
+
+
+def _incremental_source(source_key, time_col, value_cols, require, roles):
+    """取出数据源的增量状态，列结构变化或第一次加载时新建"""
+    with _incremental_lock:
+        source = _incremental_sources.get(source_key)
+        table = source.table if source is not None else None
+        if (table is None or table.key_col != time_col or table.value_cols != value_cols
+                or table.require != require or source.roles != roles):
+            table = IncrementalTable(_railway_converter(time_col, value_cols), time_col, value_cols, require)
+            source = _IncrementalSource(table, roles)
+            _incremental_sources[source_key] = source
+        return source
+
+
+def refresh_dataset(source_key, df):
+    """
+    与 prepare_dataset 结果相同，但同一数据源再次加载时只处理新增的月份
+
+    source_key 标识数据源（如文件的绝对路径）。上次处理过的行没有变化时，
+    只解析新增行并追加；统计摘要和相关系数由累计量（RunningMoments）更新，
+    运输方式对比和去除缺失行后的分析数据也只计算新增的行，不必重新扫描全部数据。
+    可以在多个线程（Streamlit 会话）中同时调用。结果中额外包含：
+    moments - 参与分析的行上各数据列的累计统计量（副本，之后的刷新不会改变它）
+    refresh - IncrementalTable.refresh 的返回值，如 ('append', 1)
+
+    数据少于 INCREMENTAL_MIN_ROWS 行时，增量处理的固定开销（每次几十次 pandas 调用）
+    比完整重算还大，直接调用 prepare_dataset（refresh 为 ('full', 行数)，没有 moments）。
+
+    返回的 processed / analysis 与增量状态共用只读数据，调用方不能原地修改（会报错），
+    需要修改时先 copy()。
+    """
+    position = ColumnIndex(df.columns).first_containing(TIME_KEYWORDS)
+    if position is None or len(df) < INCREMENTAL_MIN_ROWS:
+        dataset = prepare_dataset(df)
+        dataset['refresh'] = ('full', len(dataset['processed']))
+        return dataset
+    time_col = df.columns[position]
+
+    # 预处理后的列 = 原始列（+ 新增的 '时间' 列）
+    columns = list(df.columns) + ([] if '时间' in df.columns else ['时间'])
+    with stage('列识别'):
+        roles = resolve_column_roles(columns, ('铁路', '公路'), discover=True)
+    value_cols = _role_columns(roles)
+    volumes = [volume_column(roles['铁路']), volume_column(roles['公路'])]
+    require = volumes if all(volumes) else []
+
+    source = _incremental_source(source_key, time_col, value_cols, require, roles)
+    with source.lock:
+        with stage('增量刷新', rows=len(df)) as record:
+            status = source.refresh(df)
+            record['note'] = f'{status[0]}，处理 {status[1]} 行'
+        frame, analysis, mode_analysis, moments = source.snapshot()
+
+    messages = [('info', f"使用 '{time_col}' 作为时间列")]
+    if len(frame) < len(df):
+        messages.append(('warning', f"时间格式转换后数据损失: {len(df) - len(frame)} 行"))
+
+    dataset = _dataset(frame, analysis, mode_analysis, df.shape, _column_info(df), messages, roles)
+    dataset['moments'] = moments
+    dataset['refresh'] = status
+    return dataset
+
+
+def clear_incremental_cache(source_key=None):
+    """清除增量刷新的状态；source_key 为 None 时清空全部"""
+    with _incremental_lock:
+        if source_key is None:
+            _incremental_sources.clear()
+        else:
+            _incremental_sources.pop(source_key, None)
+
+
+def available_data_types(valid_rail, valid_road):
+    """铁路和公路都有的数据类型"""
+    return list(set(valid_rail.keys()) & set(valid_road.keys()))
+
+
+def volume_correlation(dataset, volume_rail_col, volume_road_col):
+    """两列运货量的相关系数：有累计统计量（refresh_dataset 的结果）时直接读取，否则重新计算"""
+    moments = dataset.get('moments')
+    if moments is not None:
+        return moments.correlation(volume_rail_col, volume_road_col)
+    return compute_correlation(dataset['analysis'], volume_rail_col, volume_road_col)[1]
+
+
+# 计算两列运货量的相关系数
+def compute_correlation(analysis_df, volume_rail_col, volume_road_col):
+    """返回 (去除缺失值后的数据, 相关系数)，数据不足两行时相关系数为None"""
+    corr_data = analysis_df[[volume_rail_col, volume_road_col]].dropna()
+    if len(corr_data) < 2:
+        return corr_data, None
+    return corr_data, np.corrcoef(corr_data[volume_rail_col], corr_data[volume_road_col])[0, 1]
+
+
+def lead_lag_analysis(analysis_df, pairs, windows=CORRELATION_WINDOWS, max_lag=MAX_CORRELATION_LAG):
+    """
+    铁路与公路数据的滚动相关、扩展相关和领先滞后分析
+
+    pairs: {名称: (铁路列, 公路列)}，如 {'运货量': (...), '增长率': (...)}；所有序列对、
+    所有窗口和滞后一次批量计算（rolling_correlation，基于累计和，代价与窗口长度无关）。
+    窗口和滞后按行计算，analysis_df 需按时间升序（月度数据即为月数）。
+
+    返回字典：
+    times - 时间；names - 序列对名称；windows - 窗口列表
+    rolling - (窗口数 × T × 序列对数) 的滚动相关系数；expanding - (T × 序列对数) 的扩展相关系数
+    lags / ccf - 滞后 -max_lag..max_lag 及全样本互相关 (滞后数 × 序列对数)；
+    滞后 k > 0 表示公路领先铁路 k 期（铁路第 t 期与公路第 t - k 期的相关系数）
+    strongest - 每个序列对绝对值最大的互相关 [(滞后, 相关系数)]
+    """
+    names = list(pairs)
+    rail = as_matrix(analysis_df, [pairs[name][0] for name in names])
+    road = as_matrix(analysis_df, [pairs[name][1] for name in names])
+    grid = correlation_grid(rail, road, list(windows) + [None], [0])
+    lags, ccf = cross_correlation(rail, road, max_lag)
+    return {
+        'times': analysis_df['时间'].to_numpy(),
+        'names': names,
+        'windows': list(windows),
+        'rolling': grid[:-1, 0],
+        'expanding': grid[-1, 0],
+        'lags': lags,
+        'ccf': ccf,
+        'strongest': strongest_lag(lags, ccf),
+    }
+
+
+def describe_lead_lag(lag, correlation):
+    """领先滞后关系的文字描述"""
+    if lag is None:
+        return "数据不足，无法判断领先滞后关系"
+    if lag == 0:
+        relation = "同期相关最强"
+    elif lag > 0:
+        relation = f"公路领先铁路 {lag} 期"
+    else:
+        relation = f"铁路领先公路 {-lag} 期"
+    return f"{relation}（相关系数 {correlation:.4f}）"
+
+
+def describe_correlation(correlation):
+    """相关性描述，如 '强正相关'"""
+    # 判断相关性强度
+    if abs(correlation) > 0.7:
+        strength = "强"
+    elif abs(correlation) > 0.3:
+        strength = "中等"
+    else:
+        strength = "弱"
+
+    relation = "正" if correlation > 0 else "负"
+    return f"{strength}{relation}相关"
+
+
+def build_export_frame(analysis_df, railway_col, road_col, railway_growth_col=None, road_growth_col=None):
+    """导出用的数据：时间格式化为 YYYY-MM"""
+    export_columns = ['时间', railway_col, road_col]
+
+    if railway_growth_col:
+        export_columns.append(railway_growth_col)
+    if road_growth_col:
+        export_columns.append(road_growth_col)
+
+    export_df = analysis_df[export_columns].copy()
+    # 格式化时间列
+    export_df['时间'] = export_df['时间'].dt.strftime('%Y-%m')
+    return export_df
+
+
+def build_stats_table(analysis_df, railway_col, road_col, railway_growth_col=None, road_growth_col=None,
+                      moments=None, quantiles=STATS_QUANTILES, rolling_window=STATS_ROLLING_WINDOW):
+    """
+    统计摘要表：各列的平均值、最大值、最小值、标准差、数据量、分位数和滚动窗口统计，
+    数值格式化为两位小数
+
+    所有列一起排成 T × N 数组，每个指标是一次按列的归约（stats_summary），
+    不再对每一列分别调用 mean()、max() 等。
+    moments 为 refresh_dataset 结果中的累计统计量，给出时基本指标直接读取；
+    quantiles 为分位点（0-1），rolling_window 为滚动窗口的期数，为空时不输出对应的行。
+    """
+    named_columns = [('铁路运货量', railway_col), ('公路运货量', road_col)]
+    # 增长率统计（如果存在）
+    if railway_growth_col:
+        named_columns.append(('铁路增长率(%)', railway_growth_col))
+    if road_growth_col:
+        named_columns.append(('公路增长率(%)', road_growth_col))
+    columns = [col for _, col in named_columns]
+    quantiles = quantiles or ()
+
+    labels = list(STATS_LABELS)
+    need_data = moments is None or len(quantiles) or rolling_window
+    values = as_matrix(analysis_df, columns) if need_data else None
+    if moments is not None:
+        rows = [moments.mean()[columns], moments.maximum()[columns], moments.minimum()[columns],
+                moments.std()[columns], moments.count()[columns]]
+        rows = [row.to_numpy(dtype=np.float64) for row in rows]
+        summary = column_summary(values, quantiles) if len(quantiles) else {}
+    else:
+        summary = column_summary(values, quantiles)
+        rows = [summary['mean'], summary['max'], summary['min'], summary['std'], summary['count']]
+
+    # 分位数
+    for q in quantiles:
+        labels.append(QUANTILE_LABELS.get(q, f'{q * 100:g}%分位数'))
+        rows.append(summary[q])
+
+    # 滚动窗口：最近一个窗口的均值、标准差，以及各窗口均值的最高、最低值
+    if rolling_window:
+        rolling_mean, rolling_std = rolling_summary(values, rolling_window)
+        labels += [f'近{rolling_window}期平均值', f'近{rolling_window}期标准差',
+                   f'{rolling_window}期滚动平均最高', f'{rolling_window}期滚动平均最低']
+        if len(values):
+            window_summary = column_summary(rolling_mean)
+            rows += [rolling_mean[-1], rolling_std[-1], window_summary['max'], window_summary['min']]
+        else:
+            rows += [np.full(len(columns), np.nan)] * 4
+
+    # 整张表一次格式化
+    text = format_values(np.vstack(rows))
+    stats_data = {'指标': labels}
+    for i, (name, _) in enumerate(named_columns):
+        stats_data[name] = text[:, i]
+    return pd.DataFrame(stats_data)
@@ -1,51 +1,54 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
 from datetime import datetime
+from functools import partial
 import os
-import io
-import re
-import platform
-import matplotlib.font_manager as fm
-
-# 设置中文字体函数
-def setup_chinese_font():
-    """设置中文字体，解决中文显示问题"""
-    system = platform.system()
-    
-    # 尝试的字体列表（按优先级排序）
-    if system == "Windows":
-        font_candidates = ["SimHei", "Microsoft YaHei", "KaiTi", "FangSong", "Arial Unicode MS"]
-    elif system == "Darwin":  # macOS
-        font_candidates = ["Heiti TC", "STHeiti", "PingFang SC", "Hiragino Sans GB", "Arial Unicode MS"]
-    else:  # Linux
-        font_candidates = ["WenQuanYi Micro Hei", "WenQuanYi Zen Hei", "DejaVu Sans", "Arial Unicode MS"]
-    
-    # 检查系统中可用的字体
-    available_fonts = []
-    for font in font_candidates:
-        try:
-            # 检查字体是否可用
-            if font in [f.name for f in fm.fontManager.ttflist]:
-                available_fonts.append(font)
-        except:
-            pass
-    
-    if available_fonts:
-        # 使用第一个可用的字体
-        plt.rcParams["font.family"] = available_fonts
-        st.info(f"使用字体: {available_fonts[0]}")
-    else:
-        # 如果找不到中文字体，使用默认字体并显示警告
-        plt.rcParams["font.family"] = ["sans-serif"]
-        st.warning("未找到中文字体，图表中的中文可能无法正常显示")
-    
-    plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-    plt.rcParams['xtick.labelsize'] = 8
+import sys
+import hashlib
 
-# 应用字体设置
-setup_chinese_font()
+# 仓库根目录下的公共模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from columnar_cache import load_excel_cached, file_checksum
+from diagnostics import Profile, available_profilers, stage, start_recording, stop_recording
+from plot_settings import DEFAULT_MAX_POINTS, resolve_chinese_fonts
+from railway_pipeline import (prepare_dataset as run_pipeline, refresh_dataset, available_data_types,
+                              volume_column, growth_column, compute_correlation, volume_correlation,
+                              describe_correlation, build_export_frame, build_stats_table, lead_lag_analysis,
+                              describe_lead_lag, MAX_CORRELATION_LAG)
+from shared_cache import SharedDatasetCache
+from streaming_export import EXPORT_FORMATS, available_formats, export_file_name, export_temp_file
+from transport_modes import mode_summary
+
+# 预处理结果的共享缓存预算（所有会话共用，按文件内容区分，超出后淘汰最久未用的）
+SHARED_CACHE_BUDGET_MB = 512
+# 图表渲染结果缓存的最大条目数
+FIGURE_CACHE_SIZE = 64
+# 性能诊断日志的默认路径（JSON Lines，每次重跑一行）
+DIAGNOSTICS_LOG_PATH = "railway_diagnostics.jsonl"
+
+# 可选的图表及其标题
+CHART_TITLES = {
+    'volume': '铁路公路运货量对比',
+    'growth': '增长率变化趋势',
+    'share': '铁路公路运货量占比分析',
+    'scatter': '铁路与公路运货量散点图',
+}
+# 各运输方式对比的图表
+MODE_CHART_TITLES = {'share': '运货量占比', 'corr': '相关系数矩阵'}
+# 滚动相关与领先滞后的图表
+LEAD_LAG_CHART_TITLES = {'rolling': '滚动相关系数', 'cross': '领先滞后相关'}
+# 图表渲染方式：服务器用 matplotlib 渲染图片，或把数据发给浏览器用 Vega-Lite 渲染
+CHART_BACKENDS = {
+    'static': '静态图片（服务器渲染）',
+    'interactive': '交互式（浏览器渲染）',
+}
+
+# 查找中文字体（结果缓存在磁盘上；matplotlib 等到第一次绘图时才导入并应用字体）
+chinese_fonts = resolve_chinese_fonts()
+if chinese_fonts:
+    st.info(f"使用字体: {chinese_fonts[0]}")
+else:
+    st.warning("未找到中文字体，图表中的中文可能无法正常显示")
 
 # 设置页面配置
 st.set_page_config(
@@ -70,180 +73,214 @@ elif file_option == "指定路径":
     default_path = "C:/Users/Shitianyaa/Python/data/national_data/铁路运输.xls"
     excel_path = st.sidebar.text_input("文件路径", default_path)
 
+# 图表设置 - 点数超过预算时自动降采样
+st.sidebar.subheader("图表设置")
+max_points = st.sidebar.number_input("图表最大点数（0表示不降采样，精确绘制）", min_value=0,
+                                     value=DEFAULT_MAX_POINTS, step=500)
+chart_backend = st.sidebar.radio("图表渲染方式", list(CHART_BACKENDS), format_func=CHART_BACKENDS.get,
+                                 help="交互式图表可缩放、平移、点击图例显示/隐藏系列，这些操作和切换图表都在浏览器中完成，"
+                                      "不会让服务器重新运行和绘图")
+
+# 性能诊断 - 默认关闭，关闭时各环节的计时几乎没有开销
+st.sidebar.subheader("性能诊断")
+show_diagnostics = st.sidebar.checkbox("记录各环节耗时")
+diagnostics_log = None
+profile_kind = None
+if show_diagnostics:
+    if st.sidebar.checkbox("写入日志文件"):
+        diagnostics_log = st.sidebar.text_input("日志文件路径", DIAGNOSTICS_LOG_PATH)
+    profiler_choice = st.sidebar.selectbox("性能分析器", available_profilers())
+    # 按钮只在点击后的这一次重跑中为 True，所以只分析这一次重跑
+    if st.sidebar.button("分析一次重跑"):
+        profile_kind = profiler_choice
+
 # 检查文件可用性
 if (file_option == "指定路径" and not os.path.exists(excel_path)) or (file_option == "上传文件" and not uploaded_file):
     st.error("请提供有效的Excel文件")
     st.stop()
 
-# 数据加载函数
-@st.cache_data
+# 数据加载函数（只在预处理结果不在共享缓存中时调用；本地文件由列式缓存避免重复解析）
 def load_data(file_source):
     """加载并返回数据框"""
     try:
-        if isinstance(file_source, str):  # 文件路径
-            return pd.read_excel(file_source)
-        else:  # 上传的文件
-            return pd.read_excel(file_source)
+        with stage('load_data') as record:
+            if isinstance(file_source, str):  # 文件路径，使用列式缓存避免重复解析xls
+                df = load_excel_cached(file_source)
+            else:  # 上传的文件
+                df = pd.read_excel(file_source)
+            record['rows'] = len(df)
+        return df
     except Exception as e:
         st.error(f"读取文件失败: {str(e)}")
         st.stop()
 
-# 改进的时间解析函数
-def parse_time_column(time_series):
-    """改进的时间列解析函数"""
-    results = []
-    formats = ['%Y年%m月', '%Y-%m', '%Y/%m', '%Y%m', '%Y年%m', '%Y.%m']
-    
-    for time_val in time_series:
-        if pd.isna(time_val):
-            results.append(pd.NaT)
-            continue
-            
-        # 如果是datetime类型直接返回
-        if isinstance(time_val, datetime):
-            results.append(time_val)
-            continue
-            
-        time_str = str(time_val).strip()
-        
-        # 尝试直接解析为datetime
-        try:
-            parsed = pd.to_datetime(time_str)
-            results.append(parsed)
-            continue
-        except:
-            pass
-        
-        # 尝试各种格式
-        parsed = None
-        for fmt in formats:
-            try:
-                parsed = datetime.strptime(time_str, fmt)
-                break
-            except:
-                continue
-        
-        # 尝试提取年份和月份
-        if parsed is None:
-            # 查找4位数字年份
-            year_match = re.search(r'(\d{4})', time_str)
-            if year_match:
-                year = int(year_match.group(1))
-                # 查找月份
-                month_match = re.search(r'[^\d](\d{1,2})[^\d]', time_str.replace(year_match.group(1), ''))
-                month = int(month_match.group(1)) if month_match else 1
-                try:
-                    parsed = datetime(year, month, 1)
-                except:
-                    parsed = None
-        
-        results.append(parsed if parsed is not None else pd.NaT)
-    
-    return pd.Series(results, index=time_series.index)
+# 计算文件内容哈希，作为预处理缓存的键
+def file_content_key(file_source):
+    """返回文件内容的SHA1（上传文件按字节计算，本地文件按路径读取）"""
+    if isinstance(file_source, str):
+        return file_checksum(file_source)
+    return hashlib.sha1(file_source.getvalue()).hexdigest()
 
-# 数据预处理函数
-def preprocess_data(df):
-    """预处理数据，主要处理时间列"""
-    # 自动识别时间列
-    time_cols = [col for col in df.columns if any(keyword in str(col) for keyword in ['时间', '日期', '年月', '月份', '时期'])]
-    
-    if not time_cols:
-        st.warning("未发现时间相关列，使用索引作为时间参考")
-        df['时间'] = pd.date_range(start='2000-01-01', periods=len(df), freq='M')
-        return df
-    
-    time_col = time_cols[0]
-    st.info(f"使用 '{time_col}' 作为时间列")
-    
-    # 应用时间转换
-    original_len = len(df)
-    df['时间'] = parse_time_column(df[time_col])
-    
-    # 清理数据
-    cleaned_df = df.dropna(subset=['时间']).copy()
-    cleaned_df = cleaned_df.sort_values(by='时间').reset_index(drop=True)
-    
-    # 检查数据损失
-    if len(cleaned_df) < original_len:
-        st.warning(f"时间格式转换后数据损失: {original_len - len(cleaned_df)} 行")
-    
-    return cleaned_df
+# 所有会话共用的预处理结果缓存（进程内只有一个）
+@st.cache_resource
+def shared_dataset_cache():
+    return SharedDatasetCache(SHARED_CACHE_BUDGET_MB * 2 ** 20)
 
-# 改进的列名匹配函数
-def find_matching_columns(df, keywords, exclude_keywords=None):
-    """根据关键词列表查找匹配的列名"""
-    if exclude_keywords is None:
-        exclude_keywords = []
-    
-    best_match = None
-    best_score = 0
-    
-    for col in df.columns:
-        col_str = str(col).lower()
-        
-        # 排除包含排除关键词的列
-        if any(exclude in col_str for exclude in exclude_keywords):
-            continue
-            
-        # 计算匹配分数
-        score = sum(1 for keyword in keywords if keyword.lower() in col_str)
-        
-        # 如果所有关键词都匹配，并且分数更高，则更新最佳匹配
-        if score == len(keywords) and score > best_score:
-            best_match = col
-            best_score = score
-        # 如果部分匹配，但分数更高，也考虑
-        elif score > best_score:
-            best_match = col
-            best_score = score
-    
-    return best_match
+# 从原始文件到可分析数据的完整流程（按文件内容哈希在所有会话间共享）
+def prepare_dataset(content_key, file_source):
+    """
+    加载、预处理并清洗数据，同时识别铁路/公路数据列
+
+    content_key 是文件内容哈希，只有它参与缓存键；切换数据类型等界面操作
+    不会触发重新解析和清洗。多个会话打开同一个文件时，结果只保存一份（只读），
+    每个会话拿到的是不复制数据的视图。返回 (数据, 是否命中缓存)
+    """
+    def build():
+        with st.spinner("正在解析和清洗数据..."):
+            df = load_data(file_source)
+            if isinstance(file_source, str):
+                # 本地文件每月追加新数据时，只处理新增的月份
+                return refresh_dataset(os.path.abspath(file_source), df)
+            return run_pipeline(df)
+
+    return shared_dataset_cache().get(content_key, build)
+
+# 按需渲染单个图表（按文件内容哈希、数据类型和图表类型缓存）
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner="正在绘制图表...")
+def render_chart(content_key, data_type, chart_kind, max_points, _analysis_df, _columns):
+    """把图表渲染为PNG字节，没有可绘制的数据时返回None"""
+    from railway_charts import (setup_chinese_font, plot_volume_comparison, plot_growth_trend, plot_volume_share,
+                                plot_correlation_scatter, figure_to_bytes)
+
+    setup_chinese_font()
+    if chart_kind == 'volume':
+        fig = plot_volume_comparison(_analysis_df, _columns['railway'], _columns['road'], data_type, max_points)
+    elif chart_kind == 'growth':
+        fig = plot_growth_trend(_analysis_df, _columns['railway_growth'], _columns['road_growth'], data_type,
+                                max_points)
+    elif chart_kind == 'share':
+        fig = plot_volume_share(_analysis_df, _columns['volume_rail'], _columns['volume_road'], max_points)
+    else:
+        corr_data, correlation = compute_correlation(_analysis_df, _columns['volume_rail'], _columns['volume_road'])
+        fig = plot_correlation_scatter(corr_data, _columns['volume_rail'], _columns['volume_road'], correlation)
+    return figure_to_bytes(fig) if fig is not None else None
+
+# 多种运输方式对比图（按文件内容哈希和图表类型缓存）
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner="正在绘制图表...")
+def render_mode_chart(content_key, chart_kind, max_points, _mode_analysis):
+    """把运输方式占比图或相关系数矩阵渲染为PNG字节，没有可绘制的数据时返回None"""
+    from railway_charts import setup_chinese_font, plot_mode_shares, plot_correlation_matrix, figure_to_bytes
+
+    setup_chinese_font()
+    if chart_kind == 'share':
+        fig = plot_mode_shares(_mode_analysis['times'], _mode_analysis['shares'], _mode_analysis['valid'],
+                               _mode_analysis['modes'], max_points)
+    else:
+        fig = plot_correlation_matrix(_mode_analysis['corr'])
+    return figure_to_bytes(fig) if fig is not None else None
+
+# 滚动相关与领先滞后图（按文件内容哈希、图表类型和序列对缓存）
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner="正在绘制图表...")
+def render_lead_lag_chart(content_key, chart_kind, pair, max_points, _lead_lag):
+    """把滚动相关系数图或领先滞后相关图渲染为PNG字节"""
+    from railway_charts import setup_chinese_font, plot_rolling_correlation, plot_cross_correlation, figure_to_bytes
+
+    setup_chinese_font()
+    if chart_kind == 'rolling':
+        fig = plot_rolling_correlation(_lead_lag, pair, max_points)
+    else:
+        fig = plot_cross_correlation(_lead_lag, pair)
+    return figure_to_bytes(fig)
+
+# 交互式图表（只构建 Vega-Lite 描述和降采样后的数据，渲染在浏览器中完成）
+def interactive_chart(data_type, chart_kind, max_points, analysis_df, columns):
+    """返回单个图表的 Altair 对象，没有可绘制的数据时返回None"""
+    from railway_interactive import volume_chart, growth_chart, volume_share_chart, correlation_scatter_chart
+
+    if chart_kind == 'volume':
+        return volume_chart(analysis_df, columns['railway'], columns['road'], data_type, max_points)
+    if chart_kind == 'growth':
+        return growth_chart(analysis_df, columns['railway_growth'], columns['road_growth'], data_type, max_points)
+    if chart_kind == 'share':
+        return volume_share_chart(analysis_df, columns['volume_rail'], columns['volume_road'], max_points)
+    corr_data, correlation = compute_correlation(analysis_df, columns['volume_rail'], columns['volume_road'])
+    return correlation_scatter_chart(corr_data, columns['volume_rail'], columns['volume_road'], correlation)
+
+def interactive_mode_chart(chart_kind, max_points, mode_analysis):
+    """运输方式占比图或相关系数矩阵的 Altair 对象，没有可绘制的数据时返回None"""
+    from railway_interactive import mode_share_chart, correlation_matrix_chart
+
+    if chart_kind == 'share':
+        return mode_share_chart(mode_analysis['times'], mode_analysis['shares'], mode_analysis['valid'],
+                                mode_analysis['modes'], max_points)
+    return correlation_matrix_chart(mode_analysis['corr'])
+
+def interactive_lead_lag_chart(chart_kind, pair, max_points, lead_lag):
+    """滚动相关系数图或领先滞后相关图的 Altair 对象"""
+    from railway_interactive import rolling_correlation_chart, cross_correlation_chart
+
+    if chart_kind == 'rolling':
+        return rolling_correlation_chart(lead_lag, pair, max_points)
+    return cross_correlation_chart(lead_lag, pair)
+
+# 显示本次重跑的性能诊断，并按需写入日志
+def report_diagnostics(recorder, profile, log_path, **context):
+    """在可折叠面板中显示各环节的耗时、行数和内存变化，以及性能分析报告"""
+    records = recorder.summary()
+    if log_path:
+        try:
+            recorder.write_log(log_path, **context)
+        except OSError as e:
+            st.warning(f"写入诊断日志失败: {str(e)}")
+    with st.expander(f"性能诊断（本次重跑 {recorder.total_seconds() * 1000:.1f} ms）", expanded=profile is not None):
+        if records:
+            st.dataframe(pd.DataFrame({
+                '环节': ['　' * r['depth'] + r['stage'] for r in records],
+                '耗时(ms)': [round(r['seconds'] * 1000, 2) for r in records],
+                '行数': [r['rows'] for r in records],
+                '内存变化(MB)': [None if r['rss_delta'] is None else round(r['rss_delta'] / 2 ** 20, 2)
+                               for r in records],
+                '说明': [r.get('error') or r['note'] for r in records],
+            }), hide_index=True)
+            st.caption("带缓存的环节命中缓存时，内部的环节不会出现")
+        if profile is not None:
+            st.write(f"{profile.kind} 分析报告:")
+            st.code(profile.report)
 
 # 主逻辑
+recorder = start_recording() if show_diagnostics else None
+profile = Profile(profile_kind).start() if profile_kind else None
+content_key = None
 try:
-    # 加载数据
-    df = load_data(excel_path if file_option == "指定路径" else uploaded_file)
+    # 加载并预处理数据（同一文件内容只处理一次）
+    file_source = excel_path if file_option == "指定路径" else uploaded_file
+    with stage('文件内容哈希'):
+        content_key = file_content_key(file_source)
+    with stage('prepare_dataset') as record:
+        dataset, cache_hit = prepare_dataset(content_key, file_source)
+        cache_stats = shared_dataset_cache().stats()
+        record['note'] = (f"{'共享缓存命中' if cache_hit else '新建并放入共享缓存'}，"
+                          f"缓存 {cache_stats['entries']} 个文件 / {cache_stats['bytes'] / 2 ** 20:.1f} MB")
+    for level, message in dataset['messages']:
+        getattr(st, level)(message)
+    df_processed = dataset['processed']
+    valid_rail = dataset['rail']
+    valid_road = dataset['road']
     
     # 显示原始数据信息
     st.subheader("原始数据信息")
-    st.write(f"数据形状: {df.shape} (行: {df.shape[0]}, 列: {df.shape[1]})")
+    raw_shape = dataset['raw_shape']
+    st.write(f"数据形状: {raw_shape} (行: {raw_shape[0]}, 列: {raw_shape[1]})")
     
     # 显示列信息
     with st.expander("原始列名及数据类型", expanded=False):
-        col_info = pd.DataFrame({
-            '列索引': range(len(df.columns)),
-            '列名': df.columns,
-            '数据类型': df.dtypes.astype(str)
-        })
-        st.dataframe(col_info)
-    
-    # 预处理数据
-    df_processed = preprocess_data(df)
+        st.dataframe(dataset['col_info'])
     
     # 显示处理后的数据预览
     with st.expander("处理后的数据预览", expanded=False):
         st.dataframe(df_processed.head(10))
         st.write(f"处理后数据形状: {df_processed.shape}")
     
-    # 智能识别相关列 - 改进的匹配逻辑
-    railway_columns = {
-        '当期值': find_matching_columns(df_processed, ['铁路', '货运量', '当期'], exclude_keywords=['增长', '同比', '累计']),
-        '累计值': find_matching_columns(df_processed, ['铁路', '货运量', '累计'], exclude_keywords=['增长', '同比']),
-        '同比增长': find_matching_columns(df_processed, ['铁路', '货运量', '同比', '增长']),
-        '累计增长': find_matching_columns(df_processed, ['铁路', '货运量', '累计', '增长'])
-    }
-    
-    road_columns = {
-        '当期值': find_matching_columns(df_processed, ['公路', '货运量', '当期'], exclude_keywords=['增长', '同比', '累计']),
-        '累计值': find_matching_columns(df_processed, ['公路', '货运量', '累计'], exclude_keywords=['增长', '同比']),
-        '同比增长': find_matching_columns(df_processed, ['公路', '货运量', '同比', '增长']),
-        '累计增长': find_matching_columns(df_processed, ['公路', '货运量', '累计', '增长'])
-    }
-    
-    # 检查并过滤不存在的列 - 修复这里的语法错误
-    valid_rail = {k: v for k, v in railway_columns.items() if v is not None}
-    valid_road = {k: v for k, v in road_columns.items() if v is not None}  # 修复这里：使用冒号而不是逗号
-    
     # 显示找到的列信息
     st.subheader("识别到的数据列")
     col1, col2 = st.columns(2)
@@ -263,7 +300,7 @@ try:
     
     # 用户选择数据类型
     st.subheader("数据分析配置")
-    available_types = list(set(valid_rail.keys()) & set(valid_road.keys()))
+    available_types = available_data_types(valid_rail, valid_road)
     if not available_types:
         st.error("没有可对比的数据分析类型")
         st.stop()
@@ -275,231 +312,156 @@ try:
     road_col = valid_road[data_type]
     
     # 确保使用运货量数据而不是增长率数据进行占比和相关性分析
-    volume_rail_col = valid_rail.get('当期值') or valid_rail.get('累计值')
-    volume_road_col = valid_road.get('当期值') or valid_road.get('累计值')
+    volume_rail_col = volume_column(valid_rail)
+    volume_road_col = volume_column(valid_road)
     
     # 验证数据列存在
     if not volume_rail_col or not volume_road_col:
         st.error("无法找到运货量数据列进行占比和相关性分析")
         st.stop()
     
-    # 确保数据是数值类型
-    for col in [railway_col, road_col, volume_rail_col, volume_road_col]:
-        df_processed[col] = pd.to_numeric(df_processed[col], errors='coerce')
-    
-    # 移除包含NaN的行
-    analysis_df = df_processed.dropna(subset=[volume_rail_col, volume_road_col, '时间']).copy()
+    analysis_df = dataset['analysis']
     
     if len(analysis_df) == 0:
         st.error("运货量数据无效，无法进行分析")
         st.stop()
     
-    # 可视化部分 - 运货量对比
-    st.subheader("铁路公路运货量对比")
-    fig, ax = plt.subplots(figsize=(12, 6))
-    width = 0.35
-    x = np.arange(len(analysis_df['时间']))
-    
-    # 绘制运货量
-    ax.bar(x - width/2, analysis_df[railway_col], width, label='铁路运货量', alpha=0.7, color='blue')
-    ax.bar(x + width/2, analysis_df[road_col], width, label='公路运货量', alpha=0.7, color='orange')
+    # 增长率列（如果存在）
+    railway_growth_col = growth_column(valid_rail)
+    road_growth_col = growth_column(valid_road)
     
-    # 设置图表属性
-    ax.set_xlabel('时间')
-    ax.set_ylabel('运货量(万吨)')
-    ax.set_title(f'铁路公路{data_type}对比')
-    ax.legend(loc='upper left')
-    
-    # 动态调整x轴刻度
-    step = max(1, len(analysis_df) // 15)
-    ax.set_xticks(x[::step])
-    ax.set_xticklabels([t.strftime('%Y-%m') for t in analysis_df['时间'][::step]], rotation=30, ha='right')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
-    
-    # 增长率趋势图（如果存在增长率列）
-    railway_growth_col = valid_rail.get('同比增长') or valid_rail.get('累计增长')
-    road_growth_col = valid_road.get('同比增长') or valid_road.get('累计增长')
+    # 使用运货量数据进行相关性分析
+    correlation = volume_correlation(dataset, volume_rail_col, volume_road_col)
     
+    # 可视化部分
+    st.subheader("图表分析")
+    chart_kinds = ['volume']
     if railway_growth_col or road_growth_col:
-        st.subheader("增长率变化趋势")
-        fig2, ax2 = plt.subplots(figsize=(12, 6))
-        
-        if railway_growth_col:
-            # 确保增长率列是数值类型
-            analysis_df[railway_growth_col] = pd.to_numeric(analysis_df[railway_growth_col], errors='coerce')
-            ax2.plot(analysis_df['时间'], analysis_df[railway_growth_col], marker='o', label='铁路增长率(%)', color='blue')
-        
-        if road_growth_col:
-            # 确保增长率列是数值类型
-            analysis_df[road_growth_col] = pd.to_numeric(analysis_df[road_growth_col], errors='coerce')
-            ax2.plot(analysis_df['时间'], analysis_df[road_growth_col], marker='s', label='公路增长率(%)', color='orange')
-        
-        ax2.axhline(y=0, color='r', linestyle='-', alpha=0.3)
-        ax2.set_xlabel('时间')
-        ax2.set_ylabel('增长率(%)')
-        ax2.set_title(f'铁路公路运货量{data_type}增长率变化趋势')
-        ax2.legend()
-        
-        plt.gcf().autofmt_xdate(rotation=30)
-        plt.tight_layout()
-        st.pyplot(fig2)
-    
-    # 修正的堆叠图分析 - 使用运货量数据
-    st.subheader("铁路公路运货量占比分析")
-    fig3, ax3 = plt.subplots(figsize=(12, 6))
-    
-    # 使用运货量数据而不是增长率数据
-    total = analysis_df[volume_rail_col] + analysis_df[volume_road_col]
-    
-    # 处理除零问题
-    valid_mask = total > 0
-    if valid_mask.sum() == 0:
-        st.warning("运货量数据全为零，无法计算占比")
+        chart_kinds.append('growth')
+    chart_kinds.append('share')
+    if correlation is not None:
+        chart_kinds.append('scatter')
+    
+    chart_columns = {
+        'railway': railway_col, 'road': road_col,
+        'railway_growth': railway_growth_col, 'road_growth': road_growth_col,
+        'volume_rail': volume_rail_col, 'volume_road': volume_road_col,
+    }
+    if chart_backend == 'interactive':
+        # 所有图表放在标签页中一次发送给浏览器，切换图表、缩放和切换系列都不触发重跑
+        for tab, kind in zip(st.tabs([CHART_TITLES[k] for k in chart_kinds]), chart_kinds):
+            with tab:
+                with stage(f'interactive_chart（{kind}）', rows=len(analysis_df)):
+                    chart = interactive_chart(data_type, kind, max_points, analysis_df, chart_columns)
+                if chart is not None:
+                    st.altair_chart(chart, width='stretch')
+                elif kind == 'share':
+                    st.warning("运货量数据全为零，无法计算占比")
     else:
-        railway_percentage = np.where(valid_mask, (analysis_df[volume_rail_col] / total) * 100, 0)
-        road_percentage = np.where(valid_mask, (analysis_df[volume_road_col] / total) * 100, 0)
-        
-        # 只使用有效数据
-        valid_times = analysis_df['时间'][valid_mask]
-        valid_rail_pct = railway_percentage[valid_mask]
-        valid_road_pct = road_percentage[valid_mask]
+        # 只渲染当前选择的图表，渲染结果按(文件内容, 数据类型, 图表)缓存
+        chart_kind = st.radio("选择图表", chart_kinds, format_func=CHART_TITLES.get, horizontal=True)
+        # 占比图和散点图只使用运货量数据，与所选数据类型无关，可以共用缓存
+        chart_data_type = data_type if chart_kind in ('volume', 'growth') else None
+        with stage(f'render_chart（{chart_kind}）', rows=len(analysis_df)):
+            chart_image = render_chart(content_key, chart_data_type, chart_kind, max_points, analysis_df,
+                                       chart_columns)
         
-        if len(valid_times) > 0:
-            ax3.stackplot(valid_times, valid_rail_pct, valid_road_pct, 
-                         labels=['铁路占比', '公路占比'], colors=['blue', 'orange'], alpha=0.8)
-            ax3.set_xlabel('时间')
-            ax3.set_ylabel('占比(%)')
-            ax3.set_title('铁路公路运货量占比变化趋势')
-            ax3.legend(loc='upper left')
-            
-            plt.gcf().autofmt_xdate(rotation=30)
-            plt.tight_layout()
-            st.pyplot(fig3)
-        else:
-            st.warning("没有有效的运货量数据进行占比分析")
+        if chart_image is not None:
+            with stage('st.image'):
+                st.image(chart_image)
+        elif chart_kind == 'share':
+            st.warning("运货量数据全为零，无法计算占比")
     
     # 修正的相关性分析 - 使用运货量数据
     st.subheader("相关性分析")
     
-    # 使用运货量数据进行相关性分析
-    corr_data = analysis_df[[volume_rail_col, volume_road_col]].dropna()
-    
-    if len(corr_data) < 2:
+    if correlation is None:
         st.warning("数据量不足，无法进行相关性分析")
     else:
-        # 计算相关系数
-        correlation = np.corrcoef(corr_data[volume_rail_col], corr_data[volume_road_col])[0, 1]
-        
-        # 判断相关性强度
-        if abs(correlation) > 0.7:
-            strength = "强"
-        elif abs(correlation) > 0.3:
-            strength = "中等"
-        else:
-            strength = "弱"
-        
-        relation = "正" if correlation > 0 else "负"
-        
         st.write(f"铁路与公路运货量相关系数: {correlation:.4f}")
-        st.write(f"相关性: {strength}{relation}相关")
-        
-        fig4, ax4 = plt.subplots(figsize=(10, 6))
-        ax4.scatter(corr_data[volume_rail_col], corr_data[volume_road_col], alpha=0.7, color='purple')
-        ax4.set_xlabel(f'铁路运货量(万吨)')
-        ax4.set_ylabel(f'公路运货量(万吨)')
-        ax4.set_title('铁路与公路运货量散点图')
-        
-        # 添加趋势线（仅当有足够数据点且相关性较强时）
-        if len(corr_data) > 2 and abs(correlation) > 0.3:
-            z = np.polyfit(corr_data[volume_rail_col], corr_data[volume_road_col], 1)
-            p = np.poly1d(z)
-            ax4.plot(corr_data[volume_rail_col], p(corr_data[volume_rail_col]), "--", color='red', 
-                    label=f'趋势线 (r={correlation:.3f})')
-            ax4.legend()
-        
-        plt.tight_layout()
-        st.pyplot(fig4)
+        st.write(f"相关性: {describe_correlation(correlation)}")
+
+        # 滚动相关与领先滞后：运货量和（两边都有时）增长率一起批量计算
+        correlation_pairs = {'运货量': (volume_rail_col, volume_road_col)}
+        if railway_growth_col and road_growth_col:
+            correlation_pairs['增长率'] = (railway_growth_col, road_growth_col)
+        with stage('领先滞后分析', rows=len(analysis_df)):
+            lead_lag = lead_lag_analysis(analysis_df, correlation_pairs)
+        st.markdown(f"**滚动相关与领先滞后**（滚动窗口 {'、'.join(map(str, lead_lag['windows']))} 期，"
+                    f"滞后 ±{MAX_CORRELATION_LAG} 期）")
+        for name, (lag, lag_corr) in zip(lead_lag['names'], lead_lag['strongest']):
+            st.write(f"{name}: {describe_lead_lag(lag, lag_corr)}")
+        pair = 0
+        if len(lead_lag['names']) > 1:
+            pair = st.selectbox("滚动相关的数据", range(len(lead_lag['names'])),
+                                format_func=lambda i: lead_lag['names'][i])
+        for tab, kind in zip(st.tabs(list(LEAD_LAG_CHART_TITLES.values())), LEAD_LAG_CHART_TITLES):
+            with tab:
+                if chart_backend == 'interactive':
+                    with stage(f'interactive_lead_lag_chart（{kind}）'):
+                        chart = interactive_lead_lag_chart(kind, pair, max_points, lead_lag)
+                    st.altair_chart(chart, width='stretch')
+                else:
+                    with stage(f'render_lead_lag_chart（{kind}）'):
+                        lead_lag_image = render_lead_lag_chart(content_key, kind, pair, max_points, lead_lag)
+                    with stage('st.image'):
+                        st.image(lead_lag_image)
+    
+    # 所有运输方式的对比（铁路、公路之外还有水运、民航等列时显示）
+    mode_analysis = dataset['mode_analysis']
+    if len(mode_analysis['modes']) > 2:
+        st.subheader("各运输方式对比")
+        st.write(f"识别到的运输方式: {'、'.join(mode_analysis['modes'])}")
+        st.dataframe(mode_summary(mode_analysis))
+        if chart_backend == 'interactive':
+            for tab, kind in zip(st.tabs(list(MODE_CHART_TITLES.values())), MODE_CHART_TITLES):
+                with tab:
+                    with stage(f'interactive_mode_chart（{kind}）'):
+                        chart = interactive_mode_chart(kind, max_points, mode_analysis)
+                    if chart is not None:
+                        st.altair_chart(chart, width='stretch' if kind == 'share' else 'content')
+                    elif kind == 'share':
+                        st.warning("运货量数据全为零，无法计算占比")
+        else:
+            mode_chart = st.radio("选择对比图表", list(MODE_CHART_TITLES), horizontal=True,
+                                  format_func=MODE_CHART_TITLES.get)
+            with stage(f'render_mode_chart（{mode_chart}）'):
+                mode_image = render_mode_chart(content_key, mode_chart, max_points, mode_analysis)
+            if mode_image is not None:
+                with stage('st.image'):
+                    st.image(mode_image)
+            elif mode_chart == 'share':
+                st.warning("运货量数据全为零，无法计算占比")
     
     # 数据导出功能
     st.subheader("数据导出")
-    export_columns = ['时间', railway_col, road_col]
-    
-    if railway_growth_col:
-        export_columns.append(railway_growth_col)
-    if road_growth_col:
-        export_columns.append(road_growth_col)
-    
-    export_df = analysis_df[export_columns].copy()
-    # 格式化时间列
-    export_df['时间'] = export_df['时间'].dt.strftime('%Y-%m')
-    csv = export_df.to_csv(index=False).encode('utf-8')
+    export_format = st.selectbox("导出格式", available_formats(), format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+    with stage('导出数据', rows=len(analysis_df)):
+        export_df = build_export_frame(analysis_df, railway_col, road_col, railway_growth_col, road_growth_col)
+    # 文件在点击下载时才按块生成，不在每次重跑时把整份 CSV 放进内存
     st.download_button(
-        label="下载分析数据 (CSV)",
-        data=csv,
-        file_name=f"铁路公路运货量分析_{data_type}_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv",
+        label=f"下载分析数据 ({EXPORT_FORMATS[export_format][0]})",
+        data=partial(export_temp_file, export_df, export_format),
+        file_name=export_file_name(f"铁路公路运货量分析_{data_type}_{datetime.now().strftime('%Y%m%d')}", export_format),
+        mime=EXPORT_FORMATS[export_format][2],
     )
     
     # 统计摘要
     st.subheader("统计摘要")
     
-    # 准备统计数据
-    stats_data = {'指标': ['平均值', '最大值', '最小值', '标准差', '数据量']}
-    
-    # 铁路运货量统计
-    rail_stats = [
-        analysis_df[railway_col].mean(),
-        analysis_df[railway_col].max(),
-        analysis_df[railway_col].min(),
-        analysis_df[railway_col].std(),
-        analysis_df[railway_col].count()
-    ]
-    stats_data['铁路运货量'] = rail_stats
-    
-    # 公路运货量统计
-    road_stats = [
-        analysis_df[road_col].mean(),
-        analysis_df[road_col].max(),
-        analysis_df[road_col].min(),
-        analysis_df[road_col].std(),
-        analysis_df[road_col].count()
-    ]
-    stats_data['公路运货量'] = road_stats
-    
-    # 增长率统计（如果存在）
-    if railway_growth_col:
-        rail_growth_stats = [
-            analysis_df[railway_growth_col].mean(),
-            analysis_df[railway_growth_col].max(),
-            analysis_df[railway_growth_col].min(),
-            analysis_df[railway_growth_col].std(),
-            analysis_df[railway_growth_col].count()
-        ]
-        stats_data['铁路增长率(%)'] = rail_growth_stats
-    
-    if road_growth_col:
-        road_growth_stats = [
-            analysis_df[road_growth_col].mean(),
-            analysis_df[road_growth_col].max(),
-            analysis_df[road_growth_col].min(),
-            analysis_df[road_growth_col].std(),
-            analysis_df[road_growth_col].count()
-        ]
-        stats_data['公路增长率(%)'] = road_growth_stats
-    
-    # 创建统计表格
-    stats_df = pd.DataFrame(stats_data)
-    
-    # 格式化数值
-    for col in stats_df.columns[1:]:
-        stats_df[col] = stats_df[col].apply(
-            lambda x: f"{x:.2f}" if isinstance(x, (int, float)) and not np.isnan(x) else "N/A"
-        )
-    
+    with stage('统计摘要', rows=len(analysis_df)):
+        stats_df = build_stats_table(analysis_df, railway_col, road_col, railway_growth_col, road_growth_col,
+                                     dataset.get('moments'))
     st.dataframe(stats_df)
     
 except Exception as e:
     st.error(f"处理数据时出错: {str(e)}")
-    st.exception(e)
\ No newline at end of file
+    st.exception(e)
+finally:
+    # st.stop() 提前结束时也会执行，保证分析器被关闭
+    if profile is not None:
+        profile.stop()
+    if recorder is not None:
+        stop_recording()
+        report_diagnostics(recorder, profile, diagnostics_log, source=excel_path or getattr(uploaded_file, 'name', None),
+                           content_key=content_key)
\ No newline at end of file
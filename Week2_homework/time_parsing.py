@@ -0,0 +1,100 @@
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 逐个尝试的时间格式（与原逐行解析的顺序一致）
+TIME_FORMATS = ['%Y年%m月', '%Y-%m', '%Y/%m', '%Y%m', '%Y年%m', '%Y.%m']
+
+# 可以整列批量解析的格式：这些格式能匹配的字符串，逐行解析时要么
+# pd.to_datetime 直接失败（含中文），要么得到完全相同的结果。
+# 纯数字的 '%Y%m' 不在其中：pd.to_datetime 会把 '190101' 这类字符串
+# 解析成别的日期，所以纯数字只能走逐个解析的兜底路径。
+BULK_FORMATS = ['%Y年%m月', '%Y年%m', '%Y-%m', '%Y/%m', '%Y.%m', '%Y-%m-%d']
+
+
+def parse_time_value(time_val):
+    """解析单个时间值（原逐行解析逻辑），失败时返回 NaT"""
+    if pd.isna(time_val):
+        return pd.NaT
+
+    # 如果是datetime类型直接返回
+    if isinstance(time_val, datetime):
+        return time_val
+
+    time_str = str(time_val).strip()
+
+    # 尝试直接解析为datetime
+    try:
+        return pd.to_datetime(time_str)
+    except:
+        pass
+
+    # 尝试各种格式
+    parsed = None
+    for fmt in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(time_str, fmt)
+            break
+        except:
+            continue
+
+    # 尝试提取年份和月份
+    if parsed is None:
+        # 查找4位数字年份
+        year_match = re.search(r'(\d{4})', time_str)
+        if year_match:
+            year = int(year_match.group(1))
+            # 查找月份
+            month_match = re.search(r'[^\d](\d{1,2})[^\d]', time_str.replace(year_match.group(1), ''))
+            month = int(month_match.group(1)) if month_match else 1
+            try:
+                parsed = datetime(year, month, 1)
+            except:
+                parsed = None
+
+    return parsed if parsed is not None else pd.NaT
+
+
+def parse_time_column(time_series):
+    """
+    向量化的时间列解析函数，结果与逐行调用 parse_time_value 一致
+
+    处理步骤：
+    1. 对整列做 factorize，只解析不重复的取值（月度数据通常只有几百个）
+    2. 用 Series.str 统一去除首尾空白
+    3. 按 BULK_FORMATS 逐个格式整批调用 pd.to_datetime(format=..., errors='coerce')
+    4. 剩余解析不了的取值才交给 parse_time_value 做正则年月提取
+    5. 按 factorize 的编码把结果映射回原来的每一行
+    """
+    if len(time_series) == 0:
+        return pd.Series([], index=time_series.index)
+
+    codes, uniques = pd.factorize(time_series)
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype=object)
+
+    # datetime类型直接保留
+    is_datetime = uniques.map(lambda v: isinstance(v, datetime)).astype(bool)
+    parsed[is_datetime] = uniques[is_datetime]
+
+    # 统一转为去空白的字符串后按格式批量解析
+    time_strs = uniques[~is_datetime].astype(str).str.strip()
+    remaining = time_strs[~time_strs.str.fullmatch(r'\d+')]
+    for fmt in BULK_FORMATS:
+        if remaining.empty:
+            break
+        converted = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        hit = converted.notna()
+        parsed[hit[hit].index] = converted[hit]
+        remaining = remaining[~hit]
+
+    # 纯数字及其他格式的取值逐个解析（包括正则年月提取）
+    leftover = time_strs.index.difference(parsed.index[parsed.notna()])
+    for i in leftover:
+        parsed[i] = parse_time_value(uniques[i])
+
+    # 末尾补一个 NaT 供缺失值（编码为 -1）使用
+    values = pd.Series(list(parsed) + [pd.NaT])
+    return pd.Series(values.to_numpy()[codes], index=time_series.index)
@@ -0,0 +1,188 @@
+"""
+多种运输方式的对比分析
+
+把各运输方式的运货量排成 (时间 T × 运输方式 N) 的数组，占比、同比增长和
+相关系数矩阵都是对整个数组的一次矩阵运算，运输方式增加时不需要逐对计算。
+"""
+import numpy as np
+import pandas as pd
+
+from incremental import AppendBuffer, RunningMoments
+
+
+def mode_matrix(df, mode_columns):
+    """
+    取出各运输方式的数值列
+
+    参数:
+    df: 数据框
+    mode_columns: {运输方式: 列名}，如 {'铁路': '铁路货运量当期值(万吨)', ...}
+
+    返回:
+    (运输方式列表, T × N 的 float64 数组)
+    """
+    modes = list(mode_columns)
+    if not modes:
+        return modes, np.empty((len(df), 0))
+    values = df[[mode_columns[mode] for mode in modes]].apply(pd.to_numeric, errors='coerce')
+    return modes, values.to_numpy(dtype=np.float64)
+
+
+def mode_shares(matrix):
+    """
+    各运输方式占合计的百分比
+
+    返回 (占比数组, 有效行掩码)：某一行合计不大于 0 或含缺失值时该行无效，占比为 NaN
+    """
+    total = matrix.sum(axis=1)
+    valid = total > 0
+    shares = np.full(matrix.shape, np.nan)
+    shares[valid] = matrix[valid] / total[valid, None] * 100
+    return shares, valid
+
+
+def mode_growth(matrix, times, periods=12, start=0):
+    """
+    按日期对齐的同比增长率(%)
+
+    times 为升序的月份日期，每行与 periods 个月之前的同一行比较；
+    缺月、上年同期不存在或为 0 时结果为 NaN。
+    start: 只计算第 start 行及之后的行（增量追加时用），返回 (T - start) × N 数组
+    """
+    times = np.asarray(times)
+    months = times.astype('datetime64[M]')
+    target = months[start:] - periods
+    # 上年同月第一天在 times 中的插入位置，那一行在同一个月份时找到
+    pos = np.searchsorted(times, target.astype(times.dtype))
+    clipped = np.minimum(pos, max(len(times) - 1, 0))
+    found = (pos < len(times)) & (months[clipped] == target) if len(times) else np.zeros(0, dtype=bool)
+
+    rows = matrix[start:]
+    growth = np.full(rows.shape, np.nan)
+    base = matrix[pos[found]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[found] = np.where(base != 0, (rows[found] / base - 1) * 100, np.nan)
+    return growth
+
+
+def correlation_matrix(matrix, min_periods=2):
+    """
+    两两相关系数矩阵，每一对只使用两者都有数据的行（与 DataFrame.corr() 一致）
+
+    计数、和、平方和、交叉积全部由有效值掩码的矩阵乘法一次得到；
+    共同数据少于 min_periods 行或方差为 0 的组合为 NaN。
+    """
+    valid = ~np.isnan(matrix)
+    # 先减去列均值，减小舍入误差（相关系数不受平移影响）
+    means = np.nansum(matrix, axis=0) / np.maximum(valid.sum(axis=0), 1)
+    x = np.where(valid, matrix - means, 0.0)
+    mask = valid.astype(np.float64)
+
+    count = mask.T @ mask                 # n_ij
+    sums = x.T @ mask                     # 第 i 列在 (i, j) 共同行上的和
+    squares = (x * x).T @ mask            # 第 i 列在 (i, j) 共同行上的平方和
+    cross = x.T @ x                       # 交叉积之和
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = cross - sums * sums.T / count
+        var_i = squares - sums ** 2 / count
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr[count < min_periods] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def analyze_modes(df, mode_roles, role='当期值', growth_periods=12):
+    """
+    对所有有 role 数据列的运输方式做对比分析
+
+    参数:
+    df: 预处理后的数据框（含 '时间' 列，按时间升序）
+    mode_roles: {运输方式: {数据类型: 列名}}，即 resolve_column_roles 的结果
+    role: 参与对比的数据类型，缺少时使用 '累计值'
+
+    返回字典：
+    modes - 运输方式列表；times - 时间；volume - T × N 运货量
+    shares / valid - 占比(%) 及有效行；growth - 同比增长(%)；corr - 相关系数数据框
+    """
+    columns = {mode: roles.get(role) or roles.get('累计值') for mode, roles in mode_roles.items()}
+    columns = {mode: col for mode, col in columns.items() if col}
+    modes, volume = mode_matrix(df, columns)
+    times = df['时间'].to_numpy()
+    shares, valid = mode_shares(volume)
+    return {
+        'modes': modes,
+        'columns': columns,
+        'times': times,
+        'volume': volume,
+        'shares': shares,
+        'valid': valid,
+        'growth': mode_growth(volume, times, growth_periods),
+        'corr': pd.DataFrame(correlation_matrix(volume), index=modes, columns=modes),
+    }
+
+
+class IncrementalModes:
+    """
+    analyze_modes 的增量版本：时间在已有数据之后的新增行只计算新增的部分
+
+    时间、运货量、占比、有效行和同比增长放在 incremental.AppendBuffer 中（容量翻倍，
+    追加的均摊代价与新增行数成正比），相关系数矩阵由运货量的 RunningMoments 给出。
+    result() 返回与对全部数据调用 analyze_modes 相同的字典，其中的数组是只读视图，
+    之后的追加不会改变已经取出的结果。
+    """
+
+    def __init__(self, df, mode_roles, role='当期值', growth_periods=12):
+        result = analyze_modes(df, mode_roles, role, growth_periods)
+        self.modes = result['modes']
+        self.columns = result['columns']
+        self.growth_periods = growth_periods
+        self._arrays = {key: AppendBuffer(result[key]) for key in ('times', 'volume', 'shares', 'valid', 'growth')}
+        self.moments = RunningMoments(self.modes).update(result['volume'])
+
+    def extend(self, new_rows):
+        """追加新增的行（预处理后的数据框，按时间升序，时间在已有数据之后）"""
+        start = len(self._arrays['times'])
+        volume_new = mode_matrix(new_rows, self.columns)[1]
+        shares_new, valid_new = mode_shares(volume_new)
+        self._arrays['times'].extend(new_rows['时间'].to_numpy())
+        self._arrays['volume'].extend(volume_new)
+        self._arrays['shares'].extend(shares_new)
+        self._arrays['valid'].extend(valid_new)
+        self._arrays['growth'].extend(mode_growth(self._arrays['volume'].view(), self._arrays['times'].view(),
+                                                  self.growth_periods, start=start))
+        self.moments.update(volume_new)
+        return self
+
+    def result(self):
+        return {
+            'modes': self.modes,
+            'columns': self.columns,
+            **{key: buffer.view() for key, buffer in self._arrays.items()},
+            'corr': pd.DataFrame(self.moments.corr().to_numpy(), index=self.modes, columns=self.modes),
+        }
+
+
+def mode_summary(result):
+    """
+    各运输方式的汇总表：平均占比、最近一期占比和最近一期同比增长
+
+    result 为 analyze_modes 的返回值；数值保留两位小数
+    """
+    shares, growth = result['shares'][result['valid']], result['growth']
+    n_modes = len(result['modes'])
+    empty = np.full(n_modes, np.nan)
+
+    # 每种运输方式最近一个有同比数据的行
+    has_growth = ~np.isnan(growth)
+    last_row = len(growth) - 1 - np.argmax(has_growth[::-1], axis=0) if len(growth) else np.zeros(n_modes, int)
+    latest_growth = np.where(has_growth.any(axis=0), growth[last_row, np.arange(n_modes)] if len(growth) else empty,
+                             np.nan)
+
+    summary = pd.DataFrame({
+        '运输方式': result['modes'],
+        '数据列': [result['columns'][mode] for mode in result['modes']],
+        '平均占比(%)': shares.mean(axis=0) if len(shares) else empty,
+        '最近一期占比(%)': shares[-1] if len(shares) else empty,
+        '最近一期同比增长(%)': latest_growth,
+    })
+    return summary.round(2)
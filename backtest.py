@@ -0,0 +1,187 @@
+"""
+均线交叉策略的批量回测
+
+每只股票的回测是纯向量运算（simulate_ma_crossover），多只股票 × 多组参数的
+扫描通过进程池并行：收盘价宽表只复制一次到共享内存，子进程按名字挂载后直接
+得到 numpy 视图，不需要序列化传递 DataFrame。
+
+用法：
+    python backtest.py Python/data --fast 5 10 20 --slow 30 60 120 --stop 0 0.05 0.1 --output 回测结果.csv
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from indicators import sma
+
+# 每年交易日数，用于年化
+TRADING_DAYS = 252
+
+
+def _forward_fill(x):
+    """一维数组的前向填充（停牌日沿用前一个收盘价）"""
+    valid = ~np.isnan(x)
+    idx = np.where(valid, np.arange(len(x)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    return x[idx]
+
+
+def simulate_ma_crossover(close, fast_ma, slow_ma, stop_loss=0.0, fee=0.0):
+    """
+    向量化模拟单只股票的均线交叉策略（只做多）
+
+    参数:
+    close: 收盘价一维数组（按日期升序，无缺失）
+    fast_ma, slow_ma: 与 close 等长的快、慢均线
+    stop_loss: float - 止损比例，如 0.05 表示自入场价下跌 5% 离场，直到下一次金叉；0 表示不止损
+    fee: float - 每次换手的费率
+
+    返回:
+    (每日策略收益率, 每日持仓)，当日收益按前一日收盘时的持仓计算
+    """
+    signal = (fast_ma > slow_ma).astype(np.int8)
+
+    if stop_loss:
+        # 每段连续持仓的入场价
+        entry = (signal == 1) & (np.concatenate([[0], signal[:-1]]) == 0)
+        segment = np.cumsum(entry)
+        entry_price = np.where(entry, close, np.nan)[np.maximum.accumulate(np.where(entry, np.arange(len(close)), 0))]
+        hit = (signal == 1) & (close <= entry_price * (1 - stop_loss))
+        # 同一段内只要触发过止损，之后一直空仓
+        hits = np.cumsum(hit)
+        hits_before = np.concatenate([[0], hits])[np.searchsorted(segment, segment, side='left')]
+        signal = np.where(hits - hits_before > 0, 0, signal).astype(np.int8)
+
+    position = np.concatenate([[0], signal[:-1]])
+    returns = np.concatenate([[0.0], close[1:] / close[:-1] - 1])
+    turnover = np.abs(np.diff(np.concatenate([[0], position])))
+    return position * returns - fee * turnover, position
+
+
+def summarize_returns(strategy_returns, position):
+    """由每日收益率和持仓计算总收益、年化收益、夏普比率、最大回撤、持仓天数和交易次数"""
+    equity = np.cumprod(1 + strategy_returns)
+    total = equity[-1] - 1 if len(equity) else 0.0
+    years = len(strategy_returns) / TRADING_DAYS
+    annual = (1 + total) ** (1 / years) - 1 if years > 0 and total > -1 else np.nan
+    std = strategy_returns.std()
+    sharpe = strategy_returns.mean() / std * np.sqrt(TRADING_DAYS) if std > 0 else np.nan
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else np.array([0.0])
+    return {
+        '总收益': total,
+        '年化收益': annual,
+        '夏普比率': sharpe,
+        '最大回撤': drawdown.min(),
+        '持仓天数': int(position.sum()),
+        '交易次数': int(np.count_nonzero(np.diff(position, prepend=0) == 1)),
+    }
+
+
+def backtest_ticker(close, grid, fee=0.0):
+    """
+    对一只股票跑完整个参数网格
+
+    close 中的前导/末尾缺失会被去掉，中间缺失（停牌）按前值填充；
+    所有窗口的均线只计算一次。返回每组参数一行的结果列表。
+    """
+    valid = np.flatnonzero(~np.isnan(close))
+    if len(valid) < 2:
+        return []
+    close = _forward_fill(close[valid[0]:valid[-1] + 1])
+    windows = sorted({fast for fast, _, _ in grid} | {slow for _, slow, _ in grid})
+    averages = sma(close, windows)
+
+    rows = []
+    for fast, slow, stop in grid:
+        daily, position = simulate_ma_crossover(close, averages[fast], averages[slow], stop, fee)
+        rows.append({'fast': fast, 'slow': slow, 'stop': stop, **summarize_returns(daily, position)})
+    return rows
+
+
+def _run_columns(shm_name, shape, columns, tickers, grid, fee):
+    """子进程：挂载共享内存中的收盘价数组（每行一只股票），回测指定的几行"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        results = []
+        for col, ts_code in zip(columns, tickers):
+            for row in backtest_ticker(matrix[col], grid, fee):
+                results.append({'ts_code': ts_code, **row})
+        return results
+    finally:
+        shm.close()
+
+
+def make_grid(fast_windows, slow_windows, stop_levels=(0.0,)):
+    """生成参数网格，只保留快线窗口小于慢线窗口的组合"""
+    return [(fast, slow, stop) for fast, slow, stop in itertools.product(fast_windows, slow_windows, stop_levels)
+            if fast < slow]
+
+
+def run_backtests(panel, grid, fee=0.0, max_workers=None):
+    """
+    在面板的全部股票上回测参数网格
+
+    参数:
+    panel: StockPanel - 股票面板（见 stock_panel.build_panel）
+    grid: list - make_grid 生成的 (快线, 慢线, 止损) 列表
+    fee: float - 每次换手的费率
+    max_workers: int - 进程数，默认等于 CPU 核数；为 1 时在当前进程中运行
+
+    返回:
+    每只股票 × 每组参数一行的汇总表
+    """
+    _, tickers, close = panel.to_matrix('close')
+    workers = max_workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tickers) <= 1:
+        rows = []
+        for col, ts_code in enumerate(tickers):
+            rows += [{'ts_code': ts_code, **row} for row in backtest_ticker(close[:, col], grid, fee)]
+        return pd.DataFrame(rows)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    try:
+        # 转置后每只股票的价格在内存中连续
+        shape = close.shape[::-1]
+        np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[:] = close.T
+        chunks = np.array_split(np.arange(len(tickers)), min(workers * 4, len(tickers)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_columns, shm.name, shape, list(chunk),
+                                       [tickers[i] for i in chunk], grid, fee)
+                       for chunk in chunks if len(chunk)]
+            rows = [row for future in futures for row in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows)
+
+
+def main():
+    from stock_panel import build_panel
+
+    parser = argparse.ArgumentParser(description='均线交叉策略批量回测')
+    parser.add_argument('directory', help='股票日线 CSV 所在目录')
+    parser.add_argument('--fast', type=int, nargs='+', default=[5, 10, 20])
+    parser.add_argument('--slow', type=int, nargs='+', default=[30, 60, 120])
+    parser.add_argument('--stop', type=float, nargs='+', default=[0.0])
+    parser.add_argument('--fee', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help='结果 CSV 路径，不指定时打印到终端')
+    args = parser.parse_args()
+
+    panel = build_panel(args.directory, max_workers=args.workers)
+    summary = run_backtests(panel, make_grid(args.fast, args.slow, args.stop), args.fee, args.workers)
+    if args.output:
+        summary.to_csv(args.output, index=False, encoding='utf-8-sig')
+    else:
+        print(summary.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
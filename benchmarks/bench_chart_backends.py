@@ -0,0 +1,79 @@
+"""
+图表渲染方式基准测试：服务器端 matplotlib 渲染 PNG vs 生成交互式图表的 Vega-Lite 描述
+
+交互式图表在服务器上只需要降采样并生成 JSON 描述（数据由浏览器渲染），
+之后的缩放、平移和切换系列不再占用服务器 CPU；静态图片每次都要完整渲染。
+
+用法：
+    python benchmarks/bench_chart_backends.py --rows 240 2400 24000 --max-points 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Week2_homework'))
+
+import datagen
+import railway_charts
+import railway_interactive
+from railway_pipeline import compute_correlation, growth_column, prepare_dataset, volume_column
+
+
+def static_charts(dataset, max_points):
+    analysis, rail, road = dataset['analysis'], dataset['rail'], dataset['road']
+    rail_vol, road_vol = volume_column(rail), volume_column(road)
+    corr_data, correlation = compute_correlation(analysis, rail_vol, road_vol)
+    figures = [
+        railway_charts.plot_volume_comparison(analysis, rail['当期值'], road['当期值'], '当期值', max_points),
+        railway_charts.plot_growth_trend(analysis, growth_column(rail), growth_column(road), '当期值', max_points),
+        railway_charts.plot_volume_share(analysis, rail_vol, road_vol, max_points),
+        railway_charts.plot_correlation_scatter(corr_data, rail_vol, road_vol, correlation),
+    ]
+    return sum(len(railway_charts.figure_to_bytes(fig)) for fig in figures)
+
+
+def interactive_charts(dataset, max_points):
+    analysis, rail, road = dataset['analysis'], dataset['rail'], dataset['road']
+    rail_vol, road_vol = volume_column(rail), volume_column(road)
+    corr_data, correlation = compute_correlation(analysis, rail_vol, road_vol)
+    charts = [
+        railway_interactive.volume_chart(analysis, rail['当期值'], road['当期值'], '当期值', max_points),
+        railway_interactive.growth_chart(analysis, growth_column(rail), growth_column(road), '当期值', max_points),
+        railway_interactive.volume_share_chart(analysis, rail_vol, road_vol, max_points),
+        railway_interactive.correlation_scatter_chart(corr_data, rail_vol, road_vol, correlation),
+    ]
+    return sum(len(chart.to_json()) for chart in charts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图表渲染方式基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[240, 2400, 24000])
+    parser.add_argument('--max-points', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    railway_charts.setup_chinese_font()
+    # Streamlit 用自己的数据转换器发送数据；单独运行时解除 Altair 默认的 5000 行限制
+    railway_interactive.alt.data_transformers.disable_max_rows()
+    for rows in args.rows:
+        dataset = prepare_dataset(datagen.freight_frame(rows))
+        line = f'rows={rows:>7,}'
+        for name, func in (('static', static_charts), ('interactive', interactive_charts)):
+            func(dataset, args.max_points)  # 预热（导入、字体）
+            start = time.process_time()
+            for _ in range(args.repeat):
+                size = func(dataset, args.max_points)
+            cpu = (time.process_time() - start) / args.repeat
+            line += f'  {name}: cpu={cpu * 1000:8.1f} ms  payload={size / 1024:8.1f} KB'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+列名匹配基准测试：逐列扫描的 find_matching_columns vs 倒排索引 vs 列映射缓存
+
+模拟统计局的宽表导出：每种运输方式 4 个指标列，外加大量无关指标列。
+
+用法：
+    python benchmarks/bench_column_index.py --columns 100 500 2000 --files 50
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from column_index import ROLE_SPECS, ColumnIndex, clear_column_map_cache, resolve_column_roles
+
+MODES = ('铁路', '公路', '水运', '民航')
+SUFFIXES = ('当期值(万吨)', '累计值(万吨)', '同比增长(%)', '累计增长(%)')
+
+
+def make_columns(n_columns):
+    """生成宽表列名：时间 + 各运输方式的货运量列 + 其他指标列"""
+    columns = ['时间'] + [f'{mode}货运量{suffix}' for mode in MODES for suffix in SUFFIXES]
+    i = 0
+    while len(columns) < n_columns:
+        columns.append(f'指标{i}{SUFFIXES[i % len(SUFFIXES)]}')
+        i += 1
+    return columns
+
+
+def scan_match(columns, keywords, exclude_keywords):
+    """原来的逐列扫描实现，作为对照"""
+    best_match, best_score = None, 0
+    for col in columns:
+        col_str = str(col).lower()
+        if any(exclude in col_str for exclude in exclude_keywords):
+            continue
+        score = sum(1 for keyword in keywords if keyword.lower() in col_str)
+        if score > best_score:
+            best_match, best_score = col, score
+    return best_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列名匹配基准测试')
+    parser.add_argument('--columns', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--files', type=int, default=50, help='模拟加载的文件数（列结构相同）')
+    args = parser.parse_args()
+
+    for n_columns in args.columns:
+        columns = make_columns(n_columns)
+
+        start = time.perf_counter()
+        for _ in range(args.files):
+            expected = {mode: {role: scan_match(columns, [mode] + keywords, exclude)
+                               for role, (keywords, exclude) in ROLE_SPECS.items()} for mode in MODES}
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.files):
+            index = ColumnIndex(columns)
+            indexed = {mode: {role: index.best_match([mode] + keywords, exclude)
+                              for role, (keywords, exclude) in ROLE_SPECS.items()} for mode in MODES}
+        index_time = time.perf_counter() - start
+        assert indexed == expected
+
+        clear_column_map_cache()
+        start = time.perf_counter()
+        for _ in range(args.files):
+            cached = resolve_column_roles(columns, MODES)
+        cached_time = time.perf_counter() - start
+        assert cached == expected
+        clear_column_map_cache()
+
+        print(f'columns={n_columns:>5} files={args.files}  scan={scan * 1000:8.1f} ms  '
+              f'index={index_time * 1000:8.1f} ms  cached={cached_time * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
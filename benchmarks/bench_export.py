@@ -0,0 +1,60 @@
+"""
+导出基准测试：一次性 to_csv().encode() vs 分块流式导出
+
+记录每种做法的耗时、输出大小和 tracemalloc 内存峰值。一次性导出的峰值约为
+CSV 字符串 + 字节的两倍结果大小；分块写入文件时峰值只与 chunk_rows 有关；
+写入临时文件再一次读出（网页下载的做法）时峰值约为一份结果大小。
+（tracemalloc 会让 to_csv 慢很多，耗时只作相对比较。）
+
+用法：
+    python benchmarks/bench_export.py --rows 10000 50000 --chunk-rows 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datagen
+from streaming_export import available_formats, export_bytes, export_temp_file, write_export
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--chunk-rows', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            df = datagen.freight_frame(rows)
+            path = os.path.join(tmp, 'export')
+            cases = [('to_csv().encode()', lambda: len(df.to_csv(index=False).encode('utf-8')))]
+            for fmt in available_formats():
+                cases.append((f'{fmt} -> bytes', lambda fmt=fmt: len(export_bytes(df, fmt, args.chunk_rows))))
+                cases.append((f'{fmt} -> temp file',
+                              lambda fmt=fmt: len(export_temp_file(df, fmt, args.chunk_rows).read())))
+                cases.append((f'{fmt} -> file',
+                              lambda fmt=fmt: os.path.getsize(write_export(df, path, fmt, args.chunk_rows))))
+            print(f'rows={rows:,}')
+            for name, func in cases:
+                seconds, size, peak = measure(func)
+                print(f'  {name:<20} time={seconds * 1000:9.1f} ms  size={size / 2 ** 20:8.2f} MB  '
+                      f'peak={peak / 2 ** 20:8.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+增量刷新基准测试：模拟每月新增一行，比较 refresh_dataset 与完整重算
+
+以铁路运输.xls 为底，先去掉最近 --months 个月，再逐月加回；每一步都检查
+增量结果（预处理数据、分析数据、统计摘要、相关系数、运输方式对比）与完整重算一致。
+
+用法：
+    python benchmarks/bench_incremental.py --months 12 --tile 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Week2_homework'))
+
+from columnar_cache import load_excel_cached
+from railway_pipeline import (INCREMENTAL_MIN_ROWS, build_stats_table, compute_correlation, growth_column, prepare_dataset,
+                              refresh_dataset, volume_column)
+from time_parsing import parse_time_column
+
+DEFAULT_PATH = os.path.join(ROOT, 'Week2_homework', '铁路运输.xls')
+
+
+def tile_months(df, factor):
+    """把数据按年份平移复制 factor 份，得到更长的月度序列（原始文件按时间倒序）"""
+    times = parse_time_column(df['时间'])
+    span = times.dt.year.max() - times.dt.year.min() + 1
+    copies = []
+    for i in range(factor):
+        copy = df.copy()
+        copy['时间'] = times - pd.DateOffset(years=int(i * span))
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def check(dataset, expected):
+    """增量结果与完整重算一致"""
+    pd.testing.assert_frame_equal(dataset['processed'], expected['processed'])
+    rail, road = expected['rail'], expected['road']
+    rail_vol, road_vol = volume_column(rail), volume_column(road)
+    args = (expected['analysis'], rail_vol, road_vol, growth_column(rail), growth_column(road))
+    if 'moments' in dataset:
+        pd.testing.assert_frame_equal(build_stats_table(*args, moments=dataset['moments']), build_stats_table(*args))
+        full_corr = compute_correlation(expected['analysis'], rail_vol, road_vol)[1]
+        assert np.isclose(dataset['moments'].correlation(rail_vol, road_vol), full_corr)
+    pd.testing.assert_frame_equal(dataset['analysis'], expected['analysis'])
+    modes, full_modes = dataset['mode_analysis'], expected['mode_analysis']
+    for key in ('times', 'volume', 'shares', 'valid', 'growth'):
+        assert np.array_equal(modes[key], full_modes[key], equal_nan=key != 'valid'), key
+    assert np.allclose(modes['corr'].to_numpy(), full_modes['corr'].to_numpy(), equal_nan=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量刷新基准测试')
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--months', type=int, default=12, help='逐月加回的月数')
+    parser.add_argument('--tile', type=int, default=1, help='把数据按年份复制的份数，用来模拟更长的序列')
+    args = parser.parse_args()
+
+    raw = tile_months(load_excel_cached(args.path), args.tile)
+    refresh_dataset('bench', raw.iloc[args.months:].copy())
+
+    incremental_time = full_time = 0.0
+    for k in range(args.months - 1, -1, -1):
+        current = raw.iloc[k:].reset_index(drop=True)
+        snapshot = current.copy()
+        start = time.perf_counter()
+        dataset = refresh_dataset('bench', snapshot)
+        incremental_time += time.perf_counter() - start
+        # 少于 INCREMENTAL_MIN_ROWS 行时 refresh_dataset 直接完整重算
+        expected_mode = 'append' if len(current) >= INCREMENTAL_MIN_ROWS else 'full'
+        assert dataset['refresh'][0] == expected_mode, dataset['refresh']
+
+        snapshot = current.copy()
+        start = time.perf_counter()
+        expected = prepare_dataset(snapshot)
+        full_time += time.perf_counter() - start
+        check(dataset, expected)
+
+    print(f'rows={len(raw)} months={args.months}  incremental={incremental_time / args.months * 1000:7.2f} ms/月  '
+          f'full={full_time / args.months * 1000:7.2f} ms/月  (结果一致)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+技术指标引擎基准测试：批量计算 vs 逐只股票的 pandas rolling/ewm
+
+用法：
+    python benchmarks/bench_indicators.py --days 2500 --tickers 100 1000 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import DEFAULT_EMA_SPANS, DEFAULT_SMA_WINDOWS, DEFAULT_VOL_WINDOWS, compute_indicators
+
+
+def make_prices(days, tickers, seed=0):
+    """生成随机游走的 high/low/close 宽表，每只股票的上市日期随机"""
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, tickers)), axis=0))
+    spread = np.abs(rng.normal(0, 0.01, (days, tickers))) * close
+    high, low = close + spread, close - spread
+    listed = rng.integers(0, days // 2, tickers)
+    for arr in (high, low, close):
+        arr[np.arange(days)[:, None] < listed] = np.nan
+    return high, low, close
+
+
+def pandas_indicators(high, low, close):
+    """逐只股票用 pandas 计算同样的指标，作为对照"""
+    for j in range(close.shape[1]):
+        c, h, l = pd.Series(close[:, j]), pd.Series(high[:, j]), pd.Series(low[:, j])
+        for window in DEFAULT_SMA_WINDOWS:
+            c.rolling(window).mean()
+        for span in DEFAULT_EMA_SPANS:
+            c.ewm(span=span, adjust=False).mean()
+        dif = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+        dif.ewm(span=9, adjust=False).mean()
+        change = c.diff()
+        change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+        (-change.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+        c.rolling(20).mean()
+        c.rolling(20).std(ddof=0)
+        tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+        tr.ewm(alpha=1 / 14, adjust=False).mean()
+        returns = np.log(c).diff()
+        for window in DEFAULT_VOL_WINDOWS:
+            returns.rolling(window).std()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='技术指标引擎基准测试')
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--tickers', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--pandas-limit', type=int, default=200, help='pandas 对照最多计算的股票数')
+    args = parser.parse_args()
+
+    for tickers in args.tickers:
+        high, low, close = make_prices(args.days, tickers)
+        start = time.perf_counter()
+        compute_indicators(high, low, close)
+        elapsed = time.perf_counter() - start
+        line = f'days={args.days} tickers={tickers:>6}  batched={elapsed:7.3f}s ({tickers / elapsed:9.0f} 只/秒)'
+
+        sample = min(tickers, args.pandas_limit)
+        start = time.perf_counter()
+        pandas_indicators(high[:, :sample], low[:, :sample], close[:, :sample])
+        per_ticker = (time.perf_counter() - start) / sample
+        line += f'  pandas={1 / per_ticker:7.0f} 只/秒'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+parse_time_column 基准测试：逐行解析 vs 向量化解析
+
+用法：
+    python benchmarks/bench_parse_time.py --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Week2_homework'))
+
+from time_parsing import parse_time_column, parse_time_value
+
+
+def parse_time_column_loop(time_series):
+    """原来的逐行解析实现，作为对照"""
+    return pd.Series([parse_time_value(v) for v in time_series], index=time_series.index)
+
+
+def make_time_series(rows, seed=0):
+    """生成混合多种写法的月度时间列（含少量缺失值和无法解析的值）"""
+    rng = np.random.default_rng(seed)
+    months = [(y, m) for y in range(1949, 2026) for m in range(1, 13)]
+    templates = ['{y}年{m}月', '{y}-{m:02d}', '{y}/{m}', '{y}{m:02d}', '{y}.{m}', '{y}年第{m}月']
+    values = [t.format(y=y, m=m) for y, m in months for t in templates]
+    values += [None, '未知']
+    return pd.Series(rng.choice(np.array(values, dtype=object), rows))
+
+
+def timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='parse_time_column 基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--skip-loop', action='store_true', help='不运行逐行解析（行数很大时很慢）')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        series = make_time_series(rows)
+        vectorized, t_vec = timeit(parse_time_column, series)
+        line = f'rows={rows:>9,}  vectorized={t_vec:8.3f}s'
+        if not args.skip_loop:
+            looped, t_loop = timeit(parse_time_column_loop, series)
+            assert looped.equals(vectorized), '向量化结果与逐行解析不一致'
+            line += f'  loop={t_loop:8.3f}s  speedup={t_loop / t_vec:7.1f}x'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+滚动相关基准测试：累计和批量网格 vs 逐个 (窗口, 滞后, 序列对) 计算
+
+- grid：rolling_correlation.correlation_grid，每个滞后一次累计和，所有窗口和序列对一起计算
+- pandas：对每个 (窗口, 滞后, 序列对) 调用一次 Series.rolling(window).corr(y.shift(lag))
+- loop：对每个窗口位置单独求相关系数（O(T × W)，只在 T 不超过 --loop-max-rows 时运行）
+
+同时检查三者结果一致（pandas 对常数窗口给出 ±inf，这里为 NaN，比较时跳过），
+并检查前面有一段量级大得多的数据时（累计和相减精度不够）滚动窗口与逐窗口计算一致。
+
+用法：
+    python benchmarks/bench_rolling_correlation.py --rows 240 2400 24000 --pairs 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rolling_correlation import correlation_grid
+
+WINDOWS = [12, 24, 36, 60]
+LAGS = list(range(-24, 25))
+
+
+def series_pairs(rows, pairs, seed=0):
+    """有趋势、相互关联、带少量缺失值的 T × P 序列对"""
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(size=(rows, pairs)), axis=0) + 1000
+    y = 0.6 * np.roll(x, 3, axis=0) + np.cumsum(rng.normal(size=(rows, pairs)), axis=0)
+    x[rng.random(x.shape) < 0.01] = np.nan
+    y[rng.random(y.shape) < 0.01] = np.nan
+    return x, y
+
+
+def regime_shift_pair(rows=5000, seed=0):
+    """前半段标准差 1e4，后半段在 5e5 附近、标准差 0.5 的序列，y = 0.3x + 噪声"""
+    rng = np.random.default_rng(seed)
+    half = rows // 2
+    x = np.concatenate([rng.normal(0, 1e4, half), rng.normal(5e5, 0.5, rows - half)])
+    y = 0.3 * x + rng.normal(size=rows)
+    return x, y
+
+
+def pandas_grid(x, y):
+    grid = np.full((len(WINDOWS), len(LAGS)) + x.shape, np.nan)
+    for p in range(x.shape[1]):
+        xs, ys = pd.Series(x[:, p]), pd.Series(y[:, p])
+        for j, lag in enumerate(LAGS):
+            shifted = ys.shift(lag)
+            for i, window in enumerate(WINDOWS):
+                grid[i, j, :, p] = xs.rolling(window).corr(shifted).to_numpy()
+    return grid
+
+
+def loop_grid(x, y):
+    grid = np.full((len(WINDOWS), len(LAGS)) + x.shape, np.nan)
+    for p in range(x.shape[1]):
+        for j, lag in enumerate(LAGS):
+            shifted = pd.Series(y[:, p]).shift(lag).to_numpy()
+            for i, window in enumerate(WINDOWS):
+                for t in range(window - 1, len(x)):
+                    a, b = x[t - window + 1:t + 1, p], shifted[t - window + 1:t + 1]
+                    if np.isnan(a).any() or np.isnan(b).any() or a.std() == 0 or b.std() == 0:
+                        continue
+                    grid[i, j, t, p] = np.corrcoef(a, b)[0, 1]
+    return grid
+
+
+def max_difference(a, b):
+    both = np.isfinite(a) & np.isfinite(b)
+    return np.abs(a[both] - b[both]).max(initial=0.0)
+
+
+def nan_mismatches(a, b):
+    """一方为 NaN、另一方为有限值的位置数（pandas 的 ±inf 不计）"""
+    return int((np.isnan(a) & np.isfinite(b)).sum() + (np.isfinite(a) & np.isnan(b)).sum())
+
+
+def check_regime_shift():
+    """前一段数据的累计平方和远大于后面窗口的方差时，滚动窗口仍与逐窗口计算一致"""
+    x, y = regime_shift_pair()
+    grid = correlation_grid(x, y, WINDOWS, [0])[:, 0, :, 0]
+    for i, window in enumerate(WINDOWS):
+        exact = np.full(len(x), np.nan)
+        for t in range(window - 1, len(x)):
+            exact[t] = np.corrcoef(x[t - window + 1:t + 1], y[t - window + 1:t + 1])[0, 1]
+        expected = pd.Series(x).rolling(window).corr(pd.Series(y)).to_numpy()
+        assert nan_mismatches(grid[i], exact) == 0, window
+        assert max_difference(grid[i], exact) < 1e-8, window
+        # pandas 的逐行增减算法本身在这里有约 1e-4 的误差
+        assert nan_mismatches(grid[i], expected) == 0, window
+        assert max_difference(grid[i], expected) < 1e-3, window
+    print(f'量级突变的序列：窗口 {WINDOWS} 与逐窗口计算一致')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='滚动相关基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[240, 2400, 24000])
+    parser.add_argument('--pairs', type=int, default=4)
+    parser.add_argument('--loop-max-rows', type=int, default=240)
+    args = parser.parse_args()
+
+    print(f'窗口 {WINDOWS}，滞后 {LAGS[0]}..{LAGS[-1]}，序列对 {args.pairs}')
+    for rows in args.rows:
+        x, y = series_pairs(rows, args.pairs)
+        cases = [('grid', lambda: correlation_grid(x, y, WINDOWS, LAGS)), ('pandas', lambda: pandas_grid(x, y))]
+        if rows <= args.loop_max_rows:
+            cases.append(('loop', lambda: loop_grid(x, y)))
+
+        results, line = {}, f'rows={rows:>7,}'
+        for name, func in cases:
+            start = time.perf_counter()
+            results[name] = func()
+            seconds = time.perf_counter() - start
+            line += f'  {name}={seconds * 1000:9.1f} ms'
+        print(line)
+        for name in results:
+            if name != 'grid':
+                print(f'    与 {name} 的最大差异: {max_difference(results["grid"], results[name]):.2e}，'
+                      f'NaN 位置不一致: {nan_mismatches(results["grid"], results[name])}')
+    check_regime_shift()
+
+
+if __name__ == '__main__':
+    main()
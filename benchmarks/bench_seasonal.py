@@ -0,0 +1,75 @@
+"""
+季节性分析基准测试：年 × 月矩阵 vs 每次筛选整张表
+
+对照做法与原来的 visualize_monthly_revenue 一样，每取一个月份都对整张表做一次
+布尔筛选，当月值和同比再各自分组计算；矩阵只构建一次，之后都是按列取数。
+
+用法：
+    python benchmarks/bench_seasonal.py --rows 219 1000 3000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datagen
+from fiscal_seasonal import FISCAL_VALUE_COLUMN, SeasonalMatrix
+
+
+def fiscal_frame(rows):
+    """与 load_fiscal_frame 相同的形式：以时间为升序索引（行数超过 datagen 的月份范围会出现重复月份，不适用）"""
+    df = datagen.fiscal_frame(rows)
+    df['时间'] = pd.to_datetime(df['时间'], format='%Y年%m月')
+    return df.set_index('时间').sort_index()
+
+
+def filter_each_month(df):
+    """逐月筛选整张表，再分组差分得到当月值、按年对齐算同比"""
+    values = df[FISCAL_VALUE_COLUMN]
+    monthly = values - values.groupby(df.index.year).shift(1).fillna(0)
+    results = []
+    for month in range(1, 13):
+        selected = df[df.index.month == month]
+        flows = monthly[df.index.month == month]
+        flows.index = flows.index.year
+        results.append((selected[FISCAL_VALUE_COLUMN], flows.pct_change(fill_method=None) * 100))
+    return results
+
+
+def matrix_slices(df):
+    matrix = SeasonalMatrix.from_frame(df)
+    yoy = matrix.yoy()
+    return [(matrix.month(month, 'cumulative'), yoy[month]) for month in range(1, 13)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='季节性分析基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[219, 1000, 3000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = fiscal_frame(rows)
+        timings = {}
+        for name, func in (('filter', filter_each_month), ('matrix', matrix_slices)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                func(df)
+            timings[name] = (time.perf_counter() - start) / args.repeat
+
+        # 两种做法的累计值切片一致
+        for (old, _), (new, _) in zip(filter_each_month(df), matrix_slices(df)):
+            assert np.array_equal(old.to_numpy(), new.dropna().to_numpy())
+        # 矩阵只构建一次，不应比逐月筛选整张表慢
+        assert timings['matrix'] <= timings['filter'], timings
+        print(f"rows={rows:>6}  filter={timings['filter'] * 1000:8.2f} ms  matrix={timings['matrix'] * 1000:8.2f} ms  "
+              f"speedup={timings['filter'] / timings['matrix']:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
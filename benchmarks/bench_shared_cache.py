@@ -0,0 +1,55 @@
+"""
+共享缓存基准测试：每个会话一份副本 vs 所有会话共享一份只读数据
+
+st.cache_data 命中时把缓存的序列化结果反序列化成新的副本（这里用 pickle 模拟），
+N 个会话同时打开同一个文件就有 N 份预处理数据；SharedDatasetCache 只保存一份，
+每个会话拿到零拷贝的视图。测量同时持有 N 个会话的结果时新增的内存（tracemalloc）。
+
+用法：
+    python benchmarks/bench_shared_cache.py --rows 24000 --sessions 1 4 16
+"""
+import argparse
+import os
+import pickle
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Week2_homework'))
+
+import datagen
+from railway_pipeline import prepare_dataset
+from shared_cache import SharedDatasetCache
+
+
+def held_memory(get, sessions):
+    """同时持有 sessions 个会话的结果时，新增的内存（MB）"""
+    tracemalloc.start()
+    held = [get() for _ in range(sessions)]
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return current / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description='共享缓存基准测试')
+    parser.add_argument('--rows', type=int, default=24000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    dataset = prepare_dataset(datagen.freight_frame(args.rows))
+    pickled = pickle.dumps(dataset)
+    cache = SharedDatasetCache()
+    cache.get('key', lambda: dataset)
+
+    print(f'rows={args.rows:,}  序列化后 {len(pickled) / 2 ** 20:.2f} MB')
+    for sessions in args.sessions:
+        copies = held_memory(lambda: pickle.loads(pickled), sessions)
+        shared = held_memory(lambda: cache.get('key', None)[0], sessions)
+        print(f'  sessions={sessions:>3}  每会话副本={copies:8.2f} MB  共享视图={shared:8.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+启动开销基准测试：在全新的子进程中测量导入模块和查找中文字体的耗时
+
+每一项都在新的 Python 进程中运行（冷启动），重复多次取中位数；
+超过 --budget 的项标记为 [超出]，有超出时退出码为 1。
+
+用法：
+    python benchmarks/bench_startup.py --repeat 5 --budget 0.15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (名称, 要计时的代码, 是否计入预算)
+CASES = [
+    ('import helper_function', 'import helper_function', True),
+    ('import plot_settings', 'import plot_settings', True),
+    ('字体查找（磁盘缓存命中）', 'import plot_settings; plot_settings.resolve_chinese_fonts()', True),
+    ('字体查找（无缓存）', 'import plot_settings; plot_settings.clear_font_cache(); '
+                        'plot_settings.resolve_chinese_fonts()', False),
+    ('import railway_pipeline', 'import sys; sys.path.insert(0, "Week2_homework"); import railway_pipeline', False),
+    ('import matplotlib.pyplot（对照）', 'import matplotlib.pyplot', False),
+]
+
+TIMER = '''
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+'''
+
+
+def time_case(code, repeat):
+    """在新进程中运行 repeat 次，返回耗时（秒）的中位数"""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动开销基准测试')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.15, help='计入预算各项的耗时上限（秒）')
+    args = parser.parse_args()
+
+    # 先运行一次，确保字体磁盘缓存已经生成
+    subprocess.run([sys.executable, '-c', 'import plot_settings; plot_settings.resolve_chinese_fonts()'],
+                   cwd=ROOT, check=True)
+
+    over = 0
+    for name, code, budgeted in CASES:
+        elapsed = time_case(code, args.repeat)
+        flag = ''
+        if budgeted:
+            flag = '[超出]' if elapsed > args.budget else '[通过]'
+            over += elapsed > args.budget
+        print(f'{name:<32} {elapsed * 1000:8.1f} ms  {flag}')
+    # “无缓存”一项会删除磁盘缓存，结束后重新生成
+    subprocess.run([sys.executable, '-c', 'import plot_settings; plot_settings.resolve_chinese_fonts()'],
+                   cwd=ROOT, check=True)
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+统计摘要基准测试：逐列逐指标调用 pandas vs 对 T × N 数组按列归约
+
+对照做法与原来的 build_stats_table 一样，每一列分别调用 mean()、max()、min()、std()、
+count()，再用 apply 逐个单元格格式化；新做法每个指标对所有列只做一次归约，整表格式化。
+
+用法：
+    python benchmarks/bench_stats_summary.py --rows 240 24000 --columns 4 16 64
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats_summary import as_matrix, column_summary, format_values
+
+
+def per_column(df, columns):
+    stats = pd.DataFrame({col: [df[col].mean(), df[col].max(), df[col].min(), df[col].std(), df[col].count()]
+                          for col in columns})
+    for col in stats.columns:
+        stats[col] = stats[col].apply(lambda x: f"{x:.2f}" if isinstance(x, (int, float)) and not np.isnan(x) else "N/A")
+    return stats
+
+
+def vectorized(df, columns):
+    summary = column_summary(as_matrix(df, columns))
+    return format_values(np.vstack([summary[key] for key in ('mean', 'max', 'min', 'std', 'count')]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统计摘要基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[240, 24000])
+    parser.add_argument('--columns', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for rows in args.rows:
+        for n_columns in args.columns:
+            values = rng.normal(100, 20, (rows, n_columns))
+            values[rng.random(values.shape) < 0.02] = np.nan
+            columns = [f'列{i}' for i in range(n_columns)]
+            df = pd.DataFrame(values, columns=columns)
+
+            timings = {}
+            for name, func in (('per_column', per_column), ('vectorized', vectorized)):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    result = func(df, columns)
+                timings[name] = (time.perf_counter() - start) / args.repeat
+            assert (per_column(df, columns).to_numpy() == vectorized(df, columns)).all()
+            print(f"rows={rows:>7,} columns={n_columns:>3}  per_column={timings['per_column'] * 1000:8.2f} ms  "
+                  f"vectorized={timings['vectorized'] * 1000:8.2f} ms  "
+                  f"speedup={timings['per_column'] / timings['vectorized']:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
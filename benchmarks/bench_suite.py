@@ -0,0 +1,348 @@
+"""
+基准测试套件：用合成数据测量各个热点环节的耗时和内存峰值，结果保存为 JSON
+
+三组数据（见 datagen.py）：
+- fiscal：国家财政预算收入 —— Excel 读取（首次转换 / 列式缓存命中）、fiscal_loader、
+  parse_time_column、helper_function 的绘图函数
+- freight：铁路运输 —— Excel 读取、parse_time_column、find_matching_columns、
+  resolve_column_roles、preprocess_data、prepare_dataset、railway_charts 的图表
+- stock：Tushare 日线 —— read_stock_csv、StockPanel.from_frame、panel_indicators
+
+每个环节重复 --repeat 次取最短和中位耗时，再单独运行一次用 tracemalloc 记录
+Python 与 NumPy 分配的内存峰值（--no-memory 跳过；pyarrow 的内存不经过 tracemalloc，
+列式缓存读取的峰值偏小）。生成数据、写文件等准备工作不计时。
+Excel 的写入很慢（且 xlsx 最多约 100 万行），超过 --excel-max-rows 的规模跳过 Excel 相关环节。
+
+用法：
+    python benchmarks/bench_suite.py --rows 100 1000 10000 100000
+    python benchmarks/bench_suite.py --datasets freight --rows 1000000 10000000 --repeat 1 --no-memory
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json   # 运行后与旧结果比较
+    python benchmarks/bench_suite.py --compare old.json new.json                 # 只比较两个结果文件
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Week2_homework'))
+
+import datagen
+import helper_function
+from column_index import clear_column_map_cache, resolve_column_roles
+from columnar_cache import clear_columnar_cache, load_excel_cached
+from fiscal_loader import FISCAL_REVENUE_PATH, clear_fiscal_cache, load_fiscal_frame
+from indicators import panel_indicators
+from railway_charts import figure_to_bytes, plot_mode_shares, plot_volume_comparison
+from railway_pipeline import find_matching_columns, preprocess_data, prepare_dataset, volume_column
+from stock_loader import read_stock_csv
+from stock_panel import StockPanel
+from time_parsing import parse_time_column
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+DATASETS = ['fiscal', 'freight', 'stock']
+DEFAULT_ROWS = [100, 1000, 10_000, 100_000]
+# 比较结果时，耗时超过旧结果的这个倍数视为退步
+DEFAULT_THRESHOLD = 1.2
+# 耗时太短的环节波动大，比较时忽略
+MIN_COMPARE_SECONDS = 0.001
+
+
+def _noop():
+    return ()
+
+
+def measure(func, setup=_noop, repeat=3, memory=True):
+    """
+    运行 setup() 得到参数后调用 func(*args)，只对 func 计时
+
+    返回 {'min_s', 'median_s', 'repeat', 'peak_mb'}；peak_mb 是另外一次运行中
+    tracemalloc 记录的分配峰值（相对于开始时），memory 为 False 时为 None
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        args = setup()
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = round(peak / 2 ** 20, 3)
+    return {'min_s': min(times), 'median_s': statistics.median(times), 'repeat': repeat, 'peak_mb': peak_mb}
+
+
+# ---------- 各组数据的环节 ----------
+# 每组返回 [(环节名, func, setup)]；setup 返回 func 的参数，不计时。
+# Excel 相关环节在行数超过上限时 func 为 None（记录为跳过）。
+
+def _copy_of(df):
+    return lambda: (df.copy(),)
+
+
+def _render(fig):
+    if fig is not None:
+        figure_to_bytes(fig)
+
+
+def _render_current():
+    """helper_function 的绘图函数调用 plt.show()（Agg 下不渲染），这里补上渲染"""
+    figure_to_bytes(plt.gcf())
+
+
+def fiscal_stages(rows, workdir, excel_max_rows):
+    df = datagen.fiscal_frame(rows)
+    # helper_function 按 FISCAL_REVENUE_PATH（相对于 notebook 目录）读取，
+    # 在临时目录中建立同样的目录结构并切换工作目录
+    notebook_dir = os.path.join(workdir, 'notebook')
+    path = os.path.normpath(os.path.join(notebook_dir, FISCAL_REVENUE_PATH))
+    use_excel = rows <= excel_max_rows
+    if use_excel:
+        os.makedirs(notebook_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 没有 xls 写入引擎，写成 xlsx 内容；pandas 按文件内容识别格式
+        df.to_excel(path, index=False, engine='openpyxl')
+        os.chdir(notebook_dir)
+
+    def cold_cache():
+        clear_columnar_cache(path)
+        return (path,)
+
+    def cold_loader():
+        clear_fiscal_cache()
+        return ()
+
+    def visualize(func):
+        def run():
+            func()
+            _render_current()
+        return run
+
+    return [
+        ('load_excel_cached（首次转换）', load_excel_cached if use_excel else None, cold_cache),
+        ('load_excel_cached（缓存命中）', load_excel_cached if use_excel else None, lambda: (path,)),
+        ('load_fiscal_frame', load_fiscal_frame if use_excel else None, cold_loader),
+        ('parse_time_column', parse_time_column, lambda: (df['时间'],)),
+        ('visualize_fiscal_revenue', visualize(helper_function.visualize_fiscal_revenue) if use_excel else None,
+         cold_loader),
+        ('visualize_fiscal_growth', visualize(helper_function.visualize_fiscal_growth) if use_excel else None,
+         cold_loader),
+    ]
+
+
+def freight_stages(rows, workdir, excel_max_rows):
+    df = datagen.freight_frame(rows)
+    path = os.path.join(workdir, '铁路运输.xls')
+    use_excel = rows <= excel_max_rows
+    if use_excel:
+        df.to_excel(path, index=False, engine='openpyxl')
+
+    def cold_cache():
+        clear_columnar_cache(path)
+        return (path,)
+
+    def cold_roles():
+        clear_column_map_cache()
+        return (df.columns,)
+
+    def find_all(frame):
+        for mode in datagen.FREIGHT_MODES[1:]:
+            for role in datagen.FREIGHT_ROLES:
+                find_matching_columns(frame, [mode, role])
+
+    dataset = prepare_dataset(df.copy())
+    rail_col, road_col = volume_column(dataset['rail']), volume_column(dataset['road'])
+    modes = dataset['mode_analysis']
+
+    return [
+        ('load_excel_cached（首次转换）', load_excel_cached if use_excel else None, cold_cache),
+        ('load_excel_cached（缓存命中）', load_excel_cached if use_excel else None, lambda: (path,)),
+        ('parse_time_column', parse_time_column, lambda: (df['时间'],)),
+        ('find_matching_columns', find_all, lambda: (df,)),
+        ('resolve_column_roles（无缓存）', lambda columns: resolve_column_roles(columns, discover=True), cold_roles),
+        ('preprocess_data', preprocess_data, _copy_of(df)),
+        ('prepare_dataset', prepare_dataset, _copy_of(df)),
+        ('plot_volume_comparison', lambda: _render(plot_volume_comparison(dataset['analysis'], rail_col, road_col,
+                                                                          '当期值')), _noop),
+        ('plot_mode_shares', lambda: _render(plot_mode_shares(modes['times'], modes['shares'], modes['valid'],
+                                                              modes['modes'])), _noop),
+    ]
+
+
+def stock_stages(rows, workdir, excel_max_rows):
+    df = datagen.stock_frame(rows)
+    path = os.path.join(workdir, '600000.csv')
+    df.to_csv(path, index=False)
+    frame = read_stock_csv(path)
+    panel = StockPanel.from_frame(frame)
+    return [
+        ('read_stock_csv', read_stock_csv, lambda: (path,)),
+        ('StockPanel.from_frame', StockPanel.from_frame, lambda: (frame,)),
+        ('panel_indicators', panel_indicators, lambda: (panel,)),
+    ]
+
+
+STAGE_BUILDERS = {'fiscal': fiscal_stages, 'freight': freight_stages, 'stock': stock_stages}
+
+
+# ---------- 运行与保存 ----------
+
+def git_revision():
+    """返回 (短提交号, 工作区是否有未提交的修改)，不在 git 仓库中时为 (None, None)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def environment_info(args):
+    commit, dirty = git_revision()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'memory': not args.no_memory,
+    }
+
+
+def run_suite(args):
+    results = []
+    cwd = os.getcwd()
+    for dataset in args.datasets:
+        for rows in args.rows:
+            workdir = tempfile.mkdtemp(prefix=f'bench_{dataset}_')
+            try:
+                stages = STAGE_BUILDERS[dataset](rows, workdir, args.excel_max_rows)
+                for name, func, setup in stages:
+                    entry = {'dataset': dataset, 'rows': rows, 'stage': name}
+                    if func is None:
+                        entry['skipped'] = f'行数超过 --excel-max-rows={args.excel_max_rows}'
+                    else:
+                        entry.update(measure(func, setup, args.repeat, not args.no_memory))
+                    results.append(entry)
+                    print(format_entry(entry), flush=True)
+            finally:
+                os.chdir(cwd)
+                plt.close('all')
+                clear_fiscal_cache()
+                shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def format_entry(entry):
+    head = f"{entry['dataset']:<8} rows={entry['rows']:>10,}  {entry['stage']:<30}"
+    if 'skipped' in entry:
+        return f'{head}  跳过（{entry["skipped"]}）'
+    peak = '' if entry['peak_mb'] is None else f"  peak={entry['peak_mb']:9.2f} MB"
+    return f"{head}  min={entry['min_s'] * 1000:10.2f} ms  median={entry['median_s'] * 1000:10.2f} ms{peak}"
+
+
+def save_results(meta, results, output=None):
+    if output is None:
+        name = meta['commit'] or datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{name}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=1)
+    return output
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(base, current, threshold=DEFAULT_THRESHOLD):
+    """
+    按 (数据集, 行数, 环节) 比较两次结果的最短耗时，打印比值
+
+    返回退步（耗时超过 threshold 倍）的环节数；两边耗时都小于 MIN_COMPARE_SECONDS 的环节不计
+    """
+    key = lambda entry: (entry['dataset'], entry['rows'], entry['stage'])
+    base_entries = {key(entry): entry for entry in base['results'] if 'min_s' in entry}
+    print(f"\n对比 {base['meta'].get('commit')} → {current['meta'].get('commit')}（比值 = 新 / 旧）")
+    regressions = 0
+    for entry in current['results']:
+        old = base_entries.get(key(entry))
+        if old is None or 'min_s' not in entry:
+            continue
+        ratio = entry['min_s'] / old['min_s'] if old['min_s'] > 0 else float('inf')
+        noisy = max(entry['min_s'], old['min_s']) < MIN_COMPARE_SECONDS
+        flag = ''
+        if ratio > threshold and not noisy:
+            flag = '  [退步]'
+            regressions += 1
+        elif ratio < 1 / threshold and not noisy:
+            flag = '  [提升]'
+        print(f"{entry['dataset']:<8} rows={entry['rows']:>10,}  {entry['stage']:<30}  "
+              f"{old['min_s'] * 1000:10.2f} → {entry['min_s'] * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成数据基准测试套件')
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=DATASETS)
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help='行数，可从 100 到 10000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='不记录内存峰值（tracemalloc 会多运行一次）')
+    parser.add_argument('--excel-max-rows', type=int, default=50_000, help='超过该行数时跳过 Excel 相关环节')
+    parser.add_argument('--output', help='结果 JSON 路径，默认 benchmarks/results/<提交号>.json')
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help='一个文件：运行后与它比较；两个文件：不运行，只比较两者')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='判为退步的耗时倍数')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        regressions = compare_results(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    warnings.filterwarnings('ignore')
+    meta = environment_info(args)
+    results = run_suite(args)
+    output = save_results(meta, results, args.output)
+    print(f'\n结果已保存到 {output}')
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare[0]), {'meta': meta, 'results': results},
+                                      args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+多运输方式对比基准测试：矩阵运算 vs 逐对计算占比和相关系数
+
+用法：
+    python benchmarks/bench_transport_modes.py --months 240 --modes 2 5 10 50
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Week2_homework'))
+
+from transport_modes import correlation_matrix, mode_growth, mode_shares
+
+
+def pairwise(df):
+    """逐列、逐对计算，作为对照"""
+    total = df.sum(axis=1)
+    valid = total > 0
+    for col in df.columns:
+        np.where(valid, df[col] / total * 100, 0)
+    for col in df.columns:
+        df[col].pct_change(12)
+    for a, b in itertools.combinations(df.columns, 2):
+        pair = df[[a, b]].dropna()
+        np.corrcoef(pair[a], pair[b])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多运输方式对比基准测试')
+    parser.add_argument('--months', type=int, default=240)
+    parser.add_argument('--modes', type=int, nargs='+', default=[2, 5, 10, 50])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2005-01-01', periods=args.months, freq='MS')
+    for n_modes in args.modes:
+        matrix = np.abs(rng.normal(100, 20, (args.months, n_modes)))
+        matrix[rng.random(matrix.shape) < 0.02] = np.nan
+        df = pd.DataFrame(matrix, columns=[f'方式{i}' for i in range(n_modes)])
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            mode_shares(matrix)
+            mode_growth(matrix, times)
+            correlation_matrix(matrix)
+        batched = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            pairwise(df)
+        loop = (time.perf_counter() - start) / args.repeat
+        print(f'modes={n_modes:>3} months={args.months}  matrix={batched * 1000:7.2f} ms  '
+              f'pairwise={loop * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+基准测试用的合成数据生成器
+
+生成与仓库中真实数据结构相同、行数可配置（10^2 ~ 10^7）的数据：
+- fiscal_frame：国家财政预算收入.xls（时间、累计值、累计增长，1 月与 2 月合并发布）
+- freight_frame：铁路运输.xls（时间 + 总计和铁路/公路/水运/民航各 4 列）
+- stock_frame：Tushare 日线 CSV（Python/data/*.csv 的列，按日期倒序）
+
+国家数据的时间列是 'YYYY年M月' 字符串、按时间倒序排列。pandas 日期的上限约为
+2262 年，行数超过可表示的月份数时时间从头循环（时间会重复），只用于测量开销。
+"""
+import numpy as np
+import pandas as pd
+
+# 月度数据的最后一个月（与仓库中的数据一致），往前最多到 FIRST_YEAR 年
+LAST_MONTH = (2025, 6)
+FIRST_YEAR = 1700
+
+FREIGHT_MODES = ['', '铁路', '公路', '水运', '民航']
+FREIGHT_ROLES = ['当期值', '累计值', '同比增长', '累计增长']
+FREIGHT_UNITS = {'当期值': '(万吨)', '累计值': '(万吨)', '同比增长': '(%)', '累计增长': '(%)'}
+# 各运输方式当月运货量的量级（万吨），总计为各方式之和
+FREIGHT_SCALES = {'铁路': 40000, '公路': 350000, '水运': 85000, '民航': 80}
+
+# Tushare 日线数据：每只股票最多生成的交易日数，行数更多时增加股票数
+STOCK_DAYS_PER_TICKER = 5000
+STOCK_LAST_DATE = '2025-09-08'
+
+
+def month_sequence(rows, skip_january=False):
+    """
+    从 LAST_MONTH 开始倒序的月份（年、月数组），超过可表示的范围时循环
+
+    skip_january 为 True 时跳过 1 月（财政数据 1、2 月合并发布）
+    """
+    last = LAST_MONTH[0] * 12 + LAST_MONTH[1] - 1
+    ordinals = np.arange(last, FIRST_YEAR * 12 - 1, -1)
+    if skip_january:
+        ordinals = ordinals[ordinals % 12 != 0]
+    ordinals = ordinals[np.arange(rows) % len(ordinals)]
+    return ordinals // 12, ordinals % 12 + 1
+
+
+def month_labels(years, months):
+    """把年、月数组格式化为 'YYYY年M月'，只格式化不重复的月份"""
+    ordinals = years * 12 + months - 1
+    unique, inverse = np.unique(ordinals, return_inverse=True)
+    labels = np.array([f'{o // 12}年{o % 12 + 1}月' for o in unique], dtype=object)
+    return labels[inverse]
+
+
+def _cumulative(years, monthly):
+    """按年累加当月值（数据按时间倒序，先翻转为升序；时间循环时每一段连续的同一年单独累加）"""
+    order = slice(None, None, -1)
+    years, monthly = years[order], monthly[order]
+    groups = np.cumsum(np.r_[True, years[1:] != years[:-1]])
+    frame = pd.DataFrame(monthly).groupby(groups).cumsum().to_numpy()
+    return frame[order]
+
+
+def _with_missing(values, rng, missing_rate):
+    if missing_rate:
+        values = values.copy()
+        values[rng.random(values.shape) < missing_rate] = np.nan
+    return values
+
+
+def fiscal_frame(rows, seed=0, missing_rate=0.0):
+    """
+    生成与国家财政预算收入.xls 结构相同的数据框
+
+    参数:
+    rows: int - 行数
+    seed: int - 随机数种子
+    missing_rate: float - 数值缺失的比例
+    """
+    rng = np.random.default_rng(seed)
+    years, months = month_sequence(rows, skip_january=True)
+    monthly = rng.lognormal(np.log(15000), 0.2, rows)
+    # 2 月的值包含 1、2 两个月
+    monthly[months == 2] *= 2
+    cumulative = np.round(_cumulative(years, monthly[:, None])[:, 0])
+    growth = np.round(rng.normal(5, 4, rows), 1)
+    return pd.DataFrame({
+        '时间': month_labels(years, months),
+        '国家财政收入累计值(亿元)': _with_missing(cumulative, rng, missing_rate),
+        '国家财政收入累计增长(%)': _with_missing(growth, rng, missing_rate),
+    })
+
+
+def freight_frame(rows, seed=0, missing_rate=0.01):
+    """
+    生成与铁路运输.xls 结构相同的数据框（21 列）
+
+    参数:
+    rows: int - 行数
+    seed: int - 随机数种子
+    missing_rate: float - 数值缺失的比例（真实数据早期年份有缺失）
+    """
+    rng = np.random.default_rng(seed)
+    years, months = month_sequence(rows)
+    modes = FREIGHT_MODES[1:]
+    volume = np.column_stack([rng.lognormal(np.log(FREIGHT_SCALES[mode]), 0.15, rows) for mode in modes])
+    volume = np.round(np.column_stack([volume.sum(axis=1), volume]))
+    cumulative = _cumulative(years, volume)
+    growth = np.round(rng.normal(4, 6, volume.shape), 1)
+    cumulative_growth = np.round(rng.normal(4, 4, volume.shape), 1)
+
+    data = {'时间': month_labels(years, months)}
+    role_values = dict(zip(FREIGHT_ROLES, [volume, cumulative, growth, cumulative_growth]))
+    for j, mode in enumerate(FREIGHT_MODES):
+        for role in FREIGHT_ROLES:
+            data[f'{mode}货运量{role}{FREIGHT_UNITS[role]}'] = _with_missing(role_values[role][:, j], rng, missing_rate)
+    return pd.DataFrame(data)
+
+
+def stock_frame(rows, seed=0, days_per_ticker=STOCK_DAYS_PER_TICKER):
+    """
+    生成 Tushare 日线格式的数据框
+
+    每只股票最多 days_per_ticker 个交易日，行数更多时增加股票数；
+    每只股票内按 trade_date 倒序排列（与 Tushare 导出的文件一致）。
+    """
+    rng = np.random.default_rng(seed)
+    n_tickers = max(1, -(-rows // days_per_ticker))
+    days = -(-rows // n_tickers)
+    dates = pd.bdate_range(end=STOCK_LAST_DATE, periods=days)[::-1]
+    trade_date = np.tile((dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(), n_tickers)[:rows]
+    codes = np.repeat(np.array([f'{600000 + i}.SH' for i in range(n_tickers)], dtype=object), days)[:rows]
+
+    # 每只股票按时间正序做随机游走，再翻转为倒序
+    returns = rng.normal(0, 0.02, (n_tickers, days))
+    close = (10 * np.exp(np.cumsum(returns, axis=1)))[:, ::-1].ravel()[:rows]
+    pre_close = close / np.exp(returns[:, ::-1].ravel()[:rows])
+    spread = np.abs(rng.normal(0, 0.01, rows)) * close
+    open_ = pre_close + rng.normal(0, 0.005, rows) * pre_close
+    vol = np.round(rng.lognormal(np.log(50000), 0.5, rows), 2)
+    return pd.DataFrame({
+        'ts_code': codes,
+        'trade_date': trade_date,
+        'open': np.round(open_, 2),
+        'high': np.round(np.maximum(open_, close) + spread, 2),
+        'low': np.round(np.minimum(open_, close) - spread, 2),
+        'close': np.round(close, 2),
+        'pre_close': np.round(pre_close, 2),
+        'change': close - pre_close,
+        'pct_chg': np.round((close / pre_close - 1) * 100, 2),
+        'vol': vol,
+        'amount': np.round(vol * close / 10, 3),
+    })
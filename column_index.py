@@ -0,0 +1,215 @@
+"""
+列名索引：按关键词查找统计局导出表中的指标列
+
+ColumnIndex 对一组列名只做一次小写化，并为每个查询过的关键词缓存
+“包含该关键词的列位置”集合（倒排表），之后的每次查找只是集合运算。
+resolve_column_roles 一次解析所有运输方式 × 数据类型的列，结果按列名
+签名保存在 .column_map_cache.json 中，列结构相同的文件再次加载时直接复用。
+缓存最多保留 COLUMN_MAP_CACHE_SIZE 种列结构，超出时淘汰最久未用的。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+
+# 各数据类型的匹配规则：(除运输方式外需要包含的关键词, 排除关键词)
+ROLE_SPECS = {
+    '当期值': (['货运量', '当期'], ['增长', '同比', '累计']),
+    '累计值': (['货运量', '累计'], ['增长', '同比']),
+    '同比增长': (['货运量', '同比', '增长'], []),
+    '累计增长': (['货运量', '累计', '增长'], []),
+}
+
+# 运输方式列族的公共关键词，如 '水运货运量当期值(万吨)' 中的 '货运量'
+FAMILY_KEYWORD = '货运量'
+
+# 列映射的磁盘缓存
+COLUMN_MAP_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.column_map_cache.json')
+
+# 列映射缓存最多保留的列结构数
+COLUMN_MAP_CACHE_SIZE = 256
+
+# {签名: {运输方式: {数据类型: 列位置}}}，按最近使用排序；读写都要持有 _column_map_lock
+# （Streamlit 的多个会话在不同线程中同时解析列）
+_column_map_cache = None
+_column_map_lock = threading.Lock()
+
+
+class ColumnIndex:
+    """一组列名的关键词倒排索引"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._names = [str(col).lower() for col in self.columns]
+        self._postings = {}
+
+    def postings(self, keyword):
+        """包含 keyword 的列位置集合（区分大小写，列名已小写化）"""
+        positions = self._postings.get(keyword)
+        if positions is None:
+            positions = frozenset(i for i, name in enumerate(self._names) if keyword in name)
+            self._postings[keyword] = positions
+        return positions
+
+    def build(self, keywords):
+        """一次遍历列名，为尚未建立倒排表的关键词全部建立"""
+        pending = [keyword for keyword in dict.fromkeys(keywords) if keyword not in self._postings]
+        if not pending:
+            return
+        found = {keyword: [] for keyword in pending}
+        for i, name in enumerate(self._names):
+            for keyword in pending:
+                if keyword in name:
+                    found[keyword].append(i)
+        for keyword, positions in found.items():
+            self._postings[keyword] = frozenset(positions)
+
+    def first_containing(self, keywords):
+        """第一个包含任一关键词的列位置，没有时返回None"""
+        self.build(keywords)
+        positions = set().union(*(self.postings(keyword) for keyword in keywords))
+        return min(positions) if positions else None
+
+    def best_position(self, keywords, exclude_keywords=None):
+        """
+        匹配关键词最多的列位置（分数相同取靠前的列），没有任何匹配时返回None
+
+        与逐列扫描的 find_matching_columns 结果一致：排除关键词按原样匹配，
+        计分关键词先转为小写。
+        """
+        exclude_keywords = exclude_keywords or []
+        lowered = [keyword.lower() for keyword in keywords]
+        self.build(lowered + list(exclude_keywords))
+
+        excluded = set().union(*(self.postings(keyword) for keyword in exclude_keywords))
+        scores = Counter()
+        for keyword in lowered:
+            scores.update(self.postings(keyword) - excluded)
+        if not scores:
+            return None
+        best_score = max(scores.values())
+        return min(i for i, score in scores.items() if score == best_score)
+
+    def best_match(self, keywords, exclude_keywords=None):
+        """匹配关键词最多的列名，没有任何匹配时返回None"""
+        position = self.best_position(keywords, exclude_keywords)
+        return None if position is None else self.columns[position]
+
+
+def discover_modes(columns, family_keyword=FAMILY_KEYWORD, index=None):
+    """
+    找出所有 '<运输方式>货运量' 列族的运输方式，按首次出现的顺序返回
+
+    如列 '铁路货运量当期值(万吨)'、'水运货运量累计值(万吨)' 得到 ['铁路', '水运']；
+    没有前缀的总量列（'货运量当期值'）不算作运输方式。
+    """
+    index = index or ColumnIndex(columns)
+    modes = []
+    for position in sorted(index.postings(family_keyword.lower())):
+        name = str(index.columns[position])
+        mode = name[:name.lower().index(family_keyword.lower())].strip()
+        if mode and mode not in modes:
+            modes.append(mode)
+    return modes
+
+
+def schema_signature(columns, modes, discover=False):
+    """列名 + 运输方式 + 匹配规则的签名，作为列映射缓存的键"""
+    payload = json.dumps([[str(col) for col in columns], list(modes), discover, ROLE_SPECS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _load_column_map_cache():
+    """进程内的列映射缓存，第一次使用时从磁盘读取（调用方持有锁）"""
+    global _column_map_cache
+    if _column_map_cache is None:
+        try:
+            with open(COLUMN_MAP_CACHE_PATH, encoding='utf-8') as f:
+                _column_map_cache = OrderedDict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            _column_map_cache = OrderedDict()
+    return _column_map_cache
+
+
+def _save_column_map_cache(payload):
+    # 先写唯一的临时文件再替换，多个线程或进程同时写入时不会留下半个文件
+    directory = os.path.dirname(COLUMN_MAP_CACHE_PATH)
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix='.column_map_cache.', suffix='.tmp', dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, COLUMN_MAP_CACHE_PATH)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def resolve_column_roles(columns, modes=('铁路', '公路'), discover=False, index=None):
+    """
+    一次解析所有运输方式的数据列
+
+    参数:
+    columns: 列名序列（如 df.columns）
+    modes: 运输方式，如 ('铁路', '公路')
+    discover: bool - 是否把 discover_modes 找到的其他运输方式追加在 modes 之后
+    index: 已经建好的 ColumnIndex，可选
+
+    返回:
+    {运输方式: {数据类型: 列名}}，按运输方式顺序排列，只包含找到的列
+    """
+    columns = list(columns)
+    signature = schema_signature(columns, modes, discover)
+    with _column_map_lock:
+        cache = _load_column_map_cache()
+        cached = cache.get(signature)
+        if cached is not None:
+            cache.move_to_end(signature)
+    if cached is not None:
+        return {mode: {role: columns[pos] for role, pos in roles.items()} for mode, roles in cached.items()}
+
+    index = index or ColumnIndex(columns)
+    modes = list(modes)
+    if discover:
+        modes += [mode for mode in discover_modes(columns, index=index) if mode not in modes]
+    # 所有查找会用到的关键词一次建好倒排表
+    vocabulary = list(modes)
+    for keywords, exclude in ROLE_SPECS.values():
+        vocabulary += keywords + exclude
+    index.build([keyword.lower() for keyword in vocabulary] + vocabulary)
+
+    positions = {}
+    for mode in modes:
+        positions[mode] = {}
+        for role, (keywords, exclude) in ROLE_SPECS.items():
+            position = index.best_position([mode] + keywords, exclude)
+            if position is not None:
+                positions[mode][role] = position
+
+    with _column_map_lock:
+        cache = _load_column_map_cache()
+        cache[signature] = positions
+        cache.move_to_end(signature)
+        while len(cache) > COLUMN_MAP_CACHE_SIZE:
+            cache.popitem(last=False)
+        # 在锁内序列化，写文件时其他线程可以继续修改缓存
+        payload = json.dumps(cache, ensure_ascii=False)
+    _save_column_map_cache(payload)
+    return {mode: {role: columns[pos] for role, pos in roles.items()} for mode, roles in positions.items()}
+
+
+def clear_column_map_cache():
+    """清除列映射缓存（进程内和磁盘上的）"""
+    global _column_map_cache
+    with _column_map_lock:
+        _column_map_cache = OrderedDict()
+    try:
+        os.remove(COLUMN_MAP_CACHE_PATH)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # 没有安装 pyarrow 时直接读取 Excel，不使用缓存
+    feather = None
+    # 读取缓存时视为"缓存缺失或损坏、需要重新转换"的异常
+    _CACHE_ERRORS = (OSError, KeyError)
+else:
+    # 截断的 feather 文件会抛出 ArrowInvalid
+    _CACHE_ERRORS = (OSError, KeyError, pa.ArrowInvalid)
+
+# 缓存目录名，默认放在源文件所在目录下
+CACHE_DIR_NAME = '.columnar_cache'
+
+# 国家统计局导出的月度时间格式
+TIME_FORMAT = '%Y年%m月'
+
+
+def _cache_paths(path, cache_dir=None):
+    """
+    返回 (缓存目录, 元数据文件路径, feather 文件名前缀)
+
+    前缀是带扩展名的文件名加上绝对路径哈希，a.xls 与 a.xlsx、不同目录下的同名文件
+    共用一个缓存目录时也不会互相覆盖。
+    """
+    path = os.path.abspath(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR_NAME)
+    path_hash = hashlib.sha1(os.path.normcase(path).encode('utf-8')).hexdigest()[:12]
+    prefix = f'{os.path.basename(path)}.{path_hash}'
+    return cache_dir, os.path.join(cache_dir, f'{prefix}.json'), prefix
+
+
+def file_checksum(path):
+    """计算文件内容的 SHA1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare_sheet(df, time_col='时间'):
+    """
+    转换工作表：解析时间列并把数值样式的列转为数值类型
+
+    时间列只有在全部非空值都符合 TIME_FORMAT 时才转换，否则保持原样交给
+    调用方自己解析；文本列只有在转换不会丢失数据时才转为数值。
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if str(col) == time_col:
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                parsed = pd.to_datetime(series, format=TIME_FORMAT, errors='coerce')
+                if parsed.notna().sum() == series.notna().sum():
+                    df[col] = parsed
+            continue
+        if series.dtype == object or pd.api.types.is_string_dtype(series):
+            converted = pd.to_numeric(series, errors='coerce')
+            if converted.notna().sum() == series.notna().sum():
+                df[col] = converted
+    return df
+
+
+def _write_atomic(target, write):
+    """
+    先写入同目录下的临时文件再替换目标文件，读取方只会看到完整的旧文件或新文件
+
+    write(临时文件路径) 负责写入内容；失败时删除临时文件并抛出原异常
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    _write_atomic(meta_path, write)
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def convert_excel(path, cache_dir=None):
+    """
+    把 Excel 的每个工作表转换为 feather 文件并写入元数据
+
+    参数:
+    path: str - Excel 文件路径
+    cache_dir: str - 缓存目录，默认是源文件目录下的 .columnar_cache
+
+    返回:
+    {工作表名: 转换后的数据框}
+    """
+    cache_dir, meta_path, prefix = _cache_paths(path, cache_dir)
+    sheets = pd.read_excel(path, sheet_name=None)
+    sheets = {name: prepare_sheet(df) for name, df in sheets.items()}
+    if feather is None:
+        return sheets
+
+    stat = os.stat(path)
+    meta = {
+        'checksum': file_checksum(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sheets': {},
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for i, (name, df) in enumerate(sheets.items()):
+            file_name = f'{prefix}.{i}.feather'
+            # 不压缩，读取时可以直接内存映射
+            _write_atomic(os.path.join(cache_dir, file_name),
+                          lambda tmp_path, df=df: feather.write_feather(df.reset_index(drop=True), tmp_path,
+                                                                       compression='uncompressed'))
+            meta['sheets'][name] = file_name
+        # 元数据最后写入：中途失败时不会有指向不完整 feather 文件的新元数据
+        _write_meta(meta_path, meta)
+    except OSError:
+        # 缓存目录不可写时只返回转换结果
+        pass
+    return sheets
+
+
+def _is_fresh(path, meta, meta_path):
+    """缓存是否仍对应当前源文件：修改时间和大小一致直接认可，否则比对校验和"""
+    stat = os.stat(path)
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+        return True
+    if meta['checksum'] != file_checksum(path):
+        return False
+    # 内容没变（例如文件被重新复制过），更新元数据避免下次再计算校验和
+    meta['mtime_ns'], meta['size'] = stat.st_mtime_ns, stat.st_size
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass
+    return True
+
+
+def load_excel_cached(path, sheet_name=0, cache_dir=None):
+    """
+    读取 Excel 工作表，优先使用列式缓存
+
+    参数:
+    path: str - Excel 文件路径
+    sheet_name: int 或 str - 工作表序号或名称，默认第一个
+    cache_dir: str - 缓存目录，默认是源文件目录下的 .columnar_cache
+
+    返回:
+    已解析时间列、数值列已转换的数据框。源文件校验和变化时自动重新转换。
+    """
+    cache_dir, meta_path, _ = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path) if feather is not None else None
+
+    if meta is not None:
+        try:
+            if _is_fresh(path, meta, meta_path):
+                names = list(meta['sheets'])
+                name = names[sheet_name] if isinstance(sheet_name, int) else sheet_name
+                table = feather.read_table(os.path.join(cache_dir, meta['sheets'][name]), memory_map=True)
+                return table.to_pandas()
+        except _CACHE_ERRORS:
+            # 缓存文件被删除、截断或元数据不完整，重新转换
+            pass
+
+    sheets = convert_excel(path, cache_dir)
+    if isinstance(sheet_name, int):
+        return list(sheets.values())[sheet_name]
+    return sheets[sheet_name]
+
+
+def clear_columnar_cache(path, cache_dir=None):
+    """删除某个 Excel 文件对应的全部缓存文件"""
+    cache_dir, meta_path, _ = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta is None:
+        return
+    for file_name in meta['sheets'].values():
+        try:
+            os.remove(os.path.join(cache_dir, file_name))
+        except FileNotFoundError:
+            pass
+    os.remove(meta_path)
+
+
+if __name__ == '__main__':
+    # 预先转换目录下的全部 xls/xlsx：python columnar_cache.py Python/data/national_data
+    import sys
+
+    for directory in sys.argv[1:] or ['Python/data/national_data']:
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith(('.xls', '.xlsx')):
+                sheets = convert_excel(os.path.join(directory, file_name))
+                print(f'{file_name}: {len(sheets)} 个工作表已转换')
@@ -0,0 +1,219 @@
+"""
+分环节的耗时、行数和内存诊断
+
+在需要测量的地方包一层 stage：
+
+    with stage('parse_time_column', rows=len(df)):
+        ...
+
+只有当前线程调用了 start_recording() 之后才会记录；没有开启时 stage() 返回一个
+共享的空上下文，开销只有一次属性查找。Streamlit 的每个会话在各自的线程中运行脚本，
+所以记录按线程区分，不同会话互不干扰。
+
+本模块只依赖标准库；内存使用进程的常驻内存（RSS），有 psutil 时用 psutil，
+否则读取 /proc/self/statm，都不可用时不记录内存。
+"""
+import datetime
+import io
+import json
+import os
+import threading
+import time
+
+# 按线程保存当前的记录器
+_local = threading.local()
+
+# 常驻内存的读取函数（第一次使用时确定）
+_rss_reader = None
+
+
+class _NullStage:
+    """未开启记录时使用的空上下文；__enter__ 返回的字典可以随意写入，不会被保存"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _read_statm():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _no_rss():
+    return None
+
+
+def rss_bytes():
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    global _rss_reader
+    if _rss_reader is None:
+        try:
+            import psutil
+
+            memory_info = psutil.Process().memory_info
+            _rss_reader = lambda: memory_info().rss
+        except ImportError:
+            try:
+                _read_statm()
+                _rss_reader = _read_statm
+            except (OSError, ValueError, AttributeError):
+                _rss_reader = _no_rss
+    return _rss_reader()
+
+
+class _Stage:
+    def __init__(self, recorder, name, rows):
+        self.recorder = recorder
+        self.record = {'stage': name, 'rows': rows, 'note': None}
+
+    def __enter__(self):
+        recorder = self.recorder
+        self.record['order'] = recorder._entered
+        self.record['depth'] = recorder._depth
+        recorder._entered += 1
+        recorder._depth += 1
+        self.rss = rss_bytes()
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        rss = rss_bytes()
+        recorder = self.recorder
+        recorder._depth -= 1
+        self.record['seconds'] = seconds
+        self.record['rss_delta'] = rss - self.rss if rss is not None and self.rss is not None else None
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        recorder.records.append(self.record)
+        return False
+
+
+class StageRecorder:
+    """
+    一次运行（如 Streamlit 的一次重跑）中各环节的记录
+
+    records 按环节结束的顺序排列，每条是字典：stage（名称）、rows（行数）、
+    note（说明；rows 和 note 都可以在 with 块中写入）、seconds、
+    rss_delta（常驻内存变化，字节）、order（开始的顺序）、depth（嵌套层数）；
+    环节抛出异常时另有 error。
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+        self.timestamp = datetime.datetime.now().isoformat(timespec='seconds')
+        self._entered = 0
+        self._depth = 0
+
+    def stage(self, name, rows=None):
+        return _Stage(self, name, rows)
+
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """按环节开始的顺序返回记录（嵌套的环节紧跟在外层环节之后），便于显示为表格"""
+        return sorted(self.records, key=lambda record: record['order'])
+
+    def write_log(self, path, **context):
+        """把本次运行追加到 JSON Lines 日志，每次运行一行；context 中的字段一并写入"""
+        entry = {'timestamp': self.timestamp, 'total_seconds': round(self.total_seconds(), 6), **context,
+                 'stages': self.records}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+
+def start_recording():
+    """为当前线程开始新的记录，返回 StageRecorder"""
+    recorder = StageRecorder()
+    _local.recorder = recorder
+    return recorder
+
+
+def stop_recording():
+    """结束当前线程的记录，返回结束前的 StageRecorder（没有开启时为 None）"""
+    recorder = getattr(_local, 'recorder', None)
+    _local.recorder = None
+    return recorder
+
+
+def stage(name, rows=None):
+    """
+    测量一个环节；当前线程没有开启记录时几乎没有开销
+
+    返回上下文管理器，进入时得到该环节的记录字典，可以在 with 块中补充 rows、note
+    """
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name, rows)
+
+
+# ---------- 单次运行的性能分析 ----------
+
+PROFILERS = ['cProfile', 'pyinstrument']
+
+
+def available_profilers():
+    """当前环境可用的分析器（pyinstrument 为可选依赖）"""
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return PROFILERS[:1]
+    return list(PROFILERS)
+
+
+class Profile:
+    """
+    对一段代码做性能分析，结束后 report 为文本报告
+
+        profile = Profile('cProfile').start()
+        ...
+        report = profile.stop()
+
+    pyinstrument 未安装时退回 cProfile；cProfile 报告按累计耗时列出前 limit 个函数。
+    """
+
+    def __init__(self, kind='cProfile', limit=40):
+        if kind not in available_profilers():
+            kind = 'cProfile'
+        self.kind = kind
+        self.limit = limit
+        self.report = None
+        self._profiler = None
+
+    def start(self):
+        if self.kind == 'pyinstrument':
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def stop(self):
+        if self._profiler is None:
+            return self.report
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            self.report = self._profiler.output_text(unicode=True, color=False)
+        else:
+            import pstats
+
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(self.limit)
+            self.report = stream.getvalue()
+        self._profiler = None
+        return self.report
@@ -0,0 +1,118 @@
+import numpy as np
+
+from plot_settings import DEFAULT_MAX_POINTS
+
+
+def _as_float(values):
+    """把数值或日期数组转换为浮点数组（日期按时间戳计算）"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype('int64').astype('float64')
+    return values.astype('float64')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的位置索引
+
+    首尾两点固定保留，中间的点均分为 n_out - 2 个桶，每个桶选出与前一个
+    已选点和下一个桶平均点构成三角形面积最大的点，可以较好地保留曲线形状。
+    """
+    x = _as_float(x)
+    y = _as_float(y)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # 下一个桶的平均点（最后一个桶使用末尾点）
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = np.nanmean(y[next_start:next_end]) if np.isfinite(y[next_start:next_end]).any() else y[selected]
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        area = np.abs((x[selected] - avg_x) * (y[start:end] - y[selected])
+                      - (x[selected] - x[start:end]) * (avg_y - y[selected]))
+        best = start + (np.nanargmax(area) if np.isfinite(area).any() else 0)
+        indices[i + 1] = best
+        selected = best
+
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """
+    最小值/最大值分桶降采样，返回保留点的位置索引
+
+    把数据均分为 n_out // 2 个桶，每个桶保留最小值和最大值两个点，
+    适合波动剧烈、需要保留尖峰的序列。
+    """
+    y = _as_float(y)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+
+    low = base + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    high = base + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    indices = np.unique(np.concatenate([[0, n - 1], low, high]))
+    return indices[indices < n]
+
+
+def downsample_indices(x, ys, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    计算降采样后保留的位置索引（升序）
+
+    参数:
+    x: 横轴数据（数值或日期）
+    ys: 一个或多个纵轴序列；多个序列时预算平均分配后取并集
+    max_points: int - 点数预算，None 或 0 表示不降采样
+    method: str - 'lttb' 或 'minmax'
+    """
+    if not isinstance(ys, (list, tuple)):
+        ys = [ys]
+    n = len(ys[0])
+    if not max_points or n <= max_points:
+        return np.arange(n)
+
+    budget = max(max_points // len(ys), 3)
+    if method == 'lttb':
+        parts = [lttb_indices(x, y, budget) for y in ys]
+    elif method == 'minmax':
+        parts = [minmax_indices(y, budget) for y in ys]
+    else:
+        raise ValueError(f"不支持的降采样方法: {method}")
+    return np.unique(np.concatenate(parts))
+
+
+def downsample_frame(df, columns, x_col=None, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    对数据框按指定列降采样，返回保留的行
+
+    参数:
+    df: DataFrame - 已按横轴排序的数据
+    columns: list - 需要保留形状的列
+    x_col: str - 横轴列名，None 时使用索引
+    max_points: int - 点数预算，None 或 0 表示不降采样
+    method: str - 'lttb' 或 'minmax'
+    """
+    if not max_points or len(df) <= max_points:
+        return df
+    x = df.index if x_col is None else df[x_col]
+    indices = downsample_indices(x, [df[col] for col in columns], max_points, method)
+    return df.iloc[indices]
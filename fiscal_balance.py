@@ -0,0 +1,107 @@
+"""
+财政收支合并与赤字计算
+
+国家财政预算收入、国家财政支出两个文件都通过 fiscal_loader 的缓存读取（各自只解析
+一次），按月度时间索引排序合并（两边都是升序、不重复的索引，合并是一次线性的归并），
+再整列计算财政赤字、支出收入比及其同比变化。
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from fiscal_loader import FISCAL_EXPENDITURE_PATH, FISCAL_REVENUE_PATH, load_fiscal_frame
+from fiscal_seasonal import SeasonalMatrix
+
+REVENUE_COLUMN = '国家财政收入累计值(亿元)'
+EXPENDITURE_COLUMN = '国家财政支出(不含债务还本)累计值(亿元)'
+DEFICIT_COLUMN = '财政赤字累计值(亿元)'
+MONTHLY_DEFICIT_COLUMN = '财政赤字当月值(亿元)'
+RATIO_COLUMN = '支出收入比(%)'
+DEFICIT_GROWTH_COLUMN = '财政赤字累计同比增长(%)'
+RATIO_CHANGE_COLUMN = '支出收入比同比变化(百分点)'
+
+# 进程级缓存：{(收入文件绝对路径, 支出文件绝对路径): (收入数据框, 支出数据框, 合并结果)}
+_balance_cache = {}
+
+
+def merge_monthly(left, right):
+    """
+    按时间索引外连接两个月度数据框（两边都需按时间升序、索引不重复）
+
+    有序索引的 join 走归并路径，只扫描一遍；某一边缺少的月份为 NaN。
+    """
+    index, left_idx, right_idx = left.index.join(right.index, how='outer', return_indexers=True)
+    parts = {}
+    for df, indexer in ((left, left_idx), (right, right_idx)):
+        for col in df.columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            if indexer is not None:
+                values = np.where(indexer >= 0, values[indexer], np.nan)
+            parts[col] = values
+    return pd.DataFrame(parts, index=index)
+
+
+def _previous_year(series):
+    """每个月份上一年同月的值（没有时为 NaN）"""
+    shifted = series.reindex(series.index - pd.DateOffset(years=1))
+    return shifted.to_numpy()
+
+
+def compute_balance(revenue, expenditure):
+    """
+    合并收入、支出数据并计算财政收支指标
+
+    参数:
+    revenue, expenditure: load_fiscal_frame 的结果（以时间为索引、按时间升序）
+
+    返回按时间升序的数据框，包含两边的原始列以及:
+    财政赤字累计值 = 支出累计值 - 收入累计值（负数表示盈余）
+    财政赤字当月值 = 由累计赤字差分得到（2 月包含 1、2 两个月，与 fiscal_seasonal 一致）
+    支出收入比 = 支出累计值 / 收入累计值 × 100
+    财政赤字累计同比增长 = 与上年同月相比的增长率，上年赤字取绝对值作分母，上年为 0 时为 NaN
+    支出收入比同比变化 = 与上年同月的支出收入比之差（百分点）
+    """
+    df = merge_monthly(revenue, expenditure)
+    income = df[REVENUE_COLUMN].to_numpy()
+    spending = df[EXPENDITURE_COLUMN].to_numpy()
+
+    deficit = spending - income
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(income != 0, spending / income * 100, np.nan)
+    df[DEFICIT_COLUMN] = deficit
+    df[RATIO_COLUMN] = ratio
+
+    # 当月值：在 年 × 月 矩阵上差分，再按年份、月份取回每一行
+    matrix = SeasonalMatrix.from_frame(df, DEFICIT_COLUMN)
+    if len(df):
+        df[MONTHLY_DEFICIT_COLUMN] = matrix.monthly[df.index.year - matrix.years[0], df.index.month - 1]
+    else:
+        df[MONTHLY_DEFICIT_COLUMN] = np.empty(0)
+
+    previous_deficit = _previous_year(df[DEFICIT_COLUMN])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df[DEFICIT_GROWTH_COLUMN] = np.where(previous_deficit != 0,
+                                             (deficit - previous_deficit) / np.abs(previous_deficit) * 100, np.nan)
+    df[RATIO_CHANGE_COLUMN] = ratio - _previous_year(df[RATIO_COLUMN])
+    return df
+
+
+def load_fiscal_balance(revenue_path=FISCAL_REVENUE_PATH, expenditure_path=FISCAL_EXPENDITURE_PATH):
+    """
+    返回合并后的财政收支数据，两个文件都不变时只计算一次
+
+    参数:
+    revenue_path, expenditure_path: 收入、支出 Excel 文件路径（默认相对于 notebook 所在目录）
+
+    返回的是缓存中的对象，调用方不要原地修改；需要修改时请先 copy()。
+    """
+    key = (os.path.abspath(revenue_path), os.path.abspath(expenditure_path))
+    revenue = load_fiscal_frame(revenue_path)
+    expenditure = load_fiscal_frame(expenditure_path)
+    cached = _balance_cache.get(key)
+    if cached is not None and cached[0] is revenue and cached[1] is expenditure:
+        return cached[2]
+    balance = compute_balance(revenue, expenditure)
+    _balance_cache[key] = (revenue, expenditure, balance)
+    return balance
@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+
+from columnar_cache import load_excel_cached
+from incremental import IncrementalTable
+
+# 国家财政预算收入数据文件（相对于 notebook 所在目录）
+FISCAL_REVENUE_PATH = '../data/national_data/国家财政预算收入.xls'
+# 国家财政支出数据文件
+FISCAL_EXPENDITURE_PATH = '../data/national_data/国家财政支出.xls'
+
+# 进程级缓存：{绝对路径: (修改时间, 文件大小, IncrementalTable, 数据框)}
+_fiscal_cache = {}
+
+
+def _file_signature(path):
+    """返回文件的 (修改时间, 文件大小)，用于判断缓存是否过期"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _convert_fiscal_rows(df):
+    """把原始行的时间转换为日期，数值列统一为浮点数"""
+    values = df.drop(columns='时间').apply(pd.to_numeric, errors='coerce').astype('float64')
+    values.insert(0, '时间', pd.to_datetime(df['时间'], format='%Y年%m月'))
+    return values
+
+
+def _new_fiscal_table(df):
+    """为财政数据建立增量表：所有数值列参与统计，累计值列差分为当月值"""
+    value_cols = [col for col in df.columns if col != '时间']
+    cumulative_cols = [col for col in value_cols if '累计值' in str(col)]
+    return IncrementalTable(_convert_fiscal_rows, '时间', value_cols, cumulative_cols=cumulative_cols)
+
+
+def load_fiscal_table(path=FISCAL_REVENUE_PATH):
+    """
+    返回财政数据的 IncrementalTable，同一文件在进程内只完整解析一次
+
+    文件的修改时间或大小变化后重新读取，但只转换新增的月份：
+    table.frame 是按时间升序的数据，table.moments 是各列的累计统计量
+    （计数、均值、标准差、最值、相关系数），table.monthly 是累计值列差分得到的当月值
+    （规则见 incremental.cumulative_to_monthly：1、2 月合并发布时 2 月为两个月之和）。
+    """
+    key = os.path.abspath(path)
+    signature = _file_signature(key)
+    cached = _fiscal_cache.get(key)
+    if cached is not None and cached[:2] == signature:
+        return cached[2]
+
+    df = load_excel_cached(key)
+    table = _new_fiscal_table(df)
+    # 列结构不变时沿用原来的增量表，只处理新增的月份
+    if cached is not None and cached[2].value_cols == table.value_cols:
+        table = cached[2]
+    table.refresh(df)
+    _fiscal_cache[key] = (*signature, table, table.frame.set_index('时间'))
+    return table
+
+
+def load_fiscal_frame(path=FISCAL_REVENUE_PATH):
+    """
+    读取财政数据并缓存，同一文件在进程内只解析一次
+
+    参数:
+    path: str - Excel 文件路径，默认是国家财政预算收入.xls
+
+    返回:
+    以 '时间' 为 DatetimeIndex、按时间升序排列的数据框。
+    返回的是缓存中的对象，调用方不要原地修改；需要修改时请先 copy()。
+    文件的修改时间或大小变化后会自动重新读取，只有新增的月份需要转换。
+    """
+    load_fiscal_table(path)
+    return _fiscal_cache[os.path.abspath(path)][3]
+
+
+def clear_fiscal_cache(path=None):
+    """清除缓存；path 为 None 时清空全部，否则只清除该文件"""
+    if path is None:
+        _fiscal_cache.clear()
+    else:
+        _fiscal_cache.pop(os.path.abspath(path), None)
@@ -0,0 +1,219 @@
+"""
+财政数据的季节性分析
+
+国家财政收入只公布本年累计值，而且 1、2 月合并发布（没有 1 月的数据），个别年份
+缺少 12 月。SeasonalMatrix 把累计值一次性排成 年 × 12 月 的矩阵，差分得到各月的
+当月值，之后按月份/年份取数、同比、季节分解都直接在矩阵上计算，不再筛选原始数据。
+
+当月值的规则（incremental.cumulative_to_monthly，与 fiscal_loader 的 table.monthly 相同）：
+某月的值 = 本月累计值 - 本年上一个有数据月份的累计值（没有则为 0）。
+前面缺月时，这个值包含了缺少的月份（如 2 月的值是 1、2 两个月之和），span 记录它
+覆盖的月数；kind='spread' 时把它平均分摊到覆盖的各月。
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from fiscal_loader import FISCAL_REVENUE_PATH, load_fiscal_frame
+from incremental import calendar_to_monthly
+
+# 财政收入累计值列
+FISCAL_VALUE_COLUMN = '国家财政收入累计值(亿元)'
+MONTHS = np.arange(1, 13)
+
+# 进程级缓存：{(绝对路径, 数据列): (load_fiscal_frame 返回的数据框, SeasonalMatrix)}
+_seasonal_cache = {}
+
+
+def _pivot(times, values):
+    """把月度序列排成 (年 × 12) 矩阵，年份连续（中间缺少的年份整行为 NaN）"""
+    times = pd.DatetimeIndex(times)
+    values = np.asarray(values, dtype=np.float64)
+    if not len(times):
+        return np.empty(0, dtype=np.int64), np.empty((0, 12))
+    years = np.arange(times.year.min(), times.year.max() + 1)
+    matrix = np.full((len(years), 12), np.nan)
+    matrix[times.year - years[0], times.month - 1] = values
+    return years, matrix
+
+
+def _next_observed(observed):
+    """每个格子及之后（同一行）最近一个有数据的月份下标，没有时为 12"""
+    idx = np.where(observed, np.arange(12), 12)
+    return np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+
+
+class SeasonalMatrix:
+    """
+    年 × 月的财政数据矩阵
+
+    属性:
+    years - 年份数组（连续）
+    cumulative - 累计值矩阵 (年数 × 12)，缺失为 NaN
+    monthly - 当月值矩阵，缺月之后的那个月包含缺少月份的合计
+    span - 每个当月值覆盖的月数（1 为单月，2 月通常为 2），没有数据为 0
+    """
+
+    def __init__(self, years, cumulative):
+        self.years = np.asarray(years)
+        self.cumulative = np.asarray(cumulative, dtype=np.float64)
+        observed = ~np.isnan(self.cumulative)
+        rows = np.arange(len(self.years))[:, None]
+
+        # 与 incremental.cumulative_to_monthly 同一个规则：矩阵按行展开就是按时间升序的月度序列
+        monthly, span = calendar_to_monthly(np.repeat(self.years, 12), np.tile(MONTHS, len(self.years)),
+                                            self.cumulative.ravel(), return_span=True)
+        self.monthly = monthly.reshape(self.cumulative.shape)
+        self.span = span.reshape(self.cumulative.shape)
+
+        # 合并值平均分摊到覆盖的各月：每个月取它所在区间末尾（下一个有数据的月份）的值
+        following = _next_observed(observed)
+        has_following = following < 12
+        following = np.minimum(following, 11)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._spread = np.where(has_following, self.monthly[rows, following] / self.span[rows, following],
+                                    np.nan)
+
+    @classmethod
+    def from_frame(cls, df, column=FISCAL_VALUE_COLUMN):
+        """由 load_fiscal_frame 的结果（以时间为索引）或含 '时间' 列的数据框构建"""
+        times = df.index if isinstance(df.index, pd.DatetimeIndex) else df['时间']
+        years, matrix = _pivot(times, df[column].to_numpy())
+        return cls(years, matrix)
+
+    # ---------- 取数 ----------
+
+    def values(self, kind='monthly'):
+        """
+        kind: 'cumulative'（累计值）、'monthly'（当月值）或 'spread'（合并值分摊到各月后的当月值）
+        """
+        if kind == 'cumulative':
+            return self.cumulative
+        if kind == 'monthly':
+            return self.monthly
+        if kind == 'spread':
+            return self._spread
+        raise ValueError(f"未知的数据类型: {kind}")
+
+    def to_frame(self, kind='monthly'):
+        """年份为行、月份（1-12）为列的数据框"""
+        return pd.DataFrame(self.values(kind), index=pd.Index(self.years, name='年份'),
+                            columns=pd.Index(MONTHS, name='月份'))
+
+    def month(self, month, kind='monthly'):
+        """各年某个月份的值（以年份为索引，没有数据的年份为 NaN）"""
+        return pd.Series(self.values(kind)[:, month - 1], index=pd.Index(self.years, name='年份'),
+                         name=f'{month}月')
+
+    def year(self, year, kind='monthly'):
+        """某一年各月的值（以月份为索引）"""
+        row = int(year) - int(self.years[0]) if len(self.years) else -1
+        if not 0 <= row < len(self.years):
+            return pd.Series(np.nan, index=pd.Index(MONTHS, name='月份'), name=f'{year}年')
+        return pd.Series(self.values(kind)[row], index=pd.Index(MONTHS, name='月份'), name=f'{year}年')
+
+    def slice(self, years=None, months=None, kind='monthly'):
+        """任意年份、月份组合的子矩阵（数据框）；years / months 为 None 表示全部"""
+        frame = self.to_frame(kind)
+        if years is not None:
+            frame = frame.reindex(list(years))
+        if months is not None:
+            frame = frame[list(months)]
+        return frame
+
+    def series(self, kind='monthly'):
+        """按时间顺序展开的月度序列（以每月第一天为索引），去掉首尾没有数据的月份"""
+        values = self.values(kind).ravel()
+        index = pd.date_range(f'{self.years[0]}-01-01', periods=len(values), freq='MS') if len(values) else \
+            pd.DatetimeIndex([])
+        observed = np.flatnonzero(~np.isnan(values))
+        if not len(observed):
+            return pd.Series(dtype=np.float64)
+        window = slice(observed[0], observed[-1] + 1)
+        return pd.Series(values[window], index=index[window], name=kind)
+
+    # ---------- 同比与季节分解 ----------
+
+    def yoy(self, kind='monthly'):
+        """
+        同比增长率(%)矩阵：与上一年同月相比；上年同月缺失或为 0 时为 NaN
+
+        当月值的覆盖月数与上年不同（如今年 2 月合并、上年没有合并）时不可比，结果也为 NaN。
+        """
+        values = self.values(kind)
+        result = np.full(values.shape, np.nan)
+        if len(values) < 2:
+            return self._frame(result)
+        current, previous = values[1:], values[:-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = np.where(previous != 0, (current / previous - 1) * 100, np.nan)
+        if kind == 'monthly':
+            growth[self.span[1:] != self.span[:-1]] = np.nan
+        result[1:] = growth
+        return self._frame(result)
+
+    def decompose(self, model='additive', kind='spread', max_gap=2):
+        """
+        经典季节分解：趋势（2×12 中心移动平均）、季节项、残差
+
+        参数:
+        model: 'additive'（值 = 趋势 + 季节 + 残差）或 'multiplicative'（值 = 趋势 × 季节 × 残差）
+        kind: 分解的序列，默认用分摊后的当月值（1、2 月各占一半，序列完整）
+        max_gap: 计算趋势前线性插补的最大连续缺失月数（如缺少的 12 月）
+
+        返回 {'trend', 'seasonal', 'resid'}（年 × 月数据框）和 'seasonal_index'（各月的季节指数）
+        """
+        if model not in ('additive', 'multiplicative'):
+            raise ValueError(f"未知的分解模型: {model}")
+        values = self.values(kind)
+        flat = pd.Series(values.ravel())
+        filled = flat.interpolate(limit=max_gap, limit_area='inside')
+
+        # 2×12 中心移动平均：12 个月的平均再对相邻两个取平均
+        trend = filled.rolling(12).mean().rolling(2).mean().shift(-6).to_numpy().reshape(values.shape)
+        if model == 'additive':
+            detrended = values - trend
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                detrended = values / trend
+
+        # 各月的季节指数：去趋势值按月份平均，再归一化（加法模型和为 0，乘法模型平均为 1）
+        with np.errstate(invalid='ignore'):
+            counts = (~np.isnan(detrended)).sum(axis=0)
+            index = np.where(counts > 0, np.nansum(detrended, axis=0) / np.maximum(counts, 1), np.nan)
+        if model == 'additive':
+            index = index - np.nanmean(index)
+            seasonal = np.broadcast_to(index, values.shape)
+            resid = values - trend - seasonal
+        else:
+            index = index / np.nanmean(index)
+            seasonal = np.broadcast_to(index, values.shape)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                resid = values / (trend * seasonal)
+        return {
+            'trend': self._frame(trend),
+            'seasonal': self._frame(np.array(seasonal)),
+            'resid': self._frame(resid),
+            'seasonal_index': pd.Series(index, index=pd.Index(MONTHS, name='月份'), name='季节指数'),
+        }
+
+    def _frame(self, matrix):
+        return pd.DataFrame(matrix, index=pd.Index(self.years, name='年份'), columns=pd.Index(MONTHS, name='月份'))
+
+
+def load_seasonal_matrix(path=FISCAL_REVENUE_PATH, column=FISCAL_VALUE_COLUMN):
+    """
+    返回财政数据的 SeasonalMatrix，数据文件不变时只构建一次
+
+    数据来自 fiscal_loader 的缓存；文件更新后 load_fiscal_frame 返回新的数据框，
+    矩阵随之重建。
+    """
+    key = (os.path.abspath(path), column)
+    df = load_fiscal_frame(path)
+    cached = _seasonal_cache.get(key)
+    if cached is not None and cached[0] is df:
+        return cached[1]
+    matrix = SeasonalMatrix.from_frame(df, column)
+    _seasonal_cache[key] = (df, matrix)
+    return matrix
@@ -1,76 +1,62 @@
-def visualize_monthly_revenue(month):
+# pandas、matplotlib 等较重的库在函数内按需导入，import helper_function 本身几乎没有开销
+from plot_settings import DEFAULT_MAX_POINTS, apply_chinese_font
+
+def visualize_monthly_revenue(month, kind='cumulative'):
     """ 
     读取国家财政预算收入数据并可视化每年特定月份的数据
     
     参数:
     month: int - 要可视化的月份（1-12）
+    kind: str - 'cumulative' 为累计值；'monthly' 为当月值（由累计值差分得到，2 月包含 1、2 两个月）
     
     函数功能：
-    1. 读取国家财政预算收入.xls数据文件
-    2. 将时间列转换为日期类型并提取月份和年份
-    3. 筛选出指定月份的数据
-    4. 按年份排序数据
-    5. 绘制指定月份的国家财政收入累计值趋势图
+    1. 从缓存读取 年 × 月 矩阵（fiscal_seasonal.SeasonalMatrix，数据不变时只构建一次）
+    2. 直接取出指定月份那一列，不再筛选整张表
+    3. 绘制指定月份的国家财政收入趋势图
     """
     import matplotlib.pyplot as plt 
-    import pandas as pd 
-    # 设置中文字体以正常显示中文标签和负号
-    plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签 
-    plt.rcParams['axes.unicode_minus'] = False    # 用来正常显示负号
-    # 读取数据 
-    df = pd.read_excel('../data/national_data/国家财政预算收入.xls') 
-    
-    # 将时间列转换为日期类型并提取月份和年份 
-    df['时间'] = pd.to_datetime(df['时间'], format='%Y年%m月') 
-    df['月份'] = df['时间'].dt.month 
-    df['年份'] = df['时间'].dt.year 
-    
-    # 筛选出指定月份的数据 
-    monthly_data = df[df['月份'] == month] 
-    
-    # 按年份排序 
-    monthly_data = monthly_data.sort_values('年份') 
+    from fiscal_seasonal import load_seasonal_matrix
+    # 设置中文字体以正常显示中文标签和负号（字体只查找、设置一次）
+    apply_chinese_font()
+    # 取出指定月份各年的数据（没有数据的年份不画）
+    monthly_data = load_seasonal_matrix().month(month, kind).dropna()
+    name = '国家财政收入累计值' if kind == 'cumulative' else '国家财政收入当月值'
     
     # 创建可视化 
     plt.figure(figsize=(12, 6)) 
-    plt.plot(monthly_data['年份'], monthly_data['国家财政收入累计值(亿元)'], marker='o', linestyle='-', linewidth=2) 
-    plt.title(f'每年{month}月份国家财政收入累计值') 
+    plt.plot(monthly_data.index, monthly_data.to_numpy(), marker='o', linestyle='-', linewidth=2) 
+    plt.title(f'每年{month}月份{name}') 
     plt.xlabel('年份') 
-    plt.ylabel('国家财政收入累计值(亿元)') 
-    plt.xticks(monthly_data['年份'], rotation=45) 
+    plt.ylabel(f'{name}(亿元)') 
+    plt.xticks(monthly_data.index, rotation=45) 
     plt.grid(True, linestyle='--', alpha=0.7) 
     plt.tight_layout() 
     plt.show()
 
-def visualize_fiscal_revenue():
+def visualize_fiscal_revenue(max_points=DEFAULT_MAX_POINTS):
     """ 
     读取国家财政预算收入数据并绘制趋势图 
     
+    参数:
+    max_points: int - 绘图点数上限，超过时按 LTTB 降采样；None 或 0 表示精确绘制所有点
+    
     函数功能：
-    1. 读取国家财政预算收入.xls数据文件
-    2. 处理中文日期格式，转换为标准日期格式
-    3. 按时间排序数据
-    4. 绘制国家财政收入累计值趋势图
+    1. 从缓存读取国家财政预算收入数据（时间已转换为日期索引并排序）
+    2. 绘制国家财政收入累计值趋势图
     """
     import matplotlib.pyplot as plt 
-    import pandas as pd 
-    # 设置中文字体以正常显示中文标签和负号
-    plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签 
-    plt.rcParams['axes.unicode_minus'] = False    # 用来正常显示负号
+    from downsample import downsample_frame
+    from fiscal_loader import load_fiscal_frame
+    # 设置中文字体以正常显示中文标签和负号（字体只查找、设置一次）
+    apply_chinese_font()
 
-    # 读取数据 
-    df = pd.read_excel('../data/national_data/国家财政预算收入.xls')
-    
-    # 将中文日期格式转换为标准日期格式 
-    # 推荐使用这个方法，处理'年'和'月'的中文格式
-    df['时间'] = pd.to_datetime(df['时间'], format='%Y年%m月') 
-    
-    # 按时间排序数据
-    df = df.sort_values('时间') 
+    # 读取数据（时间已转换为日期索引并排序）
+    df = load_fiscal_frame()
+    df = downsample_frame(df, ['国家财政收入累计值(亿元)'], max_points=max_points)
     
     # 创建图形并绘制趋势图
     plt.figure(figsize=(12, 6)) 
-    plt.plot(df['时间'], df['国家财政收入累计值(亿元)'], marker='o') 
+    plt.plot(df.index, df['国家财政收入累计值(亿元)'], marker='o') 
     plt.title('国家财政收入累计值趋势') 
     plt.xlabel('时间') 
     plt.ylabel('国家财政收入累计值(亿元)') 
@@ -79,33 +65,31 @@ def visualize_fiscal_revenue():
     plt.tight_layout() 
     plt.show()
 
-def visualize_fiscal_growth():
+def visualize_fiscal_growth(max_points=DEFAULT_MAX_POINTS):
     """ 
     读取国家财政预算收入数据并可视化国家财政收入累计增长趋势
     
+    参数:
+    max_points: int - 绘图点数上限，超过时按 LTTB 降采样；None 或 0 表示精确绘制所有点
+    
     函数功能：
-    1. 读取国家财政预算收入.xls数据文件
-    2. 将时间列转换为日期类型并排序
-    3. 绘制国家财政收入累计增长趋势图
+    1. 从缓存读取国家财政预算收入数据（时间已转换为日期索引并排序）
+    2. 绘制国家财政收入累计增长趋势图
     """
-    import pandas as pd 
     import matplotlib.pyplot as plt 
-    import matplotlib as mpl 
+    from downsample import downsample_frame
+    from fiscal_loader import load_fiscal_frame
     
-    # 设置中文字体 
-    mpl.rcParams['font.sans-serif'] = ['SimHei'] 
-    mpl.rcParams['axes.unicode_minus'] = False 
+    # 设置中文字体（字体只查找、设置一次）
+    apply_chinese_font()
     
-    # 读取数据 
-    df = pd.read_excel('../data/national_data/国家财政预算收入.xls') 
-    
-    # 将时间列转换为日期类型并排序 
-    df['时间'] = pd.to_datetime(df['时间'], format='%Y年%m月') 
-    df = df.sort_values('时间') 
+    # 读取数据（时间已转换为日期索引并排序）
+    df = load_fiscal_frame()
+    df = downsample_frame(df, ['国家财政收入累计增长(%)'], max_points=max_points)
     
     # 创建可视化 
     plt.figure(figsize=(12, 6)) 
-    plt.plot(df['时间'], df['国家财政收入累计增长(%)'], marker='o', linestyle='-', linewidth=2) 
+    plt.plot(df.index, df['国家财政收入累计增长(%)'], marker='o', linestyle='-', linewidth=2) 
     plt.title('国家财政收入累计增长趋势') 
     plt.xlabel('时间') 
     plt.ylabel('国家财政收入累计增长(%)') 
@@ -114,7 +98,75 @@ def visualize_fiscal_growth():
     plt.tight_layout() 
     plt.show()
 
+def visualize_fiscal_balance(kind='deficit', max_points=DEFAULT_MAX_POINTS):
+    """
+    读取国家财政收入、支出数据并可视化财政收支情况
+
+    参数:
+    kind: str - 'deficit' 为收入、支出与赤字累计值；'monthly' 为赤字当月值；
+                'ratio' 为支出收入比；'growth' 为赤字累计同比增长与支出收入比同比变化
+    max_points: int - 绘图点数上限，超过时按 LTTB 降采样；None 或 0 表示精确绘制所有点
+
+    函数功能：
+    1. 从缓存读取合并后的财政收支数据（两个文件各自只解析一次，按月份归并对齐）
+    2. 绘制指定指标的趋势图
+    """
+    import matplotlib.pyplot as plt
+    from downsample import downsample_frame
+    from fiscal_balance import (DEFICIT_COLUMN, DEFICIT_GROWTH_COLUMN, EXPENDITURE_COLUMN, MONTHLY_DEFICIT_COLUMN,
+                                RATIO_CHANGE_COLUMN, RATIO_COLUMN, REVENUE_COLUMN, load_fiscal_balance)
+
+    # 各类图：(要绘制的列, 标题, 纵轴标签)
+    plots = {
+        'deficit': ([REVENUE_COLUMN, EXPENDITURE_COLUMN, DEFICIT_COLUMN], '国家财政收支累计值与赤字', '金额(亿元)'),
+        'monthly': ([MONTHLY_DEFICIT_COLUMN], '财政赤字当月值', MONTHLY_DEFICIT_COLUMN),
+        'ratio': ([RATIO_COLUMN], '国家财政支出收入比', RATIO_COLUMN),
+        'growth': ([DEFICIT_GROWTH_COLUMN, RATIO_CHANGE_COLUMN], '财政赤字与支出收入比同比变化', '同比变化'),
+    }
+    if kind not in plots:
+        raise ValueError(f"未知的图表类型: {kind}")
+    columns, title, ylabel = plots[kind]
+
+    # 设置中文字体（字体只查找、设置一次）
+    apply_chinese_font()
+
+    # 读取数据（时间已对齐为升序的日期索引）
+    df = load_fiscal_balance()
+    df = downsample_frame(df, columns, max_points=max_points)
+
+    # 创建可视化
+    plt.figure(figsize=(12, 6))
+    for col in columns:
+        plt.plot(df.index, df[col], marker='o', linestyle='-', linewidth=2, label=col)
+    if kind != 'deficit':
+        plt.axhline(y=0 if kind != 'ratio' else 100, color='red', linestyle='--', alpha=0.3)
+    plt.title(title)
+    plt.xlabel('时间')
+    plt.ylabel(ylabel)
+    if len(columns) > 1:
+        plt.legend()
+    plt.xticks(rotation=45)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
 def load_fiscal_data():
-    import pandas as pd
-    df = pd.read_excel('../data/national_data/国家财政预算收入.xls')
-    return df
+    """
+    返回国家财政预算收入数据的副本
+
+    数据来自 fiscal_loader 的进程级缓存，'时间' 列已转换为日期类型并按时间升序排列
+    """
+    from fiscal_loader import load_fiscal_frame
+
+    return load_fiscal_frame().reset_index()
+
+def load_fiscal_balance_data():
+    """
+    返回合并后的国家财政收支数据的副本
+
+    收入、支出按月份对齐，包含财政赤字（累计值、当月值）、支出收入比及其同比变化，
+    '时间' 列为日期类型并按时间升序排列
+    """
+    from fiscal_balance import load_fiscal_balance
+
+    return load_fiscal_balance().reset_index(names='时间')
@@ -0,0 +1,389 @@
+"""
+月度数据的增量刷新
+
+国家数据的 Excel 每月只新增一行。IncrementalTable 记住上次处理过的原始行
+（按时间键和行哈希），刷新时只转换新增的月份并追加到已排序的数据后面，
+同时以 O(新增行数) 的代价更新：
+- RunningMoments：各列的计数、均值、标准差、最小值、最大值和两两相关系数
+- 累计值到当月值的差分（cumulative_to_monthly）
+已有的行被修改、删除或新月份插在中间时自动退回完整重算，结果与完整重算一致。
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """
+    可合并的多列一、二阶矩（Chan 等人的并行合并公式）
+
+    对每一对列 (i, j) 只统计两者都有数据的行，因此对角线给出各列的
+    计数/均值/方差，非对角线给出与 DataFrame.corr() 一致的两两相关系数。
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.shift = None                     # 第一批数据的列均值，减去后再累积，减小舍入误差
+        self.n = np.zeros((n, n))
+        self.mean_x = np.zeros((n, n))        # 第 i 列在 (i, j) 共同行上的均值（已平移）
+        self.m2_x = np.zeros((n, n))          # 第 i 列在 (i, j) 共同行上的离差平方和
+        self.cross = np.zeros((n, n))         # (i, j) 的离差交叉积之和
+        self.min = np.full(n, np.nan)
+        self.max = np.full(n, np.nan)
+        self._pos = {col: i for i, col in enumerate(self.columns)}
+
+    def update(self, values):
+        """合并一批数据（k × N 数组，缺失值为 NaN），代价与 k 成正比"""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.columns))
+        if not len(values):
+            return self
+        valid = ~np.isnan(values)
+        if self.shift is None:
+            counts = valid.sum(axis=0)
+            self.shift = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+        x = np.where(valid, values - self.shift, 0.0)
+        mask = valid.astype(np.float64)
+
+        # 本批的矩
+        n_b = mask.T @ mask
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_b = np.where(n_b > 0, (x.T @ mask) / n_b, 0.0)
+        m2_b = (x * x).T @ mask - n_b * mean_b ** 2
+        cross_b = x.T @ x - n_b * mean_b * mean_b.T
+
+        # 与已有的矩合并
+        n_a = self.n
+        total = n_a + n_b
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(total > 0, n_a * n_b / total, 0.0)
+            delta = mean_b - self.mean_x
+            self.mean_x = np.where(total > 0, self.mean_x + delta * n_b / total, 0.0)
+        self.m2_x = self.m2_x + m2_b + delta ** 2 * weight
+        self.cross = self.cross + cross_b + delta * delta.T * weight
+        self.n = total
+
+        self.min = np.fmin(self.min, np.nanmin(values, axis=0, initial=np.inf))
+        self.max = np.fmax(self.max, np.nanmax(values, axis=0, initial=-np.inf))
+        self.min[np.isinf(self.min)] = np.nan
+        self.max[np.isinf(self.max)] = np.nan
+        return self
+
+    def copy(self):
+        """独立的副本（之后对任一方 update 不影响另一方）"""
+        other = copy.copy(self)
+        for name in ('shift', 'n', 'mean_x', 'm2_x', 'cross', 'min', 'max'):
+            value = getattr(self, name)
+            setattr(other, name, None if value is None else value.copy())
+        other.columns = list(self.columns)
+        other._pos = dict(self._pos)
+        return other
+
+    def count(self):
+        return pd.Series(np.diag(self.n).astype(np.int64), index=self.columns)
+
+    def mean(self):
+        n = np.diag(self.n)
+        mean = np.diag(self.mean_x) + (self.shift if self.shift is not None else 0.0)
+        return pd.Series(np.where(n > 0, mean, np.nan), index=self.columns)
+
+    def std(self, ddof=1):
+        n = np.diag(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.where(n > ddof, np.diag(self.m2_x) / (n - ddof), np.nan)
+        return pd.Series(np.sqrt(np.maximum(var, 0.0)), index=self.columns)
+
+    def minimum(self):
+        return pd.Series(self.min, index=self.columns)
+
+    def maximum(self):
+        return pd.Series(self.max, index=self.columns)
+
+    def corr(self, min_periods=2):
+        """两两相关系数矩阵（数据框）"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.cross / np.sqrt(self.m2_x * self.m2_x.T)
+        corr[self.n < min_periods] = np.nan
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def correlation(self, a, b, min_periods=2):
+        """两列的相关系数，共同数据不足 min_periods 行时返回None"""
+        i, j = self._pos[a], self._pos[b]
+        if self.n[i, j] < min_periods:
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(np.clip(self.cross[i, j] / np.sqrt(self.m2_x[i, j] * self.m2_x[j, i]), -1.0, 1.0))
+
+
+def cumulative_to_monthly(times, cumulative, return_span=False):
+    """
+    由累计值得到当月值
+
+    规则：本月的值 = 本月累计值 - 同一年中上一个有数据月份的累计值（没有则为 0）。
+    前面缺月时（如国家数据 1、2 月合并发布，没有 1 月），这个值包含缺少的月份，
+    即 2 月的值是 1、2 两个月之和。每列分别按自己有数据的月份计算，times 需升序。
+
+    参数:
+    times: 日期序列；cumulative: 长度为 T 的一维或 T × N 的二维数组
+    return_span: 为 True 时同时返回每个当月值覆盖的月数（没有数据为 0）
+
+    返回与 cumulative 形状相同的当月值数组（return_span 时为 (当月值, 覆盖月数)）
+    """
+    months = pd.DatetimeIndex(times)
+    return calendar_to_monthly(months.year.to_numpy(), months.month.to_numpy(), cumulative, return_span)
+
+
+def calendar_to_monthly(year, month, cumulative, return_span=False):
+    """
+    与 cumulative_to_monthly 相同的规则，时间以年份、月份两个整数数组给出（按时间升序）
+
+    fiscal_seasonal.SeasonalMatrix 用它对 年 × 12 矩阵按行展开后的序列差分，
+    不需要先构造日期。
+    """
+    year = np.asarray(year)
+    month = np.asarray(month)
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    values = cumulative[:, None] if cumulative.ndim == 1 else cumulative
+    if not len(values):
+        monthly = np.full(cumulative.shape, np.nan)
+        return (monthly, np.zeros(cumulative.shape, dtype=np.int64)) if return_span else monthly
+
+    # 每列上一个有数据的行（不含本行），没有时为 -1
+    observed = ~np.isnan(values)
+    rows = np.arange(len(values))[:, None]
+    previous = np.maximum.accumulate(np.where(observed, rows, -1), axis=0)
+    previous = np.concatenate([np.full((1, values.shape[1]), -1), previous[:-1]])
+    safe = np.maximum(previous, 0)
+    same_year = (previous >= 0) & (year[safe] == year[:, None])
+
+    base = np.where(same_year, np.take_along_axis(values, safe, axis=0), 0.0)
+    monthly = np.where(observed, values - base, np.nan).reshape(cumulative.shape)
+    if not return_span:
+        return monthly
+    span = np.where(observed, month[:, None] - np.where(same_year, month[safe], 0), 0)
+    return monthly, span.reshape(cumulative.shape)
+
+
+class AppendBuffer:
+    """
+    按行追加的数组：容量不足时翻倍，追加的均摊代价与新增行数成正比
+
+    view() 返回已填充部分的只读视图。追加只写入视图之后的位置（或换一块新的内存），
+    所以之前取出的视图内容不会改变，可以放心交给调用方。
+    """
+
+    def __init__(self, rows, capacity=64):
+        rows = np.asarray(rows)
+        self._data = np.empty((max(capacity, 2 * len(rows)),) + rows.shape[1:], dtype=rows.dtype)
+        self._data[:len(rows)] = rows
+        self._size = len(rows)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        end = self._size + len(rows)
+        if end > len(self._data):
+            data = np.empty((max(end, 2 * len(self._data)),) + self._data.shape[1:], dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:end] = rows
+        self._size = end
+        return self
+
+    def view(self):
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+
+def _numpy_backed(frame):
+    """各列是否都是 numpy 数值、布尔或日期类型（可以放进 AppendBuffer）"""
+    return all(isinstance(dtype, np.dtype) and dtype.kind in 'biufmM' for dtype in frame.dtypes)
+
+
+class FrameBuffer:
+    """
+    按行追加的数据框
+
+    各列都是 numpy 类型时，每列（和索引）放在一个 AppendBuffer 中，frame() 用各列的只读视图
+    组装数据框，不复制数据，追加的均摊代价与新增行数成正比；原地修改返回的数据框会报错
+    （只读），需要修改时先 copy()。有其他类型的列（如文本），或新增行的类型与已有的不同时，
+    退回 pd.concat。
+    """
+
+    def __init__(self, frame):
+        self.columns = frame.columns
+        self._frame = frame
+        self._buffers = None
+        if _numpy_backed(frame):
+            self._buffers = [AppendBuffer(frame.index.to_numpy())]
+            self._buffers += [AppendBuffer(column.to_numpy()) for _, column in frame.items()]
+            self._frame = None
+
+    def __len__(self):
+        return len(self._buffers[0]) if self._buffers is not None else len(self._frame)
+
+    def append(self, rows):
+        if not len(rows):
+            return self
+        dtypes = list(rows.dtypes)
+        if self._buffers is not None and _numpy_backed(rows) and rows.index.dtype == self._buffers[0].dtype \
+                and dtypes == [buffer.dtype for buffer in self._buffers[1:]]:
+            self._buffers[0].extend(rows.index.to_numpy())
+            for buffer, (_, column) in zip(self._buffers[1:], rows.items()):
+                buffer.extend(column.to_numpy())
+            self._frame = None
+            return self
+        self._frame = pd.concat([self.frame(), rows])
+        self._buffers = None
+        return self
+
+    def frame(self):
+        """当前的全部数据（组装好的数据框在下一次追加前复用）"""
+        if self._frame is None:
+            index, *columns = (buffer.view() for buffer in self._buffers)
+            frame = pd.DataFrame(dict(enumerate(columns)), index=index, copy=False)
+            frame.columns = self.columns
+            self._frame = frame
+        return self._frame
+
+
+class IncrementalTable:
+    """
+    按时间排序的月度表格，支持只处理新增月份的刷新
+
+    参数:
+    convert: 函数，把原始行（数据框）转换为处理后的行，需包含解析好的 '时间' 列；
+             时间解析失败（NaT）的行会被丢弃
+    key_col: 原始数据中的时间列名
+    value_cols: 参与 RunningMoments 统计的列
+    require: 这些列都不缺失的行才计入统计（如铁路、公路运货量）
+    cumulative_cols: 需要差分为当月值的累计值列
+
+    新增的行由位置识别：原始数据比上次多出的行在末尾（按时间升序的文件）或开头（国家数据
+    按时间倒序导出）。只对新增行和两行锚点（上次数据的第一行和最后一行）计算哈希，锚点不变
+    就认为已有的行没有变化；锚点变化、行数减少、列变化或新月份插在已有数据中间时完整重算。
+    锚点之间的历史行被修改（行数不变）不会被发现，这种情况请先 clear() 再刷新。
+    """
+
+    def __init__(self, convert, key_col, value_cols=(), require=(), cumulative_cols=()):
+        self.convert = convert
+        self.key_col = key_col
+        self.value_cols = list(value_cols)
+        self.require = list(require)
+        self.cumulative_cols = list(cumulative_cols)
+        self.moments = None
+        self._frames = None
+        self._monthly = None
+        self._raw_len = 0
+        self._anchors = None
+        self._raw_columns = None
+
+    @property
+    def frame(self):
+        """按时间升序的处理后数据（RangeIndex），没有刷新过时为 None"""
+        return self._frames.frame() if self._frames is not None else None
+
+    @property
+    def monthly(self):
+        """累计值列差分得到的当月值（与 frame 的行对应），没有刷新过时为 None"""
+        return self._monthly.frame() if self._monthly is not None else None
+
+    def clear(self):
+        """丢弃全部状态，下一次刷新完整重算"""
+        self.moments = self._frames = self._monthly = self._anchors = self._raw_columns = None
+        self._raw_len = 0
+
+    def _stats_rows(self, frame):
+        """参与统计的行的数值"""
+        if self.require:
+            frame = frame.dropna(subset=self.require)
+        values = frame[self.value_cols]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in values.dtypes):
+            values = values.apply(pd.to_numeric, errors='coerce')
+        return values.to_numpy(dtype=np.float64)
+
+    def _monthly_frame(self, times, frame):
+        return pd.DataFrame(cumulative_to_monthly(times, frame[self.cumulative_cols].to_numpy()),
+                            columns=self.cumulative_cols, index=frame.index)
+
+    @staticmethod
+    def _row_hashes(raw, positions):
+        return pd.util.hash_pandas_object(raw.iloc[positions], index=False).to_numpy()
+
+    def _remember(self, raw, anchors=None):
+        self._raw_len = len(raw)
+        self._raw_columns = list(raw.columns)
+        if anchors is None and len(raw):
+            anchors = self._row_hashes(raw, [0, len(raw) - 1])
+        self._anchors = anchors
+
+    def _rebuild(self, raw):
+        frame = self.convert(raw.copy())
+        frame = frame.dropna(subset=['时间']).sort_values(by='时间').reset_index(drop=True)
+        self._frames = FrameBuffer(frame)
+        self.moments = RunningMoments(self.value_cols).update(self._stats_rows(frame))
+        self._monthly = FrameBuffer(self._monthly_frame(frame['时间'], frame))
+        self._remember(raw)
+        return 'full', len(frame)
+
+    def _new_rows(self, raw):
+        """
+        (原始数据中新增行的位置切片, 本次数据的锚点哈希)；已有的行有变化（锚点不符）时切片为 None
+        """
+        old, total = self._raw_len, len(raw)
+        if not old or total < old or self._anchors is None:
+            return None, None
+        # 上次的数据在开头（新增行在末尾）或在末尾（新增行在开头）时锚点的位置，一次算出哈希；
+        # 第一个和最后一个位置也就是本次数据的锚点
+        hashes = self._row_hashes(raw, [0, old - 1, total - old, total - 1])
+        anchors = hashes[[0, 3]]
+        if (hashes[:2] == self._anchors).all():
+            return slice(old, total), anchors
+        if (hashes[2:] == self._anchors).all():
+            return slice(0, total - old), anchors
+        return None, None
+
+    def refresh(self, raw):
+        """
+        用最新的原始数据刷新，代价与新增行数成正比（与已有行数无关）
+
+        返回 (方式, 处理的行数)，方式为 'full'（完整重算）、'append'（只追加新增月份）
+        或 'unchanged'（没有变化）
+        """
+        if self._frames is None or list(raw.columns) != self._raw_columns:
+            return self._rebuild(raw)
+        positions, anchors = self._new_rows(raw)
+        if positions is None:
+            return self._rebuild(raw)
+        if positions.start == positions.stop:
+            return 'unchanged', 0
+
+        new_rows = self.convert(raw.iloc[positions].copy())
+        new_rows = new_rows.dropna(subset=['时间']).sort_values(by='时间')
+        start = len(self._frames)
+        times = self._frames.frame()['时间'].to_numpy()
+        if start and len(new_rows) and new_rows['时间'].iloc[0] <= times[-1]:
+            # 新月份插在已有数据中间（补录历史数据），顺序相关的结果需要重算
+            return self._rebuild(raw)
+
+        new_rows.index = pd.RangeIndex(start, start + len(new_rows))
+        self.moments.update(self._stats_rows(new_rows))
+        # 差分只需要新增行和已有数据最后一年的行（同一年中上一个有数据的月份在其中）
+        first = start
+        if start:
+            last_year = pd.Timestamp(times[-1]).year
+            first = int(np.searchsorted(times, np.datetime64(f'{last_year}-01-01').astype(times.dtype)))
+        previous = self._frames.frame().iloc[first:start]
+        tail = pd.concat([previous, new_rows]) if len(previous) else new_rows
+        self._frames.append(new_rows)
+        self._monthly.append(self._monthly_frame(tail['时间'], tail).iloc[start - first:])
+        self._remember(raw, anchors)
+        return 'append', len(new_rows)
@@ -0,0 +1,215 @@
+"""
+批量技术指标计算
+
+所有函数既接受一维数组（单只股票），也接受 (交易日数 T × 股票数 N) 的二维数组，
+二维时各列独立计算、一次完成。缺失值（例如股票上市前）用 NaN 表示，
+包含 NaN 的窗口结果为 NaN。
+"""
+import numpy as np
+import pandas as pd
+
+# 默认计算的窗口
+DEFAULT_SMA_WINDOWS = (5, 10, 20, 60)
+DEFAULT_EMA_SPANS = (12, 26)
+DEFAULT_VOL_WINDOWS = (20, 60)
+
+
+def _as_2d(x):
+    """转换为 float64 二维数组，返回 (数组, 原来是否为一维)"""
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        return x[:, None], True
+    return x, False
+
+
+def _restore(result, was_1d):
+    return result[:, 0] if was_1d else result
+
+
+def rolling_sum(x, windows):
+    """
+    基于累积和的滚动求和，一次计算多个窗口
+
+    返回 {窗口: 与 x 同形状的数组}，前 window-1 行及窗口内含 NaN 时为 NaN
+    """
+    x, was_1d = _as_2d(x)
+    nan_mask = np.isnan(x)
+    has_nan = nan_mask.any()
+    csum = np.zeros((x.shape[0] + 1, x.shape[1]))
+    np.cumsum(np.where(nan_mask, 0.0, x) if has_nan else x, axis=0, out=csum[1:])
+    if has_nan:
+        # 有效值个数的累积和，用来判断窗口内是否含有 NaN
+        ccount = np.zeros((x.shape[0] + 1, x.shape[1]), dtype=np.int32)
+        np.cumsum(~nan_mask, axis=0, out=ccount[1:])
+
+    results = {}
+    for window in windows:
+        total = np.empty_like(x)
+        total[:window - 1] = np.nan
+        np.subtract(csum[window:], csum[:-window], out=total[window - 1:])
+        if has_nan:
+            total[window - 1:][ccount[window:] - ccount[:-window] < window] = np.nan
+        results[window] = _restore(total, was_1d)
+    return results
+
+
+def sma(x, windows=DEFAULT_SMA_WINDOWS):
+    """简单移动平均，返回 {窗口: 数组}"""
+    return {window: total / window for window, total in rolling_sum(x, windows).items()}
+
+
+def rolling_std(x, windows, ddof=1):
+    """滚动标准差（由 x 与 x² 的累积和得到），返回 {窗口: 数组}"""
+    x2d, was_1d = _as_2d(x)
+    # 先减去列均值，减小累积和相减时的舍入误差（方差不受平移影响）
+    if x2d.size and not np.isnan(x2d).all():
+        x2d = x2d - np.nanmean(x2d, axis=0)
+    sums = rolling_sum(x2d, windows)
+    squares = rolling_sum(x2d ** 2, windows)
+    results = {}
+    for window in windows:
+        mean = sums[window] / window
+        var = (squares[window] - window * mean ** 2) / (window - ddof)
+        results[window] = _restore(np.sqrt(np.maximum(var, 0.0)), was_1d)
+    return results
+
+
+def _ewm(x, alphas):
+    """
+    指数加权平均（与 pandas ewm(adjust=False) 一致），一次计算多个平滑系数
+
+    x: (T, N) 数组；alphas: 长度为 S 的系数序列
+    返回 (S, T, N) 数组。按时间逐行递推，每一步对所有系数和所有股票做向量运算。
+    """
+    alphas = np.asarray(alphas, dtype=np.float64)[:, None]
+    out = np.full((len(alphas),) + x.shape, np.nan)
+    prev = np.full((len(alphas), x.shape[1]), np.nan)
+    for t in range(x.shape[0]):
+        row = x[t]
+        current = alphas * row + (1 - alphas) * prev
+        # 第一个有效值作为初值；当天缺失时沿用前值
+        current = np.where(np.isnan(prev), row, current)
+        current = np.where(np.isnan(row), prev, current)
+        out[:, t] = current
+        prev = current
+    return out
+
+
+def ema(x, spans=DEFAULT_EMA_SPANS):
+    """指数移动平均，返回 {周期: 数组}"""
+    x2d, was_1d = _as_2d(x)
+    values = _ewm(x2d, [2.0 / (span + 1) for span in spans])
+    return {span: _restore(values[i], was_1d) for i, span in enumerate(spans)}
+
+
+def _diff(x):
+    out = np.full_like(x, np.nan)
+    out[1:] = x[1:] - x[:-1]
+    return out
+
+
+def rsi(close, period=14):
+    """相对强弱指标（Wilder 平滑）"""
+    close, was_1d = _as_2d(close)
+    change = _diff(close)
+    gains = np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0))
+    losses = np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0))
+    # 涨幅和跌幅拼在一起做一次平滑
+    smoothed = _ewm(np.concatenate([gains, losses], axis=1), [1.0 / period])[0]
+    avg_gain, avg_loss = smoothed[:, :close.shape[1]], smoothed[:, close.shape[1]:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100 - 100 / (1 + avg_gain / avg_loss)
+    value = np.where((avg_loss == 0) & (avg_gain > 0), 100.0, value)
+    return _restore(value, was_1d)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD，返回 (DIF, DEA 信号线, 柱状值)"""
+    close, was_1d = _as_2d(close)
+    fast_ema, slow_ema = _ewm(close, [2.0 / (fast + 1), 2.0 / (slow + 1)])
+    dif = fast_ema - slow_ema
+    dea = _ewm(dif, [2.0 / (signal + 1)])[0]
+    return _restore(dif, was_1d), _restore(dea, was_1d), _restore(dif - dea, was_1d)
+
+
+def bollinger(close, window=20, k=2.0):
+    """布林带，返回 (中轨, 上轨, 下轨)"""
+    mid = sma(close, [window])[window]
+    std = rolling_std(close, [window], ddof=0)[window]
+    return mid, mid + k * std, mid - k * std
+
+
+def atr(high, low, close, period=14):
+    """平均真实波幅（Wilder 平滑）"""
+    high, was_1d = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    prev_close = np.full_like(close, np.nan)
+    prev_close[1:] = close[:-1]
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _restore(_ewm(true_range, [1.0 / period])[0], was_1d)
+
+
+def rolling_volatility(close, windows=DEFAULT_VOL_WINDOWS, periods_per_year=252):
+    """对数收益率的滚动波动率（年化），返回 {窗口: 数组}"""
+    close, was_1d = _as_2d(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = _diff(np.log(close))
+    scale = np.sqrt(periods_per_year) if periods_per_year else 1.0
+    return {window: _restore(std * scale, was_1d) for window, std in rolling_std(returns, windows).items()}
+
+
+def compute_indicators(high, low, close, sma_windows=DEFAULT_SMA_WINDOWS, ema_spans=DEFAULT_EMA_SPANS,
+                       vol_windows=DEFAULT_VOL_WINDOWS, rsi_period=14, atr_period=14, boll_window=20):
+    """
+    一次计算全部指标
+
+    参数均为一维（单只股票）或 (T × N) 二维数组，返回 {指标名: 数组}，
+    指标名形如 'sma_20'、'ema_12'、'rsi_14'、'macd'、'boll_upper'、'atr_14'、'vol_20'。
+    """
+    close2d, was_1d = _as_2d(close)
+    results = {}
+    # 所有 SMA 共用一次累积和
+    for window, values in sma(close, sma_windows).items():
+        results[f'sma_{window}'] = values
+    # 所有 EMA 与 MACD 的快慢线在同一次递推中完成
+    fast, slow, signal = 12, 26, 9
+    spans = list(dict.fromkeys(list(ema_spans) + [fast, slow]))
+    ema_values = dict(zip(spans, _ewm(close2d, [2.0 / (span + 1) for span in spans])))
+    for span in ema_spans:
+        results[f'ema_{span}'] = _restore(ema_values[span], was_1d)
+    dif = ema_values[fast] - ema_values[slow]
+    dea = _ewm(dif, [2.0 / (signal + 1)])[0]
+    for name, values in (('macd', dif), ('macd_signal', dea), ('macd_hist', dif - dea)):
+        results[name] = _restore(values, was_1d)
+
+    results[f'rsi_{rsi_period}'] = rsi(close, rsi_period)
+    mid, upper, lower = bollinger(close, boll_window)
+    results['boll_mid'], results['boll_upper'], results['boll_lower'] = mid, upper, lower
+    results[f'atr_{atr_period}'] = atr(high, low, close, atr_period)
+    for window, values in rolling_volatility(close, vol_windows).items():
+        results[f'vol_{window}'] = values
+    return results
+
+
+def indicators_frame(df, **kwargs):
+    """
+    为单只股票的日线数据框计算全部指标
+
+    df 需按 trade_date 升序排列（stock_loader.read_stock_csv 的结果即可），
+    返回以原索引为索引、每个指标一列的数据框。
+    """
+    results = compute_indicators(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), **kwargs)
+    return pd.DataFrame(results, index=df.index)
+
+
+def panel_indicators(panel, **kwargs):
+    """
+    为 StockPanel 中的全部股票一次计算指标
+
+    返回 (交易日数组, 股票代码列表, {指标名: (T × N) 数组})
+    """
+    dates, tickers, high = panel.to_matrix('high')
+    _, _, low = panel.to_matrix('low')
+    _, _, close = panel.to_matrix('close')
+    return dates, tickers, compute_indicators(high, low, close, **kwargs)
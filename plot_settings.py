@@ -0,0 +1,115 @@
+"""
+绘图的公共设置：中文字体和降采样点数预算
+
+本模块只依赖标准库，导入时不加载 matplotlib。中文字体的查找结果写入
+磁盘缓存（.font_cache.json），之后的进程和 Streamlit 重跑直接读取，
+不再遍历 fontManager.ttflist。
+"""
+import json
+import os
+import platform
+
+# 默认的绘图点数预算，超过时自动降采样；设为 None 或 0 表示不降采样
+DEFAULT_MAX_POINTS = 2000
+
+# 中文字体查找结果的缓存文件
+FONT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.font_cache.json')
+
+# 各系统尝试的字体列表（按优先级排序）
+FONT_CANDIDATES = {
+    'Windows': ["SimHei", "Microsoft YaHei", "KaiTi", "FangSong", "Arial Unicode MS"],
+    'Darwin': ["Heiti TC", "STHeiti", "PingFang SC", "Hiragino Sans GB", "Arial Unicode MS"],
+    'Linux': ["WenQuanYi Micro Hei", "WenQuanYi Zen Hei", "DejaVu Sans", "Arial Unicode MS"],
+}
+
+# 进程内的查找结果 {候选字体元组: (可用字体列表)}
+_resolved = {}
+
+
+def font_candidates():
+    """当前系统的候选中文字体"""
+    return FONT_CANDIDATES.get(platform.system(), FONT_CANDIDATES['Linux'])
+
+
+def _read_font_cache(key):
+    try:
+        with open(FONT_CACHE_PATH, encoding='utf-8') as f:
+            entry = json.load(f).get(key)
+    except (OSError, ValueError, AttributeError):
+        return None
+    # 字体文件被删除（或换了机器）时缓存失效
+    if not entry or not all(os.path.exists(path) for path in entry['paths']):
+        return None
+    return entry['fonts']
+
+
+def _write_font_cache(key, fonts, paths):
+    try:
+        with open(FONT_CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache[key] = {'fonts': fonts, 'paths': paths}
+    try:
+        with open(FONT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def resolve_chinese_fonts(candidates=None):
+    """
+    返回候选字体中系统已安装的字体列表（按优先级），一个都没有时返回空列表
+
+    结果在进程内记忆，并写入磁盘缓存；只有缓存缺失或失效时才加载
+    matplotlib.font_manager 扫描字体列表。
+    """
+    candidates = tuple(candidates or font_candidates())
+    if candidates in _resolved:
+        return list(_resolved[candidates])
+
+    key = f"{platform.system()}|{'|'.join(candidates)}"
+    fonts = _read_font_cache(key)
+    if fonts is None:
+        import matplotlib.font_manager as fm
+
+        # 只遍历一次字体列表
+        installed = {}
+        for entry in fm.fontManager.ttflist:
+            installed.setdefault(entry.name, entry.fname)
+        fonts = [font for font in candidates if font in installed]
+        # 找不到字体时不写缓存，安装字体后下次启动即可生效
+        if fonts:
+            _write_font_cache(key, fonts, [installed[font] for font in fonts])
+
+    _resolved[candidates] = fonts
+    return list(fonts)
+
+
+def apply_chinese_font(candidates=None):
+    """
+    把中文字体写入 matplotlib 的 rcParams，返回使用的字体名（找不到时返回None）
+
+    只有字体查找结果在进程内记忆；每次调用都检查当前的 rcParams，被 plt.rcdefaults()、
+    样式上下文或 rcParams.update() 改掉后会重新设置，已经是目标值时不做修改。
+    """
+    fonts = resolve_chinese_fonts(candidates)
+    import matplotlib
+
+    # 找不到中文字体时使用默认字体
+    family = fonts or ['sans-serif']
+    rc = matplotlib.rcParams
+    if list(rc['font.family']) != family:
+        rc['font.family'] = family
+    if rc['axes.unicode_minus']:
+        rc['axes.unicode_minus'] = False  # 解决负号显示问题
+    return fonts[0] if fonts else None
+
+
+def clear_font_cache():
+    """清除字体查找结果（进程内和磁盘上的缓存）"""
+    _resolved.clear()
+    try:
+        os.remove(FONT_CACHE_PATH)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,183 @@
+"""
+滚动 / 扩展窗口相关系数与领先滞后（互相关）分析
+
+pandas 的 rolling().corr() 每个窗口重新求和，代价为 O(T × W)。这里对每个滞后只做
+一次累计和：有效行数、x、y、x²、y²、xy 六个量的累计和排成 (6, T + 1, P) 的数组，
+任意窗口长度的窗口和都是两行累计和之差，所以整个 (窗口 × 滞后 × 序列对) 网格的
+代价是 O(滞后数 × (1 + 窗口数) × T × P)，与窗口长度无关。
+
+约定：
+- x、y 为 T × P 数组（或长度为 T 的一维数组），第 p 列 x 与第 p 列 y 构成一对序列，
+  行按时间升序，缺失值为 NaN；每个窗口只使用两者都有数据的行（与 pandas 一致）
+- 滞后 k 的相关系数是 x[t] 与 y[t - k] 的相关系数：k > 0 表示 y 领先 x k 期，
+  k < 0 表示 y 落后 x
+- 窗口为 None 表示扩展窗口（从第一行到当前行）
+"""
+import numpy as np
+
+# 窗口方差小于累计平方和的这个比例时，累计和相减的舍入误差可能已占主导：
+# 扩展窗口视为常数序列（NaN），滚动窗口改为直接在窗口数据上计算
+_VARIANCE_TOLERANCE = 1e-9
+# 直接计算时每批处理的元素数（窗口数 × 窗口长度），限制临时数组的大小
+_DIRECT_CHUNK = 1 << 20
+
+
+def _as_columns(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def _shift(values, lag):
+    """沿时间轴平移 lag 行（与 DataFrame.shift 相同），移出的位置为 NaN"""
+    if lag == 0:
+        return values
+    shifted = np.full(values.shape, np.nan)
+    if abs(lag) < len(values):
+        if lag > 0:
+            shifted[lag:] = values[:-lag]
+        else:
+            shifted[:lag] = values[-lag:]
+    return shifted
+
+
+def _cumulative_moments(x, y):
+    """两者都有数据的行上的 (n, x, y, x², y², xy) 累计和，前面补一行 0，形状 (6, T + 1, P)"""
+    valid = ~(np.isnan(x) | np.isnan(y))
+    # 先减去各列的均值，减小累计平方和相减时的舍入误差
+    counts = np.maximum(valid.sum(axis=0), 1)
+    xc = np.where(valid, x - np.where(valid, x, 0.0).sum(axis=0) / counts, 0.0)
+    yc = np.where(valid, y - np.where(valid, y, 0.0).sum(axis=0) / counts, 0.0)
+    moments = np.stack([valid.astype(np.float64), xc, yc, xc * xc, yc * yc, xc * yc])
+    cumulative = np.zeros((6, len(x) + 1, x.shape[1]))
+    np.cumsum(moments, axis=1, out=cumulative[:, 1:])
+    return cumulative
+
+
+def _direct_correlation(x, y, rows, columns, window):
+    """
+    直接计算以 rows[k] 行结尾、第 columns[k] 列的窗口相关系数（先减去窗口内的均值）
+
+    用于累计和精度不够的窗口（例如前面有一段量级大得多的数据）；窗口内全为常数的序列
+    （最大值等于最小值）为 NaN，与逐窗口计算一致
+    """
+    corr = np.full(len(rows), np.nan)
+    offsets = np.arange(1 - window, 1)
+    step = max(1, _DIRECT_CHUNK // window)
+    for start in range(0, len(rows), step):
+        part = slice(start, start + step)
+        index = rows[part, None] + offsets
+        inside = index >= 0
+        index = np.maximum(index, 0)
+        a = x[index, columns[part, None]]
+        b = y[index, columns[part, None]]
+        valid = inside & ~(np.isnan(a) | np.isnan(b))
+        n = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            a = np.where(valid, a - np.where(valid, a, 0.0).sum(axis=1, keepdims=True) / n[:, None], 0.0)
+            b = np.where(valid, b - np.where(valid, b, 0.0).sum(axis=1, keepdims=True) / n[:, None], 0.0)
+            corr[part] = (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+        flat = ((np.where(valid, a, -np.inf).max(axis=1) == np.where(valid, a, np.inf).min(axis=1))
+                | (np.where(valid, b, -np.inf).max(axis=1) == np.where(valid, b, np.inf).min(axis=1)))
+        corr[part][flat] = np.nan
+    return corr
+
+
+def _window_correlation(cumulative, window, min_periods, x=None, y=None):
+    """
+    由累计和求每一行结尾的窗口内的相关系数，返回 T × P 数组
+
+    x、y 为累计和对应的原始数据；给出时，方差只剩舍入误差量级的滚动窗口改为直接计算
+    """
+    total = cumulative.shape[1] - 1
+    if min_periods is None:
+        min_periods = 3 if window is None else window
+    end = cumulative[:, 1:]
+    rolling = window is not None and window < total
+    if rolling:
+        # 第 t 行的窗口和 = 第 t 行的累计和 - 第 t - window 行的累计和（前 window 行减去的是 0）
+        sums = end.copy()
+        sums[:, window:] -= cumulative[:, 1:total - window + 1]
+    else:
+        sums = end
+    n, sx, sy, sxx, syy, sxy = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        cov = sxy - sx * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    # 方差只剩舍入误差：扩展窗口的累计和就是窗口和本身，视为常数窗口；滚动窗口的误差来自
+    # 窗口之前的累计平方和，与窗口本身的方差无关，直接在窗口数据上重新计算
+    suspect = (var_x <= _VARIANCE_TOLERANCE * end[3]) | (var_y <= _VARIANCE_TOLERANCE * end[4])
+    short = n < max(min_periods, 2)
+    if rolling and x is not None:
+        rows, columns = np.nonzero(suspect & ~short)
+        corr[rows, columns] = _direct_correlation(x, y, rows, columns, window)
+        corr[short] = np.nan
+    else:
+        corr[short | suspect] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_grid(x, y, windows=(None,), lags=(0,), min_periods=None):
+    """
+    批量计算 (窗口 × 滞后) 网格上各序列对的相关系数
+
+    参数:
+    x, y: T × P 数组（或长度为 T 的一维数组）
+    windows: 窗口长度（行数）列表，None 表示扩展窗口
+    lags: 滞后期数列表
+    min_periods: 窗口内至少需要的有效行数，不足时为 NaN；None 时滚动窗口为窗口长度
+                 （与 pandas 的 rolling().corr() 一致），扩展窗口为 3
+
+    返回形状为 (窗口数, 滞后数, T, P) 的数组；[i, j, t, p] 是以第 t 行结尾、
+    长度为 windows[i] 的窗口内，x[:, p] 与平移 lags[j] 行后的 y[:, p] 的相关系数
+    """
+    x, y = _as_columns(x), _as_columns(y)
+    grid = np.full((len(windows), len(lags)) + x.shape, np.nan)
+    for j, lag in enumerate(lags):
+        shifted = _shift(y, lag)
+        cumulative = _cumulative_moments(x, shifted)
+        for i, window in enumerate(windows):
+            grid[i, j] = _window_correlation(cumulative, window, min_periods, x, shifted)
+    return grid
+
+
+def rolling_correlation(x, y, window, min_periods=None):
+    """滚动窗口相关系数（T × P）；min_periods 默认等于 window，与 pandas 的 rolling().corr() 一致"""
+    return correlation_grid(x, y, [window], [0], min_periods)[0, 0]
+
+
+def expanding_correlation(x, y, min_periods=3):
+    """扩展窗口相关系数（T × P）：每一行是从开头到该行的全部数据的相关系数"""
+    return correlation_grid(x, y, [None], [0], min_periods)[0, 0]
+
+
+def cross_correlation(x, y, max_lag=24, min_periods=3):
+    """
+    全样本的互相关：滞后 -max_lag 到 max_lag 的相关系数
+
+    返回 (滞后数组, (2 × max_lag + 1) × P 数组)
+    """
+    x, y = _as_columns(x), _as_columns(y)
+    lags = np.arange(-max_lag, max_lag + 1)
+    ccf = np.full((len(lags), x.shape[1]), np.nan)
+    for j, lag in enumerate(lags):
+        cumulative = _cumulative_moments(x, _shift(y, lag))
+        # 全样本的相关系数只需要累计和的最后一行
+        ccf[j] = _window_correlation(cumulative[:, [0, -1]], None, min_periods)[-1]
+    return lags, ccf
+
+
+def strongest_lag(lags, ccf):
+    """每个序列对绝对值最大的相关系数所在的滞后及其相关系数，全为 NaN 时滞后为 None"""
+    lags = np.asarray(lags)
+    ccf = _as_columns(ccf)
+    results = []
+    for p in range(ccf.shape[1]):
+        column = ccf[:, p]
+        if np.isnan(column).all():
+            results.append((None, np.nan))
+            continue
+        j = int(np.nanargmax(np.abs(column)))
+        results.append((int(lags[j]), float(column[j])))
+    return results
@@ -0,0 +1,179 @@
+"""
+进程内跨会话共享的只读数据缓存
+
+Streamlit 的各个会话是同一个服务器进程中的线程。st.cache_data 每次命中都会把缓存的
+结果反序列化成一份新的副本，同一个文件被多人打开时，每个会话（每次重跑）都持有
+自己的 DataFrame。SharedDatasetCache 按内容哈希把结果只保存一份：
+
+- 放入缓存时做一次快照：数组复制后设为只读，DataFrame 深复制一次，其他对象深复制，
+  之后数据源（如增量刷新的状态）再变化也不会影响缓存中的结果；
+- 取出时给出视图：数组本身只读，直接共享；DataFrame / Series 在 pandas 的写时复制
+  开启时（pandas >= 3 总是开启，2.x 需设置 pd.options.mode.copy_on_write = True）是
+  浅复制，会话中的修改（包括 df.loc[...] = ...）只会复制被修改的列，不会写回共享数据；
+  写时复制未开启时退回深复制，每个会话一份副本；字典、列表重新组装，会话增删键不影响
+  缓存；其他可变对象（如 RunningMoments）每次给出深复制（这类对象都很小），字符串、
+  数值等不可变对象直接共享；
+- 所有条目共用一个内存预算（字节），超出时淘汰最久未用的条目；被淘汰的数据在
+  仍在使用它的会话结束后由垃圾回收释放；
+- 同一个键同时未命中时只构建一次，其他会话等待构建完成后直接共享结果。
+"""
+import copy
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# 默认内存预算：512 MB
+DEFAULT_BUDGET_BYTES = 512 * 2 ** 20
+
+# 可以直接共享给各会话的不可变对象
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), np.generic, pd.Timestamp,
+                    pd.Timedelta, pd.Period)
+
+
+def copy_on_write_enabled():
+    """pandas 的写时复制是否开启（开启时 DataFrame 的浅复制才能隔离各会话的修改）"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return bool(pd.options.mode.copy_on_write)
+
+
+def _freeze(obj):
+    """放入缓存前的快照：数组只读，DataFrame / Series 深复制，容器逐项处理"""
+    if isinstance(obj, np.ndarray):
+        frozen = obj.copy()
+        frozen.flags.writeable = False
+        return frozen
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=True)
+    if isinstance(obj, dict):
+        return {key: _freeze(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_freeze(value) for value in obj)
+    return copy.deepcopy(obj)
+
+
+def _view(obj, shallow_frames=True):
+    """给会话的视图：只读数组和不可变对象直接共享，容器重新组装，其他可变对象深复制"""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=not shallow_frames)
+    if isinstance(obj, dict):
+        return {key: _view(value, shallow_frames) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_view(value, shallow_frames) for value in obj]
+    if isinstance(obj, tuple):
+        return tuple(_view(value, shallow_frames) for value in obj)
+    if isinstance(obj, np.ndarray) and not obj.flags.writeable:
+        return obj
+    if isinstance(obj, _IMMUTABLE_TYPES):
+        return obj
+    return copy.deepcopy(obj)
+
+
+def nbytes(obj, _seen=None):
+    """估算对象占用的内存（字节）：数组和数据框按数据大小，其他对象按属性递归累加"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nbytes(key, seen) + nbytes(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(nbytes(value, seen) for value in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + nbytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+class SharedDatasetCache:
+    """
+    按键（如文件内容哈希）共享的只读结果缓存，线程安全
+
+    写时复制未开启（pandas 2.x 的默认设置）时，DataFrame / Series 每次取出都深复制，
+    仍然隔离各会话，但失去了零拷贝
+
+    budget_bytes: 所有条目的内存预算；最新放入的条目即使单独超出预算也会保留，
+    以免同一个文件反复构建
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()    # {键: (只读结果, 字节数)}，按最近使用排序
+        self._building = {}              # {键: 正在构建该键的锁}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _view(self, value):
+        return _view(value, shallow_frames=copy_on_write_enabled())
+
+    def get(self, key, build):
+        """
+        返回 key 对应结果的视图，没有时调用 build() 构建并放入缓存
+
+        返回 (视图, 是否命中缓存)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._view(entry[0]), True
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        # 同一个键只有一个线程在构建，其他线程等待后读取它的结果
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._view(entry[0]), True
+            try:
+                value = _freeze(build())
+                size = nbytes(value)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = (value, size)
+                    self._evict()
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return self._view(value), False
+
+    def _evict(self):
+        """淘汰最久未用的条目，直到总大小不超过预算（调用方持有锁）"""
+        total = sum(size for _, size in self._entries.values())
+        while total > self.budget_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            total -= size
+            self.evictions += 1
+
+    def discard(self, key=None):
+        """移除一个条目；key 为 None 时清空全部"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """条目数、占用字节数、预算和命中/未命中/淘汰次数"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(size for _, size in self._entries.values()),
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
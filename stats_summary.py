@@ -0,0 +1,106 @@
+"""
+多列统计摘要
+
+把要统计的列排成 (行数 T × 列数 N) 的浮点数组，计数、均值、标准差、最值、分位数
+和滚动窗口统计都是对整个数组按列的一次归约，列数增加时不需要逐列、逐指标地
+扫描数据，总代价与 T × N 成正比；格式化也是对整张结果表一次完成。
+缺失值（NaN）不参与统计，与 pandas 的 mean() / std() / count() 等一致。
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def as_matrix(df, columns):
+    """把数据框的若干列转换为 T × N 的浮点数组（不能转换为数值的内容为 NaN）"""
+    if not columns:
+        return np.empty((len(df), 0))
+    values = df[list(columns)]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in values.dtypes):
+        values = values.apply(pd.to_numeric, errors='coerce')
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def column_summary(values, quantiles=(), ddof=1):
+    """
+    各列的基本统计量
+
+    参数:
+    values: T × N 数组，缺失值为 NaN
+    quantiles: 需要的分位点（0-1）
+    ddof: 标准差的自由度修正，默认与 pandas 一致为 1
+
+    返回 {'count', 'mean', 'max', 'min', 'std'} 以及每个分位点 q 对应的键 q，值都是长度为 N 的数组
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    has_data = count > 0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, values, 0.0).sum(axis=0) / count
+        # 先求均值再求离差平方和，比平方和公式的舍入误差小
+        deviation = np.where(valid, values - mean, 0.0)
+        std = np.where(count > ddof, np.sqrt((deviation * deviation).sum(axis=0) / (count - ddof)), np.nan)
+    summary = {
+        'count': count,
+        'mean': np.where(has_data, mean, np.nan),
+        'max': np.where(has_data, np.max(values, axis=0, where=valid, initial=-np.inf), np.nan),
+        'min': np.where(has_data, np.min(values, axis=0, where=valid, initial=np.inf), np.nan),
+        'std': std,
+    }
+    if len(quantiles):
+        # 全为 NaN 的列结果为 NaN，不需要警告
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result = np.nanquantile(values, list(quantiles), axis=0) if len(values) else \
+                np.full((len(quantiles), values.shape[1]), np.nan)
+        for q, row in zip(quantiles, result):
+            summary[q] = row
+    return summary
+
+
+def rolling_summary(values, window, min_periods=None, ddof=1):
+    """
+    各列的滚动窗口均值和标准差（窗口内的缺失值跳过）
+
+    用累计和计算：每个窗口的和 = 累计和之差，总代价 O(T × N)，与窗口大小无关。
+    为减小累计平方和的舍入误差，先减去各列的均值。
+
+    参数:
+    window: 窗口长度（行数）
+    min_periods: 窗口内至少需要的有效值个数，默认等于 window
+
+    返回 (均值, 标准差)，都是 T × N 数组，前 window - 1 行或有效值不足时为 NaN
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        center = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else 0.0
+    x = np.where(valid, values - center, 0.0)
+
+    def windowed(a):
+        total = np.cumsum(a, axis=0)
+        total[window:] -= total[:-window].copy()
+        return total
+
+    n = windowed(valid.astype(np.float64))
+    s = windowed(x)
+    ss = windowed(x * x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n
+        var = np.maximum(ss - n * mean * mean, 0.0) / (n - ddof)
+    enough = n >= max(min_periods, 1)
+    mean = np.where(enough, mean + center, np.nan)
+    std = np.where(enough & (n > ddof), np.sqrt(var), np.nan)
+    return mean, std
+
+
+def format_values(matrix, decimals=2, missing='N/A'):
+    """把数值数组整体格式化为字符串（保留 decimals 位小数），缺失值显示为 missing"""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    text = np.char.mod(f'%.{decimals}f', matrix)
+    return np.where(np.isnan(matrix), missing, text)
@@ -0,0 +1,113 @@
+import glob
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Tushare 日线数据（Python/data/*.csv）的紧凑列类型
+STOCK_DTYPES = {
+    'ts_code': 'category',
+    'trade_date': 'int32',
+    'open': 'float32',
+    'high': 'float32',
+    'low': 'float32',
+    'close': 'float32',
+    'pre_close': 'float32',
+    'change': 'float32',
+    'pct_chg': 'float32',
+    'vol': 'float32',
+    'amount': 'float32',
+}
+
+# 默认每次读取的行数
+DEFAULT_CHUNKSIZE = 100_000
+
+# 进程级缓存：{绝对路径: 按 trade_date 升序排列的数据框}
+_stock_cache = {}
+
+
+def _concat_chunks(chunks):
+    """合并分块读取的结果，ts_code 的分类合并为同一组类别"""
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in STOCK_DTYPES.items()})
+    codes = union_categoricals([chunk['ts_code'] for chunk in chunks])
+    df = pd.concat([chunk.drop(columns='ts_code') for chunk in chunks], ignore_index=True)
+    df.insert(0, 'ts_code', codes)
+    return df
+
+
+def read_stock_csv(path, since=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    分块读取一只股票的日线 CSV
+
+    参数:
+    path: str - CSV 文件路径
+    since: int - 只保留 trade_date 大于该值的行（如 20250905），None 表示全部
+    chunksize: int - 每块行数
+
+    返回:
+    按 trade_date 升序排列的数据框，价格为 float32，trade_date 为 int32，ts_code 为分类类型。
+    Tushare 导出的文件按日期倒序排列，读到早于 since 的数据块后即停止，不再读取剩余部分。
+    """
+    chunks = []
+    reader = pd.read_csv(path, dtype=STOCK_DTYPES, usecols=list(STOCK_DTYPES), chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            dates = chunk['trade_date']
+            if since is not None:
+                chunk = chunk[dates > since]
+                # 倒序文件中后面只会是更早的日期
+                if dates.is_monotonic_decreasing and dates.iloc[-1] <= since:
+                    chunks.append(chunk)
+                    break
+            chunks.append(chunk)
+
+    df = _concat_chunks(chunks)
+    return df.sort_values('trade_date', kind='stable').reset_index(drop=True)
+
+
+def load_stock_data(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    读取股票日线数据并缓存，之后只增量读取比缓存更新的交易日
+
+    返回的是缓存中的对象，调用方不要原地修改。
+    """
+    key = os.path.abspath(path)
+    cached = _stock_cache.get(key)
+    if cached is None or cached.empty:
+        df = read_stock_csv(key, chunksize=chunksize)
+    else:
+        new_rows = read_stock_csv(key, since=int(cached['trade_date'].iloc[-1]), chunksize=chunksize)
+        if new_rows.empty:
+            return cached
+        df = _concat_chunks([cached, new_rows])
+    _stock_cache[key] = df
+    return df
+
+
+def load_market(directory, pattern='*.csv', chunksize=DEFAULT_CHUNKSIZE):
+    """
+    读取目录下全部股票的日线数据并合并
+
+    参数:
+    directory: str - CSV 所在目录，如 'Python/data'
+    pattern: str - 文件名匹配模式
+
+    返回:
+    按文件依次拼接、每只股票内按 trade_date 升序的数据框，各股票共用同一组 ts_code 类别
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    return _concat_chunks([load_stock_data(path, chunksize) for path in paths])
+
+
+def clear_stock_cache(path=None):
+    """清除缓存；path 为 None 时清空全部，否则只清除该文件"""
+    if path is None:
+        _stock_cache.clear()
+    else:
+        _stock_cache.pop(os.path.abspath(path), None)
+
+
+def memory_usage_mb(df):
+    """数据框实际占用的内存（MB）"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
@@ -0,0 +1,156 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stock_loader import STOCK_DTYPES, read_stock_csv
+
+# 面板中保存的数值字段（与 Tushare 日线 CSV 的列一致）
+PANEL_FIELDS = [col for col in STOCK_DTYPES if col not in ('ts_code', 'trade_date')]
+
+
+class StockPanel:
+    """
+    多股票日线面板：trade_date × ts_code 两级索引的连续数组存储
+
+    所有行按 (trade_date, ts_code) 排序后存放在一个 float32 二维数组中，
+    因此某一交易日（或一段日期）的全部股票是连续的一段，用二分查找定位；
+    另存一个按 (ts_code, trade_date) 排序的行号数组，按股票取数同样只需二分查找。
+    """
+
+    def __init__(self, dates, codes, values, tickers, fields=PANEL_FIELDS, ticker_order=None):
+        self.dates = dates            # int32，升序
+        self.codes = codes            # int32，tickers 中的序号
+        self.values = values          # float32，形状 (行数, 字段数)
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self._ticker_pos = {code: i for i, code in enumerate(self.tickers)}
+        self._field_pos = {field: i for i, field in enumerate(self.fields)}
+        if ticker_order is None:
+            ticker_order = np.lexsort((dates, codes))
+        self.ticker_order = ticker_order
+        self._sorted_codes = codes[ticker_order]
+
+    # ---------- 构建 ----------
+
+    @classmethod
+    def from_frame(cls, df):
+        """由包含 ts_code、trade_date 和数值字段的数据框构建面板"""
+        codes = df['ts_code'].astype('category')
+        tickers = list(codes.cat.categories)
+        code_ids = codes.cat.codes.to_numpy(dtype=np.int32)
+        dates = df['trade_date'].to_numpy(dtype=np.int32)
+        order = np.lexsort((code_ids, dates))
+        fields = [field for field in PANEL_FIELDS if field in df.columns]
+        values = np.ascontiguousarray(df[fields].to_numpy(dtype=np.float32)[order])
+        return cls(dates[order], code_ids[order], values, tickers, fields)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __repr__(self):
+        if not len(self):
+            return 'StockPanel(空)'
+        return (f'StockPanel({len(self.tickers)} 只股票, {len(self)} 行, '
+                f'{self.dates[0]}~{self.dates[-1]})')
+
+    # ---------- 查询 ----------
+
+    def _rows_to_frame(self, rows, index='ts_code'):
+        frame = pd.DataFrame(self.values[rows], columns=self.fields)
+        frame.insert(0, 'ts_code', pd.Categorical.from_codes(self.codes[rows], self.tickers))
+        frame.insert(1, 'trade_date', self.dates[rows])
+        return frame.set_index(index)
+
+    def date_slice(self, start, end=None):
+        """返回 start~end（含两端）交易日的全部行，索引为 ts_code"""
+        end = start if end is None else end
+        lo = np.searchsorted(self.dates, start, side='left')
+        hi = np.searchsorted(self.dates, end, side='right')
+        return self._rows_to_frame(slice(lo, hi))
+
+    def ticker_slice(self, ts_code, start=None, end=None):
+        """返回某只股票（可限定日期范围）的全部行，索引为 trade_date"""
+        code = self._ticker_pos.get(ts_code)
+        if code is None:
+            raise KeyError(f"面板中没有股票: {ts_code}")
+        lo = np.searchsorted(self._sorted_codes, code, side='left')
+        hi = np.searchsorted(self._sorted_codes, code, side='right')
+        rows = self.ticker_order[lo:hi]
+        if start is not None or end is not None:
+            dates = self.dates[rows]
+            lo = 0 if start is None else np.searchsorted(dates, start, side='left')
+            hi = len(rows) if end is None else np.searchsorted(dates, end, side='right')
+            rows = rows[lo:hi]
+        return self._rows_to_frame(rows, index='trade_date')
+
+    def cross_section(self, field, trade_date):
+        """某一交易日全部股票的某个字段，如 cross_section('close', 20250905)"""
+        lo = np.searchsorted(self.dates, trade_date, side='left')
+        hi = np.searchsorted(self.dates, trade_date, side='right')
+        return pd.Series(self.values[lo:hi, self._field_pos[field]],
+                         index=pd.Index(np.asarray(self.tickers, dtype=object)[self.codes[lo:hi]], name='ts_code'),
+                         name=field)
+
+    def to_matrix(self, field):
+        """
+        把某个字段展开为 (交易日数 × 股票数) 的宽表数组，缺失处为 NaN
+
+        返回 (升序交易日数组, 股票代码列表, 二维数组)
+        """
+        dates, rows = np.unique(self.dates, return_inverse=True)
+        matrix = np.full((len(dates), len(self.tickers)), np.nan, dtype=np.float64)
+        matrix[rows, self.codes] = self.values[:, self._field_pos[field]]
+        return dates, self.tickers, matrix
+
+    def to_frame(self):
+        """转换为 (trade_date, ts_code) 两级索引的数据框"""
+        return self._rows_to_frame(slice(None), index=['trade_date', 'ts_code'])
+
+    # ---------- 保存与读取 ----------
+
+    def save(self, directory):
+        """保存为目录下的 .npy 文件，读取时可以内存映射"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ('dates', 'codes', 'values', 'ticker_order'):
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'tickers': self.tickers, 'fields': self.fields}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """读取 save 保存的面板；mmap=True 时数组按需从磁盘映射，不整体读入内存"""
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode)
+                  for name in ('dates', 'codes', 'values', 'ticker_order')}
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(arrays['dates'], arrays['codes'], arrays['values'], meta['tickers'], meta['fields'],
+                   arrays['ticker_order'])
+
+
+def build_panel(directory, pattern='*.csv', max_workers=None):
+    """
+    并行读取目录下每只股票的日线 CSV 并构建面板
+
+    参数:
+    directory: str - CSV 所在目录，如 'Python/data'
+    pattern: str - 文件名匹配模式
+    max_workers: int - 进程数，默认等于 CPU 核数；为 1 时在当前进程中顺序读取
+
+    注意：Windows 上使用多进程时，脚本需要在 if __name__ == '__main__': 中调用本函数
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    if max_workers == 1 or len(paths) <= 1:
+        frames = [read_stock_csv(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(read_stock_csv, paths))
+
+    frames = [frame.assign(ts_code=frame['ts_code'].astype(str)) for frame in frames]
+    if not frames:
+        return StockPanel.from_frame(pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in STOCK_DTYPES.items()}))
+    return StockPanel.from_frame(pd.concat(frames, ignore_index=True))
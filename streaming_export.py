@@ -0,0 +1,159 @@
+"""
+分块流式导出
+
+DataFrame.to_csv() 不给路径时会先生成完整的 CSV 字符串，再 encode 成字节，内存中
+同时有两份完整结果。这里按 chunk_rows 行一块写出：每块格式化、编码（和压缩）后立即
+写入目标文件或缓冲区，内存中只有一块的文本，峰值与结果的总行数无关。
+
+支持的格式：CSV、gzip / zstd 压缩的 CSV 和 Parquet（每块一个 row group）。
+zstd 需要 zstandard 库，Parquet 需要 pyarrow，未安装时 available_formats() 不列出。
+"""
+import gzip
+import io
+import os
+import tempfile
+
+# 每块的行数
+DEFAULT_CHUNK_ROWS = 50_000
+
+# 导出格式：{格式: (显示名称, 文件扩展名, MIME 类型)}
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV（gzip 压缩）', '.csv.gz', 'application/gzip'),
+    'csv.zst': ('CSV（zstd 压缩）', '.csv.zst', 'application/zstd'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def available_formats():
+    """当前环境可用的导出格式（zstandard、pyarrow 为可选依赖）"""
+    formats = ['csv', 'csv.gz']
+    try:
+        import zstandard  # noqa: F401
+        formats.append('csv.zst')
+    except ImportError:
+        pass
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append('parquet')
+    except ImportError:
+        pass
+    return formats
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def _open_compressed(stream, fmt):
+    """在二进制流外包一层压缩，返回可写的流（关闭它不会关闭 stream）"""
+    if fmt == 'csv.gz':
+        # mtime 固定为 0，同样的数据得到同样的文件
+        return gzip.GzipFile(fileobj=stream, mode='wb', mtime=0)
+    if fmt == 'csv.zst':
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(stream, closefd=False)
+    return None
+
+
+def write_csv_chunks(df, stream, chunk_rows=DEFAULT_CHUNK_ROWS, encoding='utf-8'):
+    """
+    把数据框按块写成 CSV（不含索引）到二进制流
+
+    encoding 为 'utf-8-sig' 时只在文件开头写一次 BOM（便于 Excel 识别中文）。
+    """
+    if encoding.lower().replace('_', '-') == 'utf-8-sig':
+        stream.write('\ufeff'.encode('utf-8'))
+        encoding = 'utf-8'
+    for start, chunk in _chunks(df, chunk_rows):
+        stream.write(chunk.to_csv(index=False, header=start == 0).encode(encoding))
+
+
+def _unique_columns(columns):
+    """重复的列名依次加上 .1、.2 后缀（与 read_csv 读取重复列名的规则一致）"""
+    seen = {}
+    names = []
+    for col in map(str, columns):
+        count = seen.get(col, 0)
+        seen[col] = count + 1
+        names.append(col if count == 0 else f'{col}.{count}')
+    return names
+
+
+def _write_parquet_chunks(df, stream, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Parquet 不允许重复的列名（如数据类型为同比增长时运货量列与增长率列相同）
+    if not df.columns.is_unique:
+        df = df.set_axis(_unique_columns(df.columns), axis=1)
+    writer = None
+    try:
+        for _, chunk in _chunks(df, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(stream, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(df, target, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, encoding='utf-8'):
+    """
+    按块导出数据框
+
+    参数:
+    df: 要导出的数据框（不导出索引）
+    target: 文件路径或可写的二进制流（流不会被关闭）
+    fmt: EXPORT_FORMATS 中的格式
+    chunk_rows: 每块的行数
+    encoding: CSV 的编码，Parquet 忽略
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"未知的导出格式: {fmt}")
+    if isinstance(target, str):
+        with open(target, 'wb') as f:
+            write_export(df, f, fmt, chunk_rows, encoding)
+        return target
+
+    if fmt == 'parquet':
+        _write_parquet_chunks(df, target, chunk_rows)
+        return target
+    compressed = _open_compressed(target, fmt)
+    if compressed is None:
+        write_csv_chunks(df, target, chunk_rows, encoding)
+    else:
+        with compressed:
+            write_csv_chunks(df, compressed, chunk_rows, encoding)
+    return target
+
+
+def export_bytes(df, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, encoding='utf-8'):
+    """按块导出到内存缓冲区并返回字节（整个结果在内存中，峰值约为结果大小的两倍）"""
+    buffer = io.BytesIO()
+    write_export(df, buffer, fmt, chunk_rows, encoding)
+    return buffer.getvalue()
+
+
+def export_temp_file(df, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, encoding='utf-8'):
+    """
+    按块导出到临时文件，返回读位置在开头的只读文件对象（io.FileIO，关闭后临时文件自动删除）
+
+    写出时内存中只有一块；st.download_button 会把文件一次读入内存交给浏览器，
+    所以网页下载时内存中仍有一份完整结果（不会再有缓冲区和字节两份）。
+    """
+    with tempfile.TemporaryFile() as f:
+        write_export(df, f, fmt, chunk_rows, encoding)
+        f.flush()
+        # 复制文件描述符：关闭 f 后临时文件仍保留到返回的对象被关闭
+        reader = io.FileIO(os.dup(f.fileno()), 'r')
+    reader.seek(0)
+    return reader
+
+
+def export_file_name(stem, fmt):
+    """带格式扩展名的文件名"""
+    return stem + EXPORT_FORMATS[fmt][1]